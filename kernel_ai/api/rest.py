@@ -22,10 +22,12 @@ _API_ROUTES = [
     ("/hot-files", "hot_files", h.hot_files, None),
     ("/path-walk", "path_walk", h.path_walk, None),
     ("/isolation-context", "isolation_context", h.isolation_context, None),
+    ("/process/batch", "get_process_batch", h.get_process_batch, None),
     ("/process/<int:pid>/threads", "get_process_threads", h.get_process_threads, None),
     ("/process/<int:pid>/cpu", "get_process_cpu", h.get_process_cpu, None),
     ("/process/<int:pid>/fds", "get_process_fds", h.get_process_fds, None),
     ("/processes-detailed", "get_processes_detailed", h.get_processes_detailed, None),
+    ("/process-tree", "get_process_tree", h.get_process_tree, None),
     ("/ipc-links", "get_ipc_links", h.get_ipc_links, None),
     ("/proc-matrix", "get_proc_matrix", h.get_proc_matrix, None),
     ("/proc-timeline", "get_proc_timeline", h.get_proc_timeline, None),
@@ -35,6 +37,7 @@ _API_ROUTES = [
     ("/siem-alerts", "siem_alerts", h.siem_alerts, None),
     ("/ml-anomalies", "ml_anomalies", h.ml_anomalies, None),
     ("/ml-drift", "ml_drift", h.ml_drift, None),
+    ("/ml-pulse", "ml_pulse", h.ml_pulse, None),
     ("/crypto-realtime", "crypto_realtime", h.crypto_realtime, None),
     ("/crypto-aes-demo", "crypto_aes_demo", h.crypto_aes_demo, None),
     ("/security-realtime", "security_realtime", h.security_realtime, None),
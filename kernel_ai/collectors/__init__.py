@@ -1,5 +1,7 @@
 """Low-level readers for /proc, /sys, and related paths (injectable in tests)."""
 
+from kernel_ai.collectors.fanout import fan_out
+from kernel_ai.collectors.fiemap import read_extents
 from kernel_ai.collectors.proc_fs import (
     read_diskstats,
     read_interrupt_lines,
@@ -8,7 +10,9 @@ from kernel_ai.collectors.proc_fs import (
 )
 
 __all__ = [
+    "fan_out",
     "read_diskstats",
+    "read_extents",
     "read_interrupt_lines",
     "read_tty_irq_total",
     "safe_read_text",
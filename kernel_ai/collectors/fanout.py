@@ -0,0 +1,102 @@
+"""Bounded thread fan-out for per-pid /proc crawls.
+
+open/read/readlink on procfs release the GIL and spend most of their time in
+the kernel, so a pid list split across a few threads scans in a fraction of
+the serial wall-clock time. All scanners share one process-wide pool (sized by
+``KERNEL_AI_PROC_SCAN_WORKERS``, default ``min(16, cpu_count)``; ``1`` disables
+threading) so concurrent requests cannot multiply thread counts.
+
+Items are split into contiguous shards and results are concatenated in shard
+order, so the output order is the input order no matter which thread finished
+first. Each shard stops taking new items once the shared deadline passes; the
+caller gets the results collected so far. Scans on an HTTP request path pass
+``REQUEST_SCAN_DEADLINE_SEC`` (``KERNEL_AI_PROC_SCAN_DEADLINE_SEC``, default 2 s)
+so a slow or huge /proc degrades to a partial answer instead of a hung request.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+PROC_SCAN_WORKERS = int(os.environ.get("KERNEL_AI_PROC_SCAN_WORKERS", "0") or 0) or min(16, os.cpu_count() or 1)
+REQUEST_SCAN_DEADLINE_SEC = float(os.environ.get("KERNEL_AI_PROC_SCAN_DEADLINE_SEC", "2.0") or 2.0)
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=PROC_SCAN_WORKERS, thread_name_prefix="proc-scan")
+        return _EXECUTOR
+
+
+def _run_shard(fn: Callable[[T], R | None], shard: list[T], deadline: float | None) -> tuple[list[R], int]:
+    """Apply ``fn`` to ``shard`` in order; return ``(results, items left undone)``."""
+    _LOCAL.in_pool = True
+    out: list[R] = []
+    try:
+        for i, item in enumerate(shard):
+            if deadline is not None and time.monotonic() >= deadline:
+                return out, len(shard) - i
+            result = fn(item)
+            if result is not None:
+                out.append(result)
+    finally:
+        _LOCAL.in_pool = False
+    return out, 0
+
+
+def fan_out(
+    fn: Callable[[T], R | None],
+    items: Iterable[T],
+    *,
+    workers: int | None = None,
+    deadline_sec: float | None = None,
+    min_shard: int = 16,
+) -> list[R]:
+    """Return ``[fn(item) for item in items]`` computed across the shared pool.
+
+    ``None`` results are dropped (the usual "process vanished / unreadable"
+    answer of a per-pid reader). ``fn`` must not mutate shared state; merge its
+    return values in the caller instead. Exceptions raised by ``fn`` propagate.
+    Calls made from inside a pool thread run inline to avoid pool deadlock.
+    """
+    items = list(items)
+    if not items:
+        return []
+    deadline = time.monotonic() + deadline_sec if deadline_sec is not None else None
+    n_workers = min(workers or PROC_SCAN_WORKERS, PROC_SCAN_WORKERS)
+    n_shards = min(n_workers, -(-len(items) // max(1, min_shard)))
+    if n_shards <= 1 or getattr(_LOCAL, "in_pool", False):
+        in_pool = getattr(_LOCAL, "in_pool", False)
+        try:
+            results, skipped = _run_shard(fn, items, deadline)
+        finally:
+            _LOCAL.in_pool = in_pool
+    else:
+        size = -(-len(items) // n_shards)
+        shards = [items[i:i + size] for i in range(0, len(items), size)]
+        pool = _executor()
+        futures = [pool.submit(_run_shard, fn, shard, deadline) for shard in shards]
+        results, skipped = [], 0
+        for future in futures:
+            part, left = future.result()
+            results.extend(part)
+            skipped += left
+    if skipped:
+        logger.debug("fan_out deadline hit: %d of %d items skipped", skipped, len(items))
+    return results
@@ -8,6 +8,7 @@ from kernel_ai.http.api_handlers.kernel import (
     kernel_dna,
     ml_anomalies,
     ml_drift,
+    ml_pulse,
     nginx_files,
     process_kernel_map,
     sentry_test,
@@ -32,10 +33,12 @@ from kernel_ai.http.api_handlers.processes import (
     get_proc_matrix,
     get_proc_timeline,
     get_proc_timeline_branches,
+    get_process_batch,
     get_process_cpu,
     get_process_fds,
     get_process_files,
     get_process_threads,
+    get_process_tree,
     get_processes,
     get_processes_detailed,
     processes_realtime,
@@ -64,11 +67,13 @@ __all__ = [
     "get_proc_matrix",
     "get_proc_timeline",
     "get_proc_timeline_branches",
+    "get_process_batch",
     "get_process_cpu",
     "get_process_fds",
     "get_process_files",
     "get_process_kernel_map",
     "get_process_threads",
+    "get_process_tree",
     "get_processes",
     "get_processes_detailed",
     "ingest_frontend_logs",
@@ -79,6 +84,7 @@ __all__ = [
     "kernel_dna",
     "ml_anomalies",
     "ml_drift",
+    "ml_pulse",
     "network_stack_realtime",
     "nginx_files",
     "process_kernel_map",
@@ -143,9 +143,9 @@ def ml_anomalies():
 def ml_drift():
     """Latest model-drift verdict + short history for the Kernel DNA UI.
 
-    Read-only: surfaces what the drift monitor / retrain job wrote to the shared
-    store, plus the on-disk model artifact age (a proxy for "model freshness").
-    Degrades to ``available: false`` if the store/model is unreachable.
+    Read-only: surfaces what the worker's live drift monitor / retrain job
+    wrote to the shared store, plus the on-disk model artifact age (a proxy for
+    "model freshness"). Degrades to ``available: false`` if the store/model is unreachable.
     """
 
     def _payload():
@@ -181,6 +181,34 @@ def ml_drift():
     return api_json(_payload)
 
 
+def ml_pulse():
+    """Latest ML worker tick (features, z-scores, stage verdicts, timings).
+
+    Read from the worker's shared-memory pulse (``kernel_ai.ml.pulse``): no
+    store query, sub-second freshness. ``available: false`` when the worker
+    is not running or the pulse is disabled.
+    """
+
+    def _payload():
+        from kernel_ai.ml.config import MLConfig
+        from kernel_ai.ml.pulse import read_pulse
+
+        cfg = MLConfig()
+        pulse = read_pulse(cfg.pulse_path) if cfg.pulse_path else None
+        now = datetime.now()
+        if pulse is None:
+            return {"timestamp": now.isoformat(), "available": False, "age_sec": None, "pulse": None}
+        return {
+            "timestamp": now.isoformat(),
+            "available": True,
+            "seq": pulse["seq"],
+            "age_sec": round(max(0.0, now.timestamp() - pulse["ts"]), 3),
+            "pulse": pulse["payload"],
+        }
+
+    return api_json(_payload)
+
+
 def sentry_test():
     """Temporary endpoint for manual Sentry verification."""
     if not current_app.config.get("SENTRY_TEST_ENDPOINT_ENABLED", False):
@@ -4,14 +4,26 @@ from flask import current_app, request
 
 from kernel_ai.collectors import proc_fs as _proc_fs
 from kernel_ai.http.common import api_json
+from kernel_ai.http.delta import list_history
 from kernel_ai.services import devices as _devices_service
 from kernel_ai.services import network as _network_service
 from kernel_ai.services import system_view as _system_view_service
 from kernel_ai.state import get_state_container
 
 
+def _connection_key(row):
+    return f'{row.get("type")} {row.get("local")} {row.get("remote")}'
+
+
 def active_connections():
-    return api_json(lambda: {"connections": _network_service.get_active_connections()})
+    def _payload():
+        connections = _network_service.get_active_connections()
+        if "since" not in request.args:
+            return {"connections": connections}
+        history = list_history(get_state_container(current_app).list_histories, ("connections",), key=_connection_key)
+        return history.diff(connections, request.args.get("since"), "connections")
+
+    return api_json(_payload)
 
 
 def traceroute_info():
@@ -1,17 +1,48 @@
 """Process-centric API handlers."""
 
 from datetime import datetime
-from flask import request
+from flask import current_app, request
 
 from kernel_ai.http.common import api_json
+from kernel_ai.http.delta import list_history
 from kernel_ai.services import process_inspect as _process_inspect_service
 from kernel_ai.services import process_timeline as _process_timeline_service
+from kernel_ai.services import process_tree as _process_tree_service
 from kernel_ai.services import processes as _processes_service
 from kernel_ai.services import scheduler_pelt as _scheduler_pelt_service
+from kernel_ai.state import get_state_container
+
+
+def _process_list_query():
+    """``?sort=cpu|rss|fds&limit=&offset=&q=&user=`` shared by the process list endpoints."""
+    limit = request.args.get("limit", type=int)
+    return {
+        "sort": request.args.get("sort") or None,
+        "limit": max(1, min(5000, limit)) if limit is not None else None,
+        "offset": max(0, request.args.get("offset", default=0, type=int)),
+        "q": request.args.get("q") or None,
+        "user": request.args.get("user") or None,
+    }
+
+
+def _process_list(view, query_fn):
+    def _payload():
+        query = _process_list_query()
+        total, rows = query_fn(**query)
+        out = {"offset": query["offset"], "limit": query["limit"], "sort": query["sort"]}
+        if "since" not in request.args:
+            # ``total`` is a running count for unsorted listings: emit it after the array.
+            return {"processes": rows, "total": total, **out}
+        histories = get_state_container(current_app).list_histories
+        history = list_history(histories, (view, *sorted(query.items())), key=lambda row: row["pid"])
+        delta = history.diff(rows, request.args.get("since"), "processes")
+        return {**delta, "total": total(), **out}
+
+    return api_json(_payload, exception_statuses=[(ValueError, 400)])
 
 
 def get_processes():
-    return api_json(lambda: {"processes": _processes_service.get_processes_basic_data()})
+    return _process_list("processes", _processes_service.query_processes_basic)
 
 
 def get_process_threads(pid):
@@ -26,8 +57,24 @@ def get_process_fds(pid):
     return api_json(lambda: _process_inspect_service.get_process_fds_info(pid))
 
 
+def get_process_batch():
+    def _payload():
+        try:
+            pids = [int(value) for value in request.args.get("pids", "").split(",") if value.strip()]
+        except ValueError as exc:
+            raise ValueError("'pids' must be a comma-separated list of integers") from exc
+        include = request.args.get("include")
+        sections = [value.strip() for value in include.split(",") if value.strip()] if include else None
+        return _process_inspect_service.get_process_batch_info(
+            pids,
+            include=sections or _process_inspect_service.BATCH_SECTIONS,
+        )
+
+    return api_json(_payload, exception_statuses=[(ValueError, 400)])
+
+
 def get_processes_detailed():
-    return api_json(lambda: {"processes": _processes_service.get_processes_detailed_data()})
+    return _process_list("processes-detailed", _processes_service.query_processes_detailed)
 
 
 def get_ipc_links():
@@ -73,12 +120,32 @@ def get_proc_timeline_branches():
     return api_json(_payload)
 
 
+def get_process_tree():
+    def _payload():
+        depth = request.args.get("depth", default=3, type=int)
+        limit = request.args.get("limit", default=8, type=int)
+        max_children = request.args.get("max_children", default=12, type=int)
+        return _process_tree_service.get_process_tree_data(
+            pid=request.args.get("pid", type=int),
+            depth=max(0, min(8, depth)),
+            limit=max(1, min(64, limit)),
+            max_children=max(1, min(64, max_children)),
+            sort=request.args.get("sort", default="cpu"),
+        )
+
+    return api_json(_payload, exception_statuses=[(ValueError, 400), (ProcessLookupError, 404)])
+
+
 def processes_realtime():
     return api_json(_processes_service.collect_processes_realtime)
 
 
 def scheduler_pelt():
-    return api_json(_scheduler_pelt_service.collect_scheduler_pelt)
+    def _payload():
+        per_thread = request.args.get("threads", default=0, type=int) == 1
+        return _scheduler_pelt_service.collect_scheduler_pelt(per_thread=per_thread)
+
+    return api_json(_payload)
 
 
 def get_proc_graph():
@@ -1,8 +1,13 @@
 """Common HTTP helpers."""
 
-from flask import g, has_request_context, jsonify
+import types
+
+from flask import Response, current_app, g, has_request_context, jsonify, stream_with_context
 from kernel_ai.sentry_helpers import capture_exception
 
+# Serialized items are flushed to the client in chunks of about this many bytes.
+STREAM_CHUNK_BYTES = 64 * 1024
+
 
 def build_error_payload(message, code, details=None):
     """Build a stable API error envelope."""
@@ -19,10 +24,98 @@ def build_error_payload(message, code, details=None):
     return payload
 
 
+_END = object()
+
+
+def _prime(gen):
+    """Run ``gen`` up to its first item so setup errors surface before streaming."""
+    first = next(gen, _END)
+
+    def resumed():
+        if first is not _END:
+            yield first
+            yield from gen
+
+    return resumed()
+
+
+def _json_array_chunks(items, dumps):
+    yield "["
+    buf = []
+    size = 0
+    try:
+        for i, item in enumerate(items):
+            text = dumps(item)
+            buf.append("," + text if i else text)
+            size += len(text) + 1
+            if size >= STREAM_CHUNK_BYTES:
+                yield "".join(buf)
+                buf = []
+                size = 0
+    except Exception:
+        if buf:  # keep the items serialized so far, the caller closes the array
+            yield "".join(buf)
+        raise
+    if buf:
+        yield "".join(buf)
+    yield "]"
+
+
+def _json_stream(payload):
+    """Serialize ``payload`` (generator, or dict with generator values) item by item."""
+    dumps = current_app.json.dumps
+    if isinstance(payload, types.GeneratorType):
+        try:
+            yield from _json_array_chunks(payload, dumps)
+        except Exception as e:
+            # Headers are gone already: log and close the array so clients still parse it.
+            capture_exception(e, where="http.common.api_json.stream")
+            yield "]"
+        return
+    yield "{"
+    for i, (key, value) in enumerate(payload.items()):
+        yield ("," if i else "") + dumps(str(key)) + ":"
+        if callable(value):
+            value = value()
+        if not isinstance(value, types.GeneratorType):
+            yield dumps(value)
+            continue
+        try:
+            yield from _json_array_chunks(value, dumps)
+        except Exception as e:
+            capture_exception(e, where="http.common.api_json.stream")
+            yield "]," + dumps("stream_error") + ":" + dumps(build_error_payload(str(e), "internal_error"))
+            break
+    yield "}"
+
+
+def _is_streamed(payload):
+    if isinstance(payload, types.GeneratorType):
+        return True
+    return isinstance(payload, dict) and any(isinstance(v, types.GeneratorType) for v in payload.values())
+
+
 def api_json(producer, error_status=500, error_extra=None, exception_statuses=None):
-    """Execute producer and serialize response/error as JSON."""
+    """Execute producer and serialize response/error as JSON.
+
+    A producer may return a generator (streamed as a JSON array) or a dict
+    whose values include generators (streamed as arrays inside the object).
+    Items are serialized one at a time and flushed in ~64 KiB chunks, so peak
+    memory does not grow with the list and the first byte leaves early. In a
+    streamed dict, a callable value is called when its key is reached, i.e.
+    after the arrays before it were streamed (e.g. a running count).
+    Errors raised before the first item still produce a regular error
+    response; later ones can only be logged (status 200 is already sent).
+    """
     try:
-        return jsonify(producer())
+        payload = producer()
+        if not _is_streamed(payload):
+            return jsonify(payload)
+        if isinstance(payload, types.GeneratorType):
+            payload = _prime(payload)
+        else:
+            payload = {k: (_prime(v) if isinstance(v, types.GeneratorType) else v) for k, v in payload.items()}
+        return Response(stream_with_context(_json_stream(payload)), mimetype="application/json")
     except Exception as e:
         status = error_status
         error_code = "internal_error"
@@ -0,0 +1,87 @@
+"""Cursor-based deltas for list endpoints (``?since=<cursor>``).
+
+Pollers of large, slowly changing lists (processes, connections) otherwise
+download and re-encode the whole table every tick. A :class:`ListHistory`
+remembers a fingerprint per row key for the last few versions of one list
+view, so a request carrying the cursor of one of them gets back only the rows
+that were added, changed or removed since, plus the cursor of the current
+version. Unknown or evicted cursors (too old, or issued by another server
+process) get a full snapshot instead, flagged ``"full": true``.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+from collections import OrderedDict
+
+MAX_VERSIONS = 16
+MAX_VIEWS = 32
+
+
+def _fingerprint(row):
+    try:
+        return hash(tuple(row.items()))
+    except TypeError:  # nested dict/list values
+        return hash(repr(row))
+
+
+class ListHistory:
+    """Last ``max_versions`` snapshots of one list view, as ``{key: fingerprint}``."""
+
+    def __init__(self, key, max_versions=MAX_VERSIONS):
+        self.key = key
+        self.max_versions = max_versions
+        self.lock = threading.Lock()
+        self._epoch = secrets.token_hex(4)
+        self._versions = OrderedDict()
+        self._next_version = 1
+
+    def _version_of(self, cursor):
+        epoch, _, version = str(cursor or "").partition("-")
+        if epoch != self._epoch or not version.isdigit():
+            return None
+        return int(version)
+
+    def diff(self, rows, since, list_key):
+        """Payload for ``rows``: a delta against ``since`` or a full snapshot."""
+        current = {}
+        fingerprints = {}
+        for row in rows:
+            key = self.key(row)
+            current[key] = row
+            fingerprints[key] = _fingerprint(row)
+        with self.lock:
+            latest = next(reversed(self._versions), None)
+            if latest is not None and self._versions[latest] == fingerprints:
+                version = latest
+            else:
+                version = self._next_version
+                self._next_version += 1
+                self._versions[version] = fingerprints
+                while len(self._versions) > self.max_versions:
+                    self._versions.popitem(last=False)
+            base = self._versions.get(self._version_of(since))
+        cursor = f"{self._epoch}-{version}"
+        if base is None:
+            return {"cursor": cursor, "full": True, list_key: list(current.values())}
+        return {
+            "cursor": cursor,
+            "full": False,
+            "added": [row for key, row in current.items() if key not in base],
+            "changed": [row for key, row in current.items() if key in base and base[key] != fingerprints[key]],
+            "removed": [key for key in base if key not in fingerprints],
+        }
+
+
+def list_history(histories, view, key):
+    """History for ``view`` in ``histories`` (per-app state), evicting the least recently used."""
+    history = histories.get(view)
+    if history is None:
+        history = histories.setdefault(view, ListHistory(key))
+    else:
+        histories.pop(view, None)
+        histories[view] = history
+    while len(histories) > MAX_VIEWS:
+        histories.pop(next(iter(histories)), None)
+    return history
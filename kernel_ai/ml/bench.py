@@ -0,0 +1,353 @@
+"""Detector micro-benchmarks at production scale.
+
+Times each detector component in isolation on synthetic data and emits JSON,
+so a regression shows up in CI / a before-after diff instead of as overrunning
+ticks in production. Scale profiles:
+
+  quick — small sizes, a few seconds end to end (smoke test / CI)
+  prod  — EWMA at 20/200/2000 features, 10^5 streamed syscall events,
+          a 10^6-entry STIDE profile, 10k Stage 5 samples
+
+Store writers run against a throwaway SQLite file unless ``--dsn`` points at a
+Postgres instance; there the tables are created in a per-run schema that is
+dropped afterwards, so the detector's own tables are never written to.
+
+Examples:
+  python -m kernel_ai.ml.bench --profile prod --out bench.json
+  python -m kernel_ai.ml.bench --profile quick --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import random
+import secrets
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from kernel_ai.ml.baseline import EwmaBaseline
+from kernel_ai.ml.proc_baseline import ProcBaselineDetector
+from kernel_ai.ml.proc_features import ProcSample
+from kernel_ai.ml.sequence import NgramTracker, PackedStideModel, StideModel
+
+logger = logging.getLogger("kernel_ai.ml.bench")
+
+PROFILES: dict[str, dict] = {
+    "quick": {
+        "baseline_features": (20, 200),
+        "stream_events": 10_000,
+        "stide_profile": 10_000,
+        "stide_window": 400,
+        "proc_samples": 500,
+        "if_features": 19,
+        "if_trees": 50,
+        "store_rows": 200,
+        "repeat": 3,
+    },
+    "prod": {
+        "baseline_features": (20, 200, 2000),
+        "stream_events": 100_000,
+        "stide_profile": 1_000_000,
+        "stide_window": 400,
+        "proc_samples": 10_000,
+        "if_features": 19,
+        "if_trees": 200,
+        "store_rows": 2000,
+        "repeat": 5,
+    },
+}
+
+_SYSCALLS = ("read", "write", "openat", "close", "fstat", "mmap", "futex", "epoll_wait",
+             "recvfrom", "sendto", "poll", "clock_gettime", "brk", "munmap", "ioctl")
+
+
+def _measure(fn: Callable[[], object], *, repeat: int, ops: int) -> dict:
+    """Run ``fn`` ``repeat`` times; report per-op latency and throughput of the best run."""
+    runs: list[float] = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    best = min(runs)
+    return {
+        "ops": ops,
+        "best_sec": round(best, 6),
+        "median_sec": round(statistics.median(runs), 6),
+        "us_per_op": round(best / max(1, ops) * 1e6, 3),
+        "ops_per_sec": round(ops / best, 1) if best > 0 else None,
+    }
+
+
+def bench_baseline(n_features: int, *, ticks: int = 200, repeat: int = 3) -> dict:
+    rng = random.Random(1)
+    names = [f"f{i}" for i in range(n_features)]
+    vectors = [{n: rng.gauss(100.0, 10.0) for n in names} for _ in range(ticks)]
+    min_std = {n: 1.0 for n in names}
+
+    def run() -> None:
+        bl = EwmaBaseline(alpha=0.05, warmup_samples=10)
+        for vec in vectors:
+            bl.update_and_score(vec, min_std)
+
+    return _measure(run, repeat=repeat, ops=ticks)
+
+
+def bench_ngram_stream(events: int, *, pids: int = 256, repeat: int = 3) -> dict:
+    rng = random.Random(2)
+    stream = [{"pid": rng.randrange(pids), "syscall": rng.choice(_SYSCALLS)} for _ in range(events)]
+
+    def run() -> None:
+        NgramTracker(n=3, window=400).update_stream(stream)
+
+    return _measure(run, repeat=repeat, ops=events)
+
+
+def bench_stide(profile_size: int, window: int, *, windows: int = 200, repeat: int = 3,
+                packed: bool = False) -> dict:
+    rng = random.Random(3)
+    vocab = {f"g{i}" for i in range(profile_size)}
+    tmpdir = None
+    if packed:
+        tmpdir = tempfile.mkdtemp(prefix="kernel-ai-bench-")
+        path = os.path.join(tmpdir, "stide.stide")
+        PackedStideModel.write(path, 3, vocab)
+        t0 = time.perf_counter()
+        model = PackedStideModel.load(path)
+        load_sec = time.perf_counter() - t0
+    else:
+        model = StideModel(n=3, ngrams=vocab)
+    # ~10% novel n-grams, like a mildly unusual window.
+    batches = [
+        [f"g{rng.randrange(profile_size)}" if rng.random() > 0.1 else f"x{rng.random()}"
+         for _ in range(window)]
+        for _ in range(windows)
+    ]
+
+    def run() -> None:
+        for w in batches:
+            model.score_window(w)
+
+    out = _measure(run, repeat=repeat, ops=windows)
+    if tmpdir:
+        out["load_sec"] = round(load_sec, 6)
+        del model
+        os.unlink(path)
+        os.rmdir(tmpdir)
+    return out
+
+
+def bench_proc(samples: int, *, ticks: int = 5, repeat: int = 3) -> dict:
+    rng = random.Random(4)
+    comms = [f"svc{i}" for i in range(max(1, samples // 20))]
+    rows = []
+    for pid in range(samples):
+        s = ProcSample(
+            pid=1000 + pid, ppid=1, comm=rng.choice(comms), parent_comm="systemd",
+            ruid=1000, euid=1000, age_sec=600.0, num_threads=rng.randint(1, 8),
+            fd_count=rng.randint(4, 64), vm_rss_mb=rng.uniform(1.0, 200.0),
+        )
+        s.features = s.score_vector()
+        rows.append(s)
+
+    def run() -> None:
+        det = ProcBaselineDetector(alpha=0.05, warmup_samples=3, z_warn=4.0, z_crit=7.0)
+        for t in range(ticks):
+            det.score(rows, now=float(t))
+
+    return _measure(run, repeat=repeat, ops=ticks * samples)
+
+
+def bench_isoforest(n_features: int, trees: int, *, calls: int = 200, repeat: int = 3) -> dict:
+    from kernel_ai.ml.model import IsolationForestModel
+
+    rng = random.Random(5)
+    names = [f"f{i}" for i in range(n_features)]
+    matrix = [[rng.gauss(0.0, 1.0) for _ in names] for _ in range(1000)]
+    model = IsolationForestModel(feature_names=names).fit(matrix, n_estimators=trees)
+    vec = dict(zip(names, matrix[0]))
+
+    def run() -> None:
+        for _ in range(calls):
+            model.score_one(vec)
+
+    return _measure(run, repeat=repeat, ops=calls)
+
+
+@contextlib.contextmanager
+def _scratch_dsn(dsn: str | None):
+    """A DSN for benchmark writes that never lands in the detector's tables.
+
+    No DSN: a SQLite file in a temp dir. Postgres: the same database with
+    ``search_path`` pointed at a fresh ``kernel_ai_bench_<hex>`` schema, which
+    is dropped (with every table the store created in it) on exit.
+    """
+    from kernel_ai.ml.store import is_sqlite_dsn
+
+    if not dsn:
+        tmpdir = tempfile.mkdtemp(prefix="kernel-ai-bench-")
+        try:
+            yield "sqlite:///" + os.path.join(tmpdir, "bench.db")
+        finally:
+            for name in os.listdir(tmpdir):
+                os.unlink(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+        return
+    if is_sqlite_dsn(dsn):
+        raise ValueError("bench --dsn takes a Postgres DSN; omit it for a throwaway SQLite file")
+
+    from psycopg.conninfo import make_conninfo
+
+    from kernel_ai.ml.store import connect
+
+    schema = f"kernel_ai_bench_{secrets.token_hex(4)}"
+    with connect(dsn) as conn:
+        conn.execute(f"CREATE SCHEMA {schema}")
+        try:
+            yield make_conninfo(dsn, options=f"-c search_path={schema}")
+        finally:
+            conn.execute(f"DROP SCHEMA {schema} CASCADE")
+
+
+def bench_store(dsn: str | None, rows: int, *, repeat: int = 3) -> dict:
+    """Time the worker's write path (snapshots, anomalies, n-gram / lineage upserts)."""
+    with _scratch_dsn(dsn) as scratch:
+        return _bench_store(scratch, rows, repeat=repeat)
+
+
+def _bench_store(dsn: str, rows: int, *, repeat: int) -> dict:
+    from kernel_ai.ml.store import open_store
+
+    store = open_store(dsn)
+    rng = random.Random(6)
+    features = {f"f{i}": rng.random() for i in range(19)}
+    anomalies = [
+        {"source": "bench", "feature": "f0", "type": "bench", "severity": "medium",
+         "score": 1.0, "message": "bench", "meta": {}}
+        for _ in range(10)
+    ]
+    ngrams = {f"read|write|g{i}": 1 for i in range(rows)}
+    edges = [("systemd", f"svc{i}", 1) for i in range(rows)]
+    out: dict[str, dict] = {}
+    try:
+        def snapshots() -> None:
+            for _ in range(rows):
+                store.insert_feature_snapshot(features)
+
+        def anomaly_batches() -> None:
+            for _ in range(max(1, rows // 10)):
+                store.insert_anomalies(anomalies)
+
+        out["feature_snapshot"] = _measure(snapshots, repeat=repeat, ops=rows)
+        out["anomalies"] = _measure(anomaly_batches, repeat=repeat, ops=max(1, rows // 10) * 10)
+        out["ngram_upsert"] = _measure(
+            lambda: store.upsert_ngram_counts(3, ngrams), repeat=repeat, ops=rows)
+        out["lineage_upsert"] = _measure(
+            lambda: store.upsert_lineage_counts(edges), repeat=repeat, ops=rows)
+    finally:
+        store.close()
+    return out
+
+
+def run_suite(profile: str = "quick", *, dsn: str | None = None, only: set[str] | None = None) -> dict:
+    """Run every benchmark of ``profile``; return ``{"meta": ..., "results": {name: stats}}``."""
+    p = PROFILES[profile]
+    repeat = p["repeat"]
+    results: dict[str, dict] = {}
+
+    def want(name: str) -> bool:
+        return only is None or any(name.startswith(o) for o in only)
+
+    for n in p["baseline_features"]:
+        if want("baseline"):
+            results[f"baseline.update_and_score[{n}]"] = bench_baseline(n, repeat=repeat)
+    if want("ngram"):
+        results["ngram.update_stream"] = bench_ngram_stream(p["stream_events"], repeat=repeat)
+    if want("stide"):
+        results["stide.score_window"] = bench_stide(p["stide_profile"], p["stide_window"], repeat=repeat)
+        results["stide.packed.score_window"] = bench_stide(
+            p["stide_profile"], p["stide_window"], repeat=repeat, packed=True)
+    if want("proc"):
+        results["proc.score"] = bench_proc(p["proc_samples"], repeat=repeat)
+    if want("isoforest"):
+        try:
+            results["isoforest.score_one"] = bench_isoforest(p["if_features"], p["if_trees"], repeat=repeat)
+        except ImportError as exc:
+            logger.warning("skipping isoforest benchmark: %s", exc)
+    if want("store"):
+        try:
+            for name, stats in bench_store(dsn, p["store_rows"], repeat=repeat).items():
+                results[f"store.{name}"] = stats
+        except Exception as exc:  # noqa: BLE001 - a missing DB must not sink the suite
+            logger.warning("skipping store benchmarks: %s", exc)
+
+    return {
+        "meta": {
+            "profile": profile,
+            "ts": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "store": "postgres" if dsn and not dsn.startswith("sqlite:") else "sqlite",
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, *, tolerance: float = 0.2) -> list[dict]:
+    """Benchmarks whose per-op latency grew by more than ``tolerance`` vs ``baseline``."""
+    regressions: list[dict] = []
+    old = baseline.get("results", {})
+    for name, stats in current.get("results", {}).items():
+        prev = old.get(name)
+        if not prev or not prev.get("us_per_op"):
+            continue
+        ratio = stats["us_per_op"] / prev["us_per_op"]
+        if ratio > 1.0 + tolerance:
+            regressions.append({
+                "name": name,
+                "us_per_op": stats["us_per_op"],
+                "baseline_us_per_op": prev["us_per_op"],
+                "ratio": round(ratio, 3),
+            })
+    return regressions
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    parser = argparse.ArgumentParser(description="Benchmark ML detector components")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument(
+        "--dsn", default=None,
+        help="Postgres DSN; store benchmarks write to a per-run schema (default: temporary SQLite file)",
+    )
+    parser.add_argument("--only", action="append", help="benchmark name prefix (repeatable)")
+    parser.add_argument("--out", default=None, help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", default=None, help="previous results JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = run_suite(args.profile, dsn=args.dsn, only=set(args.only) if args.only else None)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            report["regressions"] = compare(report, json.load(fh), tolerance=args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,17 +11,27 @@ Measures, without any labels, whether the live system has drifted away from the
 
 Either signal crossing its threshold marks `drifted = True`, which the retrain
 orchestrator uses to decide whether to refit.
+
+Live mode: the worker feeds every tick into a :class:`DriftTracker`, which keeps
+per-feature sums / sums of squares and the IsolationForest flag count in
+time buckets over the drift window. Evaluating drift is then O(features) and
+runs every tick; the tracker state is persisted compactly (``ml_drift_state``)
+so :func:`compute_drift` can reuse it instead of re-scoring 30 minutes of
+snapshots.
 """
 
 from __future__ import annotations
 
 import logging
+import math
 import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
 
 from kernel_ai.ml.config import MLConfig
-from kernel_ai.ml.features import FEATURE_SPECS
-from kernel_ai.ml.model import IsolationForestModel
-from kernel_ai.ml.store import fetch_recent_feature_dicts, insert_drift
+from kernel_ai.ml.features import FEATURE_SPECS, feature_spec
+from kernel_ai.ml.store import fetch_drift_state, fetch_recent_feature_dicts, insert_drift
 
 logger = logging.getLogger("kernel_ai.ml.drift")
 
@@ -33,24 +43,34 @@ _MAX_FEATURE_Z = 25.0
 
 def _feature_drift(recent: list[dict], feature_stats: dict[str, dict]) -> tuple[float, dict]:
     """Mean absolute shift of recent feature means vs training means, in train
-    std units. Returns (aggregate_score, per_feature_detail).
+    std units. Returns (aggregate_score, per_feature_detail)."""
+    if not recent or not feature_stats:
+        return 0.0, {}
+    means = {
+        name: statistics.fmean(float(r.get(name, 0.0)) for r in recent)
+        for name in feature_stats
+    }
+    return _feature_drift_from_means(means, feature_stats)
+
+
+def _feature_drift_from_means(means: dict[str, float], feature_stats: dict[str, dict]) -> tuple[float, dict]:
+    """Drift score from already-aggregated recent means.
 
     The denominator floor uses the same per-feature noise floor as the Stage 1
     z-score (FEATURE_SPECS[...].min_std), so quiet features need a *meaningful*
     move — not a microscopic one — to register as drift.
     """
-    if not recent or not feature_stats:
+    if not means or not feature_stats:
         return 0.0, {}
     per_feature = {}
     z_values = []
     for name, st in feature_stats.items():
-        vals = [float(r.get(name, 0.0)) for r in recent]
-        if not vals:
+        if name not in means:
             continue
-        recent_mean = statistics.fmean(vals)
+        recent_mean = means[name]
         train_mean = float(st.get("mean", 0.0))
         train_std = float(st.get("std", 0.0))
-        spec = FEATURE_SPECS.get(name)
+        spec = feature_spec(name)
         noise_floor = spec.min_std if spec else 0.0
         floor = max(train_std, noise_floor, abs(train_mean) * 0.05, 1e-6)
         z = min(_MAX_FEATURE_Z, abs(recent_mean - train_mean) / floor)
@@ -60,7 +80,189 @@ def _feature_drift(recent: list[dict], feature_stats: dict[str, dict]) -> tuple[
     return aggregate, per_feature
 
 
+def _insufficient(n: int, contamination: float, cfg: MLConfig) -> dict:
+    return {
+        "available": True, "n_recent": n, "flag_rate": 0.0,
+        "expected_rate": contamination, "feature_drift": 0.0, "drifted": False,
+        "detail": {"reason": "insufficient_recent_data", "min_recent": cfg.drift_min_recent},
+    }
+
+
+def _verdict(n: int, flag_rate: float, contamination: float, feature_drift: float,
+             per_feature: dict, cfg: MLConfig) -> dict:
+    rate_drift = flag_rate > contamination * cfg.drift_rate_mult
+    dist_drift = feature_drift > cfg.drift_feature_z
+    # Surface the biggest-shifting features for explainability.
+    top = sorted(per_feature.items(), key=lambda kv: kv[1], reverse=True)[:5]
+    return {
+        "available": True,
+        "n_recent": n,
+        "flag_rate": round(flag_rate, 4),
+        "expected_rate": round(contamination, 4),
+        "feature_drift": round(feature_drift, 4),
+        "drifted": bool(rate_drift or dist_drift),
+        "detail": {
+            "rate_drift": rate_drift,
+            "dist_drift": dist_drift,
+            "rate_mult_threshold": cfg.drift_rate_mult,
+            "feature_z_threshold": cfg.drift_feature_z,
+            "top_features": dict(top),
+        },
+    }
+
+
+@dataclass
+class _Bucket:
+    start: float
+    n: int = 0
+    scored: int = 0
+    flagged: int = 0
+    sums: list[float] = field(default_factory=list)
+    sumsq: list[float] = field(default_factory=list)
+
+
+class DriftTracker:
+    """Rolling sufficient statistics over the drift window.
+
+    Ticks land in ``bucket_sec`` buckets; running totals are updated on every
+    tick and when a bucket ages out of the window, so :meth:`evaluate` never
+    touches individual snapshots.
+    """
+
+    def __init__(self, *, window_sec: float, bucket_sec: float = 60.0,
+                 feature_names: list[str] | None = None) -> None:
+        self.window_sec = max(1.0, window_sec)
+        self.bucket_sec = max(1.0, min(bucket_sec, self.window_sec))
+        # Same base set the Stage 2 model (and its feature_stats) is trained on.
+        self.feature_names = list(feature_names or FEATURE_SPECS)
+        width = len(self.feature_names)
+        self._buckets: deque[_Bucket] = deque()
+        self._n = 0
+        self._scored = 0
+        self._flagged = 0
+        self._sums = [0.0] * width
+        self._sumsq = [0.0] * width
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_sec
+        while self._buckets and self._buckets[0].start + self.bucket_sec <= cutoff:
+            old = self._buckets.popleft()
+            self._n -= old.n
+            self._scored -= old.scored
+            self._flagged -= old.flagged
+            for i, (s, sq) in enumerate(zip(old.sums, old.sumsq)):
+                self._sums[i] -= s
+                self._sumsq[i] -= sq
+
+    def update(self, features: dict[str, float], *, flagged: bool | None, now: float | None = None) -> None:
+        """Fold one tick in. ``flagged`` is None when no Stage 2 model scored it."""
+        now = time.time() if now is None else now
+        self._expire(now)
+        bucket = self._buckets[-1] if self._buckets else None
+        if bucket is None or now >= bucket.start + self.bucket_sec:
+            width = len(self.feature_names)
+            bucket = _Bucket(start=now - (now % self.bucket_sec), sums=[0.0] * width, sumsq=[0.0] * width)
+            self._buckets.append(bucket)
+        bucket.n += 1
+        self._n += 1
+        if flagged is not None:
+            bucket.scored += 1
+            self._scored += 1
+            if flagged:
+                bucket.flagged += 1
+                self._flagged += 1
+        for i, name in enumerate(self.feature_names):
+            x = float(features.get(name, 0.0))
+            bucket.sums[i] += x
+            bucket.sumsq[i] += x * x
+            self._sums[i] += x
+            self._sumsq[i] += x * x
+
+    def reset_flags(self) -> None:
+        """Forget flag counts (after a model reload they describe the old model)."""
+        for bucket in self._buckets:
+            bucket.scored = 0
+            bucket.flagged = 0
+        self._scored = 0
+        self._flagged = 0
+
+    @property
+    def n(self) -> int:
+        return self._n
+
+    def means(self) -> dict[str, float]:
+        if self._n <= 0:
+            return {}
+        return {name: self._sums[i] / self._n for i, name in enumerate(self.feature_names)}
+
+    def stds(self) -> dict[str, float]:
+        if self._n <= 0:
+            return {}
+        out = {}
+        for i, name in enumerate(self.feature_names):
+            mean = self._sums[i] / self._n
+            out[name] = math.sqrt(max(0.0, self._sumsq[i] / self._n - mean * mean))
+        return out
+
+    def evaluate(self, model_meta: dict, cfg: MLConfig, *, now: float | None = None) -> dict:
+        """Drift verdict against a model's training stats, in O(features)."""
+        self._expire(time.time() if now is None else now)
+        contamination = float(model_meta.get("contamination", cfg.if_contamination))
+        if self._n < cfg.drift_min_recent:
+            return _insufficient(self._n, contamination, cfg)
+        flag_rate = self._flagged / self._scored if self._scored else 0.0
+        feature_drift, per_feature = _feature_drift_from_means(
+            self.means(), model_meta.get("feature_stats", {})
+        )
+        result = _verdict(self._n, flag_rate, contamination, feature_drift, per_feature, cfg)
+        result["detail"]["source"] = "live"
+        result["detail"]["n_scored"] = self._scored
+        stds = self.stds()
+        result["detail"]["recent_std"] = {
+            name: round(stds.get(name, 0.0), 3) for name in result["detail"]["top_features"]
+        }
+        return result
+
+    # --- compact persistence: one JSON document, one row per bucket ---
+
+    def export_state(self) -> dict:
+        return {
+            "features": self.feature_names,
+            "bucket_sec": self.bucket_sec,
+            "buckets": [
+                [b.start, b.n, b.scored, b.flagged, b.sums, b.sumsq] for b in self._buckets
+            ],
+        }
+
+    def load_state(self, state: dict | None, *, now: float | None = None) -> None:
+        """Restore buckets; skipped if the feature layout no longer matches."""
+        if not state or list(state.get("features") or []) != self.feature_names:
+            return
+        if float(state.get("bucket_sec") or 0.0) != self.bucket_sec:
+            return
+        width = len(self.feature_names)
+        for row in state.get("buckets") or []:
+            try:
+                start, n, scored, flagged, sums, sumsq = row
+                if len(sums) != width or len(sumsq) != width:
+                    continue
+                bucket = _Bucket(float(start), int(n), int(scored), int(flagged),
+                                 [float(x) for x in sums], [float(x) for x in sumsq])
+            except (TypeError, ValueError):
+                continue
+            self._buckets.append(bucket)
+            self._n += bucket.n
+            self._scored += bucket.scored
+            self._flagged += bucket.flagged
+            for i in range(width):
+                self._sums[i] += bucket.sums[i]
+                self._sumsq[i] += bucket.sumsq[i]
+        self._expire(time.time() if now is None else now)
+
+
 def compute_drift(cfg: MLConfig | None = None, *, persist: bool = True) -> dict:
+    from kernel_ai.ml.model import IsolationForestModel
+
     cfg = cfg or MLConfig()
     try:
         model = IsolationForestModel.load(cfg.model_path)
@@ -68,18 +270,31 @@ def compute_drift(cfg: MLConfig | None = None, *, persist: bool = True) -> dict:
         logger.warning("drift: no model to compare against (%s)", exc)
         return {"available": False, "reason": "no_model"}
 
+    contamination = float(model.meta.get("contamination", cfg.if_contamination))
+
+    # Fast path: the worker's persisted sufficient statistics (no re-scoring).
+    state = fetch_drift_state(cfg.dsn, max_age_sec=cfg.drift_state_max_age_sec)
+    if state:
+        tracker = DriftTracker(window_sec=cfg.drift_window_min * 60.0, bucket_sec=cfg.drift_bucket_sec)
+        tracker.load_state(state)
+        if tracker.n:
+            result = tracker.evaluate(model.meta, cfg)
+            if persist:
+                insert_drift(cfg.dsn, result)
+            logger.info(
+                "drift (live stats): n=%d flag_rate=%.3f (exp %.3f) feature_drift=%.2f drifted=%s",
+                result["n_recent"], result["flag_rate"], contamination,
+                result["feature_drift"], result["drifted"],
+            )
+            return result
+
     recent = fetch_recent_feature_dicts(cfg.dsn, minutes=cfg.drift_window_min)
     n = len(recent)
-    contamination = float(model.meta.get("contamination", cfg.if_contamination))
 
     # Too few recent samples (e.g. right after a worker restart) -> a single
     # noisy point must not be allowed to declare "drift".
     if n < cfg.drift_min_recent:
-        result = {
-            "available": True, "n_recent": n, "flag_rate": 0.0,
-            "expected_rate": contamination, "feature_drift": 0.0, "drifted": False,
-            "detail": {"reason": "insufficient_recent_data", "min_recent": cfg.drift_min_recent},
-        }
+        result = _insufficient(n, contamination, cfg)
         if persist:
             insert_drift(cfg.dsn, result)
         return result
@@ -90,34 +305,12 @@ def compute_drift(cfg: MLConfig | None = None, *, persist: bool = True) -> dict:
     flag_rate = flagged / n
 
     feature_drift, per_feature = _feature_drift(recent, model.meta.get("feature_stats", {}))
-
-    rate_drift = flag_rate > contamination * cfg.drift_rate_mult
-    dist_drift = feature_drift > cfg.drift_feature_z
-    drifted = bool(rate_drift or dist_drift)
-
-    # Surface the biggest-shifting features for explainability.
-    top = sorted(per_feature.items(), key=lambda kv: kv[1], reverse=True)[:5]
-
-    result = {
-        "available": True,
-        "n_recent": n,
-        "flag_rate": round(flag_rate, 4),
-        "expected_rate": round(contamination, 4),
-        "feature_drift": round(feature_drift, 4),
-        "drifted": drifted,
-        "detail": {
-            "rate_drift": rate_drift,
-            "dist_drift": dist_drift,
-            "rate_mult_threshold": cfg.drift_rate_mult,
-            "feature_z_threshold": cfg.drift_feature_z,
-            "top_features": dict(top),
-        },
-    }
+    result = _verdict(n, flag_rate, contamination, feature_drift, per_feature, cfg)
     if persist:
         insert_drift(cfg.dsn, result)
     logger.info(
         "drift: n=%d flag_rate=%.3f (exp %.3f) feature_drift=%.2f drifted=%s",
-        n, flag_rate, contamination, feature_drift, drifted,
+        n, flag_rate, contamination, feature_drift, result["drifted"],
     )
     return result
 
@@ -12,7 +12,9 @@ so a detected anomaly can be mapped straight onto the Kernel DNA visualization.
 from __future__ import annotations
 
 import os
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass
 
 
@@ -52,20 +54,63 @@ FEATURE_SPECS: dict[str, FeatureSpec] = {
 }
 
 
-def _read_kv(path: str) -> dict[str, int]:
+# Features the sub-second sampler (:class:`BurstSampler`) also observes, and
+# the aggregates it emits for each as ``<name>_<agg>``. Rates only get max/p95:
+# their sub-interval mean is the tick-level rate already in the vector.
+BURST_FEATURES: dict[str, tuple[str, ...]] = {
+    "procs_running": ("mean", "max", "p95"),
+    "procs_blocked": ("mean", "max", "p95"),
+    "ctxt_per_sec": ("max", "p95"),
+    "cpu_busy_pct": ("max", "p95"),
+    "pgfault_per_sec": ("max", "p95"),
+    "pgmajfault_per_sec": ("max", "p95"),
+    "tcp_retrans_per_sec": ("max", "p95"),
+    "tcp_outseg_per_sec": ("max", "p95"),
+}
+
+# Kept apart from FEATURE_SPECS: the burst sampler is off by default, and
+# training (train.FEATURE_ORDER) and drift must not pick up columns that are
+# always zero. Stage 1 adds them via active_feature_specs() when enabled.
+BURST_FEATURE_SPECS: dict[str, FeatureSpec] = {}
+for _name, _aggs in BURST_FEATURES.items():
+    _base = FEATURE_SPECS[_name]
+    for _agg in _aggs:
+        # Sub-second peaks are noisier than tick averages: double the floor.
+        BURST_FEATURE_SPECS[f"{_name}_{_agg}"] = FeatureSpec(
+            f"{_name}_{_agg}", _base.subsystem, _base.position,
+            _base.min_std * (1.0 if _agg == "mean" else 2.0), f"{_base.label} ({_agg})",
+        )
+del _name, _aggs, _base, _agg
+
+
+def feature_spec(name: str) -> FeatureSpec | None:
+    """Metadata for a base or burst feature name."""
+    return FEATURE_SPECS.get(name) or BURST_FEATURE_SPECS.get(name)
+
+
+def active_feature_specs(burst: bool) -> dict[str, FeatureSpec]:
+    """Features present in the tick vector: the base set, plus burst aggregates if sampled."""
+    return {**FEATURE_SPECS, **BURST_FEATURE_SPECS} if burst else dict(FEATURE_SPECS)
+
+
+def _parse_kv(text: str) -> dict[str, int]:
     out: dict[str, int] = {}
+    for raw in text.splitlines():
+        parts = raw.split()
+        if len(parts) == 2:
+            try:
+                out[parts[0]] = int(parts[1])
+            except ValueError:
+                continue
+    return out
+
+
+def _read_kv(path: str) -> dict[str, int]:
     try:
         with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            for raw in f:
-                parts = raw.split()
-                if len(parts) == 2:
-                    try:
-                        out[parts[0]] = int(parts[1])
-                    except ValueError:
-                        continue
+            return _parse_kv(f.read())
     except OSError:
         return {}
-    return out
 
 
 def _read_psi_mem() -> tuple[float, float]:
@@ -103,46 +148,57 @@ def _read_loadavg() -> tuple[float, int]:
         return 0.0, 0
 
 
-def _read_stat() -> dict:
+def _parse_stat(text: str) -> dict:
     out = {"ctxt": 0, "procs_running": 0, "procs_blocked": 0, "cpu_busy": 0, "cpu_total": 0}
     try:
-        with open("/proc/stat", "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                if line.startswith("cpu "):
-                    nums = [int(x) for x in line.split()[1:] if x.isdigit()]
-                    if len(nums) >= 4:
-                        idle = nums[3] + (nums[4] if len(nums) > 4 else 0)
-                        total = sum(nums)
-                        out["cpu_busy"] = total - idle
-                        out["cpu_total"] = total
-                elif line.startswith("ctxt "):
-                    out["ctxt"] = int(line.split()[1])
-                elif line.startswith("procs_running "):
-                    out["procs_running"] = int(line.split()[1])
-                elif line.startswith("procs_blocked "):
-                    out["procs_blocked"] = int(line.split()[1])
-    except (OSError, ValueError):
+        for line in text.splitlines():
+            if line.startswith("cpu "):
+                nums = [int(x) for x in line.split()[1:] if x.isdigit()]
+                if len(nums) >= 4:
+                    idle = nums[3] + (nums[4] if len(nums) > 4 else 0)
+                    total = sum(nums)
+                    out["cpu_busy"] = total - idle
+                    out["cpu_total"] = total
+            elif line.startswith("ctxt "):
+                out["ctxt"] = int(line.split()[1])
+            elif line.startswith("procs_running "):
+                out["procs_running"] = int(line.split()[1])
+            elif line.startswith("procs_blocked "):
+                out["procs_blocked"] = int(line.split()[1])
+    except ValueError:
         pass
     return out
 
 
-def _read_tcp_snmp() -> dict[str, int]:
+def _read_stat() -> dict:
+    try:
+        with open("/proc/stat", "r", encoding="utf-8", errors="ignore") as f:
+            return _parse_stat(f.read())
+    except OSError:
+        return _parse_stat("")
+
+
+def _parse_tcp_snmp(text: str) -> dict[str, int]:
     out = {"RetransSegs": 0, "InSegs": 0, "OutSegs": 0}
+    lines = [ln.strip() for ln in text.splitlines() if ln.startswith("Tcp:")]
+    if len(lines) >= 2:
+        headers = lines[-2].split()[1:]
+        values = lines[-1].split()[1:]
+        for key, value in zip(headers, values):
+            if key in out:
+                try:
+                    out[key] = int(value)
+                except ValueError:
+                    pass
+    return out
+
+
+def _read_tcp_snmp() -> dict[str, int]:
     try:
         with open("/proc/net/snmp", "r", encoding="utf-8", errors="ignore") as f:
-            lines = [ln.strip() for ln in f if ln.startswith("Tcp:")]
-        if len(lines) >= 2:
-            headers = lines[-2].split()[1:]
-            values = lines[-1].split()[1:]
-            for key, value in zip(headers, values):
-                if key in out:
-                    try:
-                        out[key] = int(value)
-                    except ValueError:
-                        pass
+            return _parse_tcp_snmp(f.read())
     except OSError:
-        pass
-    return out
+        return _parse_tcp_snmp("")
 
 
 def _read_softirq_totals() -> dict[str, int]:
@@ -184,15 +240,160 @@ def _count_procs() -> int:
         return 0
 
 
+def _pread_all(fd: int) -> str:
+    """Re-read a procfs file through an already open fd (no open/close per read)."""
+    chunks = []
+    offset = 0
+    while True:
+        chunk = os.pread(fd, 65536, offset)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        offset += len(chunk)
+    return b"".join(chunks).decode("utf-8", "ignore")
+
+
+class BurstSampler:
+    """Sample the cheap global counters every ``period_sec`` in a background thread.
+
+    A 2s tick averages a 300ms fork burst or retransmit storm into its rate; this
+    keeps a small ring of sub-interval values (``/proc/stat``, ``/proc/vmstat``,
+    ``/proc/net/snmp`` only, each through a persistent fd) and :meth:`drain`
+    folds the samples since the previous tick into mean/max/p95 features. At
+    5 Hz that is a few hundred microseconds of CPU per second.
+    """
+
+    _PATHS = ("/proc/stat", "/proc/vmstat", "/proc/net/snmp")
+
+    def __init__(self, period_sec: float = 0.2, ring: int = 64) -> None:
+        self.period_sec = max(0.05, period_sec)
+        self._fds = [os.open(p, os.O_RDONLY) for p in self._PATHS]
+        self._ring: deque[dict[str, float]] = deque(maxlen=ring)
+        self._prev: tuple[float, dict[str, float]] | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.stats = {"samples": 0, "errors": 0}
+
+    def _read(self) -> dict[str, float]:
+        stat = _parse_stat(_pread_all(self._fds[0]))
+        vmstat = _parse_kv(_pread_all(self._fds[1]))
+        tcp = _parse_tcp_snmp(_pread_all(self._fds[2]))
+        return {
+            "ctxt": float(stat["ctxt"]),
+            "cpu_busy": float(stat["cpu_busy"]),
+            "cpu_total": float(stat["cpu_total"]),
+            "procs_running": float(stat["procs_running"]),
+            "procs_blocked": float(stat["procs_blocked"]),
+            "pgfault": float(vmstat.get("pgfault", 0)),
+            "pgmajfault": float(vmstat.get("pgmajfault", 0)),
+            "tcp_retrans": float(tcp["RetransSegs"]),
+            "tcp_outseg": float(tcp["OutSegs"]),
+        }
+
+    def sample_once(self, now: float | None = None) -> None:
+        """Take one sample and, given a previous one, push its interval values."""
+        now = time.monotonic() if now is None else now
+        try:
+            cur = self._read()
+        except OSError:
+            self.stats["errors"] += 1
+            return
+        prev = self._prev
+        self._prev = (now, cur)
+        self.stats["samples"] += 1
+        if prev is None or now <= prev[0]:
+            return
+        dt = now - prev[0]
+        last = prev[1]
+
+        def rate(key: str) -> float:
+            return max(0.0, (cur[key] - last[key]) / dt)
+
+        cpu_total = cur["cpu_total"] - last["cpu_total"]
+        busy = (cur["cpu_busy"] - last["cpu_busy"]) / cpu_total * 100.0 if cpu_total > 0 else 0.0
+        point = {
+            "procs_running": cur["procs_running"],
+            "procs_blocked": cur["procs_blocked"],
+            "ctxt_per_sec": rate("ctxt"),
+            "cpu_busy_pct": max(0.0, min(100.0, busy)),
+            "pgfault_per_sec": rate("pgfault"),
+            "pgmajfault_per_sec": rate("pgmajfault"),
+            "tcp_retrans_per_sec": rate("tcp_retrans"),
+            "tcp_outseg_per_sec": rate("tcp_outseg"),
+        }
+        with self._lock:
+            self._ring.append(point)
+
+    def drain(self) -> dict[str, float]:
+        """Aggregate (and clear) the samples taken since the previous drain."""
+        with self._lock:
+            points = list(self._ring)
+            self._ring.clear()
+        if not points:
+            return {}
+        out: dict[str, float] = {}
+        for name, aggs in BURST_FEATURES.items():
+            values = sorted(p[name] for p in points)
+            for agg in aggs:
+                if agg == "mean":
+                    v = sum(values) / len(values)
+                elif agg == "max":
+                    v = values[-1]
+                else:
+                    v = values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))]
+                out[f"{name}_{agg}"] = v
+        return out
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.period_sec):
+            self.sample_once()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ml-burst-sampler", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self.period_sec)
+            self._thread = None
+        for fd in self._fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds = []
+
+
 class FeatureExtractor:
     """Stateful procfs reader: holds the previous counter snapshot to derive
-    per-second rates. Call :meth:`collect` once per tick."""
+    per-second rates. Call :meth:`collect` once per tick.
 
-    def __init__(self) -> None:
+    With ``burst_period_sec`` set, a :class:`BurstSampler` thread adds the
+    sub-second ``<feature>_{mean,max,p95}`` aggregates to every vector.
+    """
+
+    def __init__(self, burst_period_sec: float = 0.0) -> None:
         self._prev: dict[str, float] | None = None
         self._prev_ts: float | None = None
-
-    def collect(self) -> dict[str, float] | None:
+        self.burst: BurstSampler | None = None
+        if burst_period_sec > 0:
+            self.burst = BurstSampler(period_sec=burst_period_sec)
+            self.burst.start()
+
+    def close(self) -> None:
+        if self.burst is not None:
+            self.burst.close()
+            self.burst = None
+
+    def read_raw(self) -> dict:
+        """Read every procfs input of one tick (counters + gauges), unprocessed.
+
+        Split from :meth:`compute` so a tick's raw inputs can be recorded and
+        replayed offline (see :mod:`kernel_ai.ml.replay`).
+        """
         now = time.time()
         stat = _read_stat()
         vmstat = _read_kv("/proc/vmstat")
@@ -201,23 +402,44 @@ class FeatureExtractor:
         hardirq = _read_hardirq_total()
         psi_some, psi_full = _read_psi_mem()
         load1, run_queue = _read_loadavg()
-
-        raw = {
-            "ctxt": float(stat["ctxt"]),
-            "pgfault": float(vmstat.get("pgfault", 0)),
-            "pgmajfault": float(vmstat.get("pgmajfault", 0)),
-            "pgscan_direct": float(vmstat.get("pgscan_direct", 0)),
-            "swap_io": float(vmstat.get("pswpin", 0) + vmstat.get("pswpout", 0)),
-            "tcp_retrans": float(tcp["RetransSegs"]),
-            "tcp_inseg": float(tcp["InSegs"]),
-            "tcp_outseg": float(tcp["OutSegs"]),
-            "net_softirq": float(softirq.get("NET_RX", 0) + softirq.get("NET_TX", 0)),
-            "block_softirq": float(softirq.get("BLOCK", 0)),
-            "hardirq": float(hardirq),
-            "cpu_busy": float(stat["cpu_busy"]),
-            "cpu_total": float(stat["cpu_total"]),
+        return {
+            "ts": now,
+            "burst": self.burst.drain() if self.burst is not None else {},
+            "counters": {
+                "ctxt": float(stat["ctxt"]),
+                "pgfault": float(vmstat.get("pgfault", 0)),
+                "pgmajfault": float(vmstat.get("pgmajfault", 0)),
+                "pgscan_direct": float(vmstat.get("pgscan_direct", 0)),
+                "swap_io": float(vmstat.get("pswpin", 0) + vmstat.get("pswpout", 0)),
+                "tcp_retrans": float(tcp["RetransSegs"]),
+                "tcp_inseg": float(tcp["InSegs"]),
+                "tcp_outseg": float(tcp["OutSegs"]),
+                "net_softirq": float(softirq.get("NET_RX", 0) + softirq.get("NET_TX", 0)),
+                "block_softirq": float(softirq.get("BLOCK", 0)),
+                "hardirq": float(hardirq),
+                "cpu_busy": float(stat["cpu_busy"]),
+                "cpu_total": float(stat["cpu_total"]),
+            },
+            "gauges": {
+                "proc_count": float(_count_procs()),
+                "procs_running": float(stat["procs_running"]),
+                "procs_blocked": float(stat["procs_blocked"]),
+                "run_queue": float(run_queue),
+                "load1": load1,
+                "psi_mem_some10": psi_some,
+                "psi_mem_full10": psi_full,
+            },
         }
 
+    def collect(self) -> dict[str, float] | None:
+        return self.compute(self.read_raw())
+
+    def compute(self, snapshot: dict) -> dict[str, float] | None:
+        """Turn a :meth:`read_raw` snapshot into the feature vector."""
+        now = float(snapshot["ts"])
+        raw = snapshot["counters"]
+        gauges = snapshot["gauges"]
+
         prev, prev_ts = self._prev, self._prev_ts
         self._prev, self._prev_ts = raw, now
 
@@ -235,13 +457,13 @@ class FeatureExtractor:
         cpu_busy_delta = raw["cpu_busy"] - prev.get("cpu_busy", raw["cpu_busy"])
         cpu_busy_pct = (cpu_busy_delta / cpu_total_delta * 100.0) if cpu_total_delta > 0 else 0.0
 
-        return {
-            "proc_count": float(_count_procs()),
-            "procs_running": float(stat["procs_running"]),
-            "procs_blocked": float(stat["procs_blocked"]),
+        features = {
+            "proc_count": gauges["proc_count"],
+            "procs_running": gauges["procs_running"],
+            "procs_blocked": gauges["procs_blocked"],
             "ctxt_per_sec": rate("ctxt"),
-            "run_queue": float(run_queue),
-            "load1": load1,
+            "run_queue": gauges["run_queue"],
+            "load1": gauges["load1"],
             "tcp_retrans_per_sec": rate("tcp_retrans"),
             "tcp_inseg_per_sec": rate("tcp_inseg"),
             "tcp_outseg_per_sec": rate("tcp_outseg"),
@@ -251,8 +473,10 @@ class FeatureExtractor:
             "pgmajfault_per_sec": rate("pgmajfault"),
             "pgscan_direct_per_sec": rate("pgscan_direct"),
             "swap_io_per_sec": rate("swap_io"),
-            "psi_mem_some10": psi_some,
-            "psi_mem_full10": psi_full,
+            "psi_mem_some10": gauges["psi_mem_some10"],
+            "psi_mem_full10": gauges["psi_mem_full10"],
             "hardirq_per_sec": rate("hardirq"),
             "cpu_busy_pct": max(0.0, min(100.0, cpu_busy_pct)),
         }
+        features.update(snapshot.get("burst") or {})
+        return features
@@ -0,0 +1,131 @@
+"""Incident coalescing for emitted anomalies.
+
+During a storm every stage can fire on every tick (Stage 1 has no cooldown),
+which used to mean one ``ml_anomalies`` row per feature per tick. The
+:class:`IncidentAggregator` instead keeps one *open incident* per
+``(source, feature)``: consecutive anomalies within ``gap_sec`` of each other
+are merged into it (first/last seen, peak score, count), and the row is
+written once when the incident opens, then updated in place at most every
+``flush_sec`` and once more when it closes. High-severity incidents are the
+exception: their row is updated on every occurrence, because the training
+poison guard excludes snapshots by the row's ``[first_ts, ts]`` span and must
+see a live storm's latest tick.
+
+The row keeps the anomaly shape the readers already know: ``ts`` is the last
+time the incident fired (so "recent anomalies" queries still see a live
+storm), ``score`` / ``severity`` / ``message`` are those of the peak, and
+``first_ts`` / ``count`` describe the span.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+_SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+_HIGH = _SEVERITY_RANK["high"]
+
+
+@dataclass
+class Incident:
+    key: tuple[str, str]
+    record: dict
+    first_ts: float
+    last_ts: float
+    count: int = 1
+    row_id: int | None = None
+    dirty: bool = True
+    closed: bool = False
+    severity: str = "medium"
+
+    def merge(self, anomaly: dict, now: float) -> None:
+        self.count += 1
+        self.last_ts = now
+        if float(anomaly.get("score") or 0.0) > float(self.record.get("score") or 0.0):
+            self.record = anomaly
+        if _SEVERITY_RANK.get(anomaly.get("severity"), 1) > _SEVERITY_RANK.get(self.severity, 1):
+            self.severity = anomaly["severity"]
+        self.dirty = True
+
+    def row(self) -> dict:
+        return {
+            **self.record,
+            "severity": self.severity,
+            "id": self.row_id,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "count": self.count,
+        }
+
+
+class IncidentAggregator:
+    """Merge per-tick anomalies into open incidents and persist them lazily."""
+
+    def __init__(self, *, gap_sec: float, flush_sec: float, max_open: int = 512) -> None:
+        self.gap_sec = gap_sec
+        self.flush_sec = flush_sec
+        self.max_open = max_open
+        self._open: dict[tuple[str, str], Incident] = {}
+        self._closed: list[Incident] = []
+        self._last_flush = 0.0
+        self.stats = {"anomalies": 0, "incidents": 0, "writes": 0}
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def _close(self, inc: Incident) -> None:
+        inc.closed = True
+        if inc.dirty:  # else the row already holds its final state
+            self._closed.append(inc)
+
+    def add(self, anomalies: list[dict], now: float) -> None:
+        for a in anomalies:
+            self.stats["anomalies"] += 1
+            key = (str(a.get("source") or "stage1_baseline"), str(a.get("feature") or a.get("type")))
+            inc = self._open.get(key)
+            if inc is not None and now - inc.last_ts <= self.gap_sec:
+                inc.merge(a, now)
+                continue
+            if inc is not None:
+                self._close(inc)
+            self._open[key] = Incident(
+                key=key, record=a, first_ts=now, last_ts=now, severity=a.get("severity", "medium"),
+            )
+            self.stats["incidents"] += 1
+        self.expire(now)
+
+    def expire(self, now: float) -> None:
+        """Close incidents that went quiet for longer than ``gap_sec``."""
+        for key in [k for k, inc in self._open.items() if now - inc.last_ts > self.gap_sec]:
+            self._close(self._open.pop(key))
+        if len(self._open) > self.max_open:
+            for key in sorted(self._open, key=lambda k: self._open[k].last_ts)[: len(self._open) - self.max_open]:
+                self._close(self._open.pop(key))
+
+    def pending(self, now: float, *, force: bool = False) -> list[Incident]:
+        """Incidents that must be written now.
+
+        New incidents are written right away (the UI sees them on the next
+        poll); updates to open ones wait for ``flush_sec`` unless the incident
+        is high-severity; closed ones carry their final update on the next flush.
+        """
+        due = force or (now - self._last_flush) >= self.flush_sec
+        out = [inc for inc in self._closed if inc.dirty]
+        for inc in self._open.values():
+            if inc.dirty and (inc.row_id is None or due or _SEVERITY_RANK.get(inc.severity, 1) >= _HIGH):
+                out.append(inc)
+        if due:
+            self._last_flush = now
+        return out
+
+    def flush(self, store, now: float, *, force: bool = False) -> int:
+        """Write due incidents through ``store.save_incidents``; return rows written."""
+        batch = self.pending(now, force=force)
+        if not batch:
+            return 0
+        ids = store.save_incidents([inc.row() for inc in batch])
+        for inc, row_id in zip(batch, ids):
+            inc.row_id = row_id
+            inc.dirty = False
+        self._closed = [inc for inc in self._closed if inc.dirty]
+        self.stats["writes"] += len(batch)
+        return len(batch)
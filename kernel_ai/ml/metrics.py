@@ -0,0 +1,125 @@
+"""Prometheus metrics for the ML worker (optional dependency).
+
+The Flask process exports its own metrics via :mod:`kernel_ai.prometheus_setup`;
+the worker is a separate process, so it gets its own registry, exposed either
+on a small HTTP listener (``KERNEL_AI_ML_METRICS_PORT``) or written to a
+node_exporter textfile-collector file (``KERNEL_AI_ML_METRICS_TEXTFILE``) on
+housekeeping. Without ``prometheus_client`` both are silently disabled.
+
+Exported:
+    kernel_ai_ml_tick_seconds                     histogram, whole tick
+    kernel_ai_ml_stage_seconds{stage}             histogram per detector stage
+    kernel_ai_ml_ticks_total / _tick_failures_total
+    kernel_ai_ml_anomalies_total{source}          emitted, before coalescing
+    kernel_ai_ml_state_entries{component}         tracker / whitelist sizes
+    kernel_ai_ml_state_bytes{component}           approx. bytes (housekeeping)
+    kernel_ai_ml_model_loaded_timestamp{model}    last successful (re)load
+"""
+
+from __future__ import annotations
+
+import logging
+
+try:
+    from prometheus_client import (
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        start_http_server,
+        write_to_textfile,
+    )
+
+    _PROMETHEUS_AVAILABLE = True
+except ImportError:
+    _PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger("kernel_ai.ml.metrics")
+
+# Ticks run every ~2s; stages range from microseconds (baseline) to hundreds
+# of ms (process scan on a busy host).
+_TICK_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, float("inf"))
+_STAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, float("inf"))
+
+
+class WorkerMetrics:
+    """Metric objects for one worker process, on a private registry."""
+
+    def __init__(self, *, textfile: str = "") -> None:
+        self.registry = CollectorRegistry()
+        self.textfile = textfile
+        self.tick_seconds = Histogram(
+            "kernel_ai_ml_tick_seconds", "ML worker tick duration in seconds",
+            buckets=_TICK_BUCKETS, registry=self.registry,
+        )
+        self.stage_seconds = Histogram(
+            "kernel_ai_ml_stage_seconds", "ML worker time per detector stage in seconds",
+            ["stage"], buckets=_STAGE_BUCKETS, registry=self.registry,
+        )
+        self.ticks = Counter("kernel_ai_ml_ticks_total", "ML worker ticks completed", registry=self.registry)
+        self.tick_failures = Counter(
+            "kernel_ai_ml_tick_failures_total", "ML worker ticks that raised", registry=self.registry,
+        )
+        self.anomalies = Counter(
+            "kernel_ai_ml_anomalies_total", "Anomalies emitted by source (before incident coalescing)",
+            ["source"], registry=self.registry,
+        )
+        self.state_entries = Gauge(
+            "kernel_ai_ml_state_entries", "Entries held by in-memory detector state",
+            ["component"], registry=self.registry,
+        )
+        self.state_bytes = Gauge(
+            "kernel_ai_ml_state_bytes", "Approximate bytes held by in-memory detector state",
+            ["component"], registry=self.registry,
+        )
+        self.model_loaded = Gauge(
+            "kernel_ai_ml_model_loaded_timestamp", "Unix time of the last successful model (re)load",
+            ["model"], registry=self.registry,
+        )
+        self._emitted_seen: dict[str, int] = {}
+
+    def observe_tick(self, worker, elapsed: float) -> None:
+        """Record one completed tick (timings, emitted anomalies, cheap sizes)."""
+        self.ticks.inc()
+        self.tick_seconds.observe(elapsed)
+        for stage, sec in worker.stage_timings.items():
+            self.stage_seconds.labels(stage=stage).observe(sec)
+        for source, total in worker.emitted.items():
+            delta = total - self._emitted_seen.get(source, 0)
+            if delta > 0:
+                self.anomalies.labels(source=source).inc(delta)
+                self._emitted_seen[source] = total
+        if worker.seq_tracker is not None:
+            for name, n in worker.seq_tracker.sizes().items():
+                self.state_entries.labels(component=f"ngram_{name}").set(n)
+        if worker.incidents is not None:
+            self.state_entries.labels(component="open_incidents").set(len(worker.incidents))
+        for model, ts in worker.model_loaded_at.items():
+            self.model_loaded.labels(model=model).set(ts)
+
+    def observe_housekeeping(self, worker) -> None:
+        """Costlier gauges (Stage 5 byte estimates), then the textfile if configured."""
+        if worker.proc_detector is not None:
+            usage = worker.proc_detector.memory_usage()
+            self.state_bytes.labels(component="stage5").set(usage.pop("bytes", 0))
+            for name, n in usage.items():
+                self.state_entries.labels(component=f"stage5_{name}").set(n)
+        if self.textfile:
+            try:
+                write_to_textfile(self.textfile, self.registry)
+            except OSError as exc:
+                logger.warning("metrics textfile write failed: %s", exc)
+
+
+def create_worker_metrics(cfg) -> WorkerMetrics | None:
+    """Build (and expose) worker metrics if configured and prometheus_client exists."""
+    if not cfg.metrics_port and not cfg.metrics_textfile:
+        return None
+    if not _PROMETHEUS_AVAILABLE:
+        logger.warning("worker metrics requested but prometheus_client is not installed")
+        return None
+    metrics = WorkerMetrics(textfile=cfg.metrics_textfile)
+    if cfg.metrics_port:
+        start_http_server(cfg.metrics_port, addr=cfg.metrics_addr, registry=metrics.registry)
+        logger.info("worker metrics on http://%s:%d/metrics", cfg.metrics_addr, cfg.metrics_port)
+    return metrics
@@ -31,22 +31,29 @@ class IsolationForestModel:
         *,
         contamination: float = 0.02,
         n_estimators: int = 200,
+        max_samples: int | float | str = "auto",
         random_state: int = 42,
+        n_jobs: int = 1,
     ) -> "IsolationForestModel":
         from sklearn.ensemble import IsolationForest
 
         clf = IsolationForest(
             n_estimators=n_estimators,
             contamination=contamination,
+            max_samples=max_samples,
             random_state=random_state,
-            n_jobs=1,
+            n_jobs=n_jobs,
         )
         clf.fit(matrix)
+        # Trees are built in parallel, but the worker scores one vector per tick:
+        # a joblib fan-out there costs far more than it saves.
+        clf.n_jobs = 1
         self.model = clf
         self.meta.update(
             {
                 "contamination": contamination,
                 "n_estimators": n_estimators,
+                "max_samples": max_samples,
                 "n_samples": len(matrix),
                 "n_features": len(self.feature_names),
             }
@@ -2,10 +2,29 @@
 
 from __future__ import annotations
 
+import heapq
+import logging
+import math
+import sys
+from array import array
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from itertools import islice
 
-from kernel_ai.ml.baseline import EwmaBaseline
-from kernel_ai.ml.proc_features import PROC_MIN_STD, PROC_POSITION, PROC_SUBSYSTEM, ProcSample
+from kernel_ai.ml.baseline import Score
+from kernel_ai.ml.proc_features import (
+    PROC_MIN_STD,
+    PROC_POSITION,
+    PROC_SCORE_FEATURES,
+    PROC_SUBSYSTEM,
+    ProcSample,
+)
+
+# Rough per-entry cost of a lineage key: the 2-tuple plus its dict slot (the
+# interned comm strings are shared and not counted).
+_TUPLE_BYTES = 120
+
+logger = logging.getLogger("kernel_ai.ml.proc_baseline")
 
 
 @dataclass
@@ -14,34 +33,206 @@ class LineageWhitelist:
 
     A pair becomes "normal" only after ``min_count`` observations (STIDE-style
     poison guard: a one-off attack edge never enters the whitelist).
+
+    Memory is capped at ``max_entries`` pairs. Eviction never drops unflushed
+    ``_pending`` increments (the persisted ``ml_proc_lineage`` count stays the
+    true total) and prefers rare pairs, which only ever under-count and so
+    cannot whitelist an edge early. Established pairs evicted beyond that are
+    kept as a compact hash in ``_established`` so they stay whitelisted; that
+    set is itself an LRU of at most ``max_entries`` hashes, so the whole table
+    stays within ``max_entries`` pairs plus as many hashes. A hash pushed out
+    of it makes its pair count from zero again: under-counting, never early.
+    Failed flushes fold their counts back into ``_pending``; past
+    ``max_pending`` pairs the lowest counts are dropped, so a long store
+    outage cannot pin an unbounded set of keys outside the eviction above.
     """
 
     min_count: int = 3
     min_age_sec: float = 2.0
     max_alert_age_sec: float = 120.0
-    _counts: dict[tuple[str, str], int] = field(default_factory=dict)
+    max_entries: int = 20000
+    max_pending: int = 10000
+    _counts: OrderedDict[tuple[str, str], int] = field(default_factory=OrderedDict)
     _pending: dict[tuple[str, str], int] = field(default_factory=dict)
+    _established: OrderedDict[int, None] = field(default_factory=OrderedDict)
 
     def observe(self, parent: str, child: str) -> int:
         """Increment and return the new count for this edge."""
-        key = (parent or "?", child or "?")
-        self._counts[key] = self._counts.get(key, 0) + 1
+        key = (sys.intern(parent or "?"), sys.intern(child or "?"))
+        count = self._counts.get(key)
+        if count is None:
+            h = hash(key)
+            count = self.min_count if h in self._established else 0
+            self._established.pop(h, None)
+        self._counts[key] = count + 1
+        self._counts.move_to_end(key)
         self._pending[key] = self._pending.get(key, 0) + 1
-        return self._counts[key]
+        self._evict()
+        return count + 1
 
     def is_below_threshold(self, parent: str, child: str) -> bool:
         key = (parent or "?", child or "?")
-        return self._counts.get(key, 0) < self.min_count
+        count = self._counts.get(key)
+        if count is None:
+            return hash(key) not in self._established
+        return count < self.min_count
 
     def drain_pending(self) -> list[tuple[str, str, int]]:
         pending = self._pending
         self._pending = {}
         return [(p, c, n) for (p, c), n in pending.items()]
 
+    def restore_pending(self, edges: list[tuple[str, str, int]]) -> None:
+        """Fold back drained counts whose flush failed (retried next flush)."""
+        for parent, child, count in edges:
+            key = (parent, child)
+            self._pending[key] = self._pending.get(key, 0) + count
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            for key in heapq.nsmallest(overflow, self._pending, key=self._pending.__getitem__):
+                del self._pending[key]
+            logger.warning("lineage flush backlog over %d pairs: dropped %d lowest-count", self.max_pending, overflow)
+
     def load_counts(self, rows: list[tuple[str, str, int]]) -> None:
         for parent, child, count in rows or []:
-            key = (str(parent), str(child))
+            key = (sys.intern(str(parent)), sys.intern(str(child)))
             self._counts[key] = max(self._counts.get(key, 0), int(count))
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _evict(self) -> None:
+        if len(self._counts) <= self.max_entries:
+            return
+        # Evict in batches (~10% headroom) so the scan cost is amortised.
+        target = int(self.max_entries * 0.9)
+        excess = len(self._counts) - target
+        rare = list(islice(
+            (k for k, n in self._counts.items() if n < self.min_count and k not in self._pending),
+            excess,
+        ))
+        for key in rare:
+            del self._counts[key]
+        excess -= len(rare)
+        if excess <= 0:
+            return
+        # Still over: demote least-recently-seen established pairs to hashes.
+        for key in list(islice((k for k in self._counts if k not in self._pending), excess)):
+            if self._counts.pop(key) >= self.min_count:
+                self._established[hash(key)] = None
+        while len(self._established) > self.max_entries:
+            self._established.popitem(last=False)
+
+    def memory_bytes(self) -> int:
+        return (
+            sys.getsizeof(self._counts)
+            + sys.getsizeof(self._pending)
+            + sys.getsizeof(self._established)
+            + len(self._counts) * _TUPLE_BYTES
+        )
+
+
+class CommBaselines:
+    """Per-comm EWMA mean/variance for ``PROC_SCORE_FEATURES``.
+
+    Same update rule as :class:`~kernel_ai.ml.baseline.EwmaBaseline`, but comm
+    names are interned to small integer ids and the stats live in flat
+    ``array('d')`` columns (one row per comm), instead of one ``_Stat`` object
+    per ``comm::feature`` string. Rows unused for ``ttl_sec`` are freed, and
+    the least-recently-seen comm is recycled once ``max_comms`` is reached.
+    """
+
+    def __init__(self, *, alpha: float, warmup_samples: int, max_comms: int = 4096,
+                 ttl_sec: float = 6 * 3600.0) -> None:
+        self.alpha = alpha
+        self.warmup = warmup_samples
+        self.max_comms = max(1, max_comms)
+        self.ttl_sec = ttl_sec
+        self._width = len(PROC_SCORE_FEATURES)
+        # comm -> row id, in least-recently-seen order.
+        self._ids: OrderedDict[str, int] = OrderedDict()
+        self._free: list[int] = []
+        self._mean = array("d")
+        self._var = array("d")
+        self._count = array("l")
+        self._seen = array("d")
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _row(self, comm: str, now: float) -> int:
+        row = self._ids.get(comm)
+        if row is not None:
+            self._ids.move_to_end(comm)
+            self._seen[row] = now
+            return row
+        if len(self._ids) >= self.max_comms:
+            _old, freed = self._ids.popitem(last=False)
+            self._free.append(freed)
+        if self._free:
+            row = self._free.pop()
+            base = row * self._width
+            for i in range(self._width):
+                self._mean[base + i] = 0.0
+                self._var[base + i] = 0.0
+            self._count[row] = 0
+            self._seen[row] = now
+        else:
+            row = len(self._count)
+            self._mean.extend([0.0] * self._width)
+            self._var.extend([0.0] * self._width)
+            self._count.append(0)
+            self._seen.append(now)
+        self._ids[sys.intern(comm)] = row
+        return row
+
+    def update_and_score(self, comm: str, vector: dict[str, float], now: float) -> list[Score]:
+        """Score ``vector`` against this comm's baseline, *then* fold it in."""
+        row = self._row(comm, now)
+        base = row * self._width
+        count = self._count[row]
+        warm = count < self.warmup
+        out: list[Score] = []
+        for i, feat in enumerate(PROC_SCORE_FEATURES):
+            value = float(vector.get(feat, 0.0))
+            mean = self._mean[base + i]
+            var = self._var[base + i]
+            std = math.sqrt(max(0.0, var))
+            std_eff = max(std, PROC_MIN_STD.get(feat, 1.0), 1e-9)
+            z = (value - mean) / std_eff if count > 0 else 0.0
+            out.append(Score(name=f"{comm}::{feat}", value=value, mean=mean, std=std, z=z, warm=warm))
+            if count == 0:
+                self._mean[base + i] = value
+                self._var[base + i] = 0.0
+            else:
+                diff = value - mean
+                incr = self.alpha * diff
+                self._mean[base + i] = mean + incr
+                self._var[base + i] = (1.0 - self.alpha) * (var + diff * incr)
+        self._count[row] = count + 1
+        return out
+
+    def evict_stale(self, now: float) -> int:
+        """Free rows of comms not seen for ``ttl_sec``. Returns rows freed."""
+        freed = 0
+        cutoff = now - self.ttl_sec
+        while self._ids:
+            comm, row = next(iter(self._ids.items()))
+            if self._seen[row] >= cutoff:
+                break
+            del self._ids[comm]
+            self._free.append(row)
+            freed += 1
+        return freed
+
+    def memory_bytes(self) -> int:
+        arrays = (self._mean, self._var, self._count, self._seen)
+        return (
+            sys.getsizeof(self._ids)
+            + sys.getsizeof(self._free)
+            + sum(a.buffer_info()[1] * a.itemsize for a in arrays)
+        )
 
 
 class ProcBaselineDetector:
@@ -57,23 +248,69 @@ class ProcBaselineDetector:
         lineage_min_count: int = 3,
         cooldown_sec: float = 20.0,
         max_emit_per_tick: int = 4,
+        max_comms: int = 4096,
+        state_ttl_sec: float = 6 * 3600.0,
+        max_seen_pids: int = 20000,
+        max_lineage: int = 20000,
     ) -> None:
         self.z_warn = z_warn
         self.z_crit = z_crit
         self.cooldown_sec = cooldown_sec
         self.max_emit = max_emit_per_tick
-        self.baseline = EwmaBaseline(alpha=alpha, warmup_samples=warmup_samples)
-        self.lineage = LineageWhitelist(min_count=lineage_min_count)
-        self._last_emit: dict[str, float] = {}
-        self._seen_pids: set[int] = set()
+        self.max_seen_pids = max(1, max_seen_pids)
+        self.baseline = CommBaselines(
+            alpha=alpha,
+            warmup_samples=warmup_samples,
+            max_comms=max_comms,
+            ttl_sec=state_ttl_sec,
+        )
+        self.lineage = LineageWhitelist(
+            min_count=lineage_min_count,
+            max_entries=max_lineage,
+            max_pending=max(1, max_lineage // 2),
+        )
+        # Cooldown key -> last emit ts, oldest first. An expired cooldown is
+        # the same as no entry, so expired keys are dropped on every emit.
+        self._last_emit: OrderedDict[str, float] = OrderedDict()
+        # Pids whose lineage edge was already observed (LRU, capped).
+        self._seen_pids: OrderedDict[int, None] = OrderedDict()
 
     def _cooldown_ok(self, key: str, now: float) -> bool:
         last = self._last_emit.get(key, 0.0)
         if (now - last) < self.cooldown_sec:
             return False
         self._last_emit[key] = now
+        self._last_emit.move_to_end(key)
+        while self._last_emit:
+            oldest, ts = next(iter(self._last_emit.items()))
+            if (now - ts) < self.cooldown_sec:
+                break
+            del self._last_emit[oldest]
         return True
 
+    def _mark_seen(self, pid: int) -> None:
+        self._seen_pids[pid] = None
+        if len(self._seen_pids) > self.max_seen_pids:
+            self._seen_pids.popitem(last=False)
+
+    def evict_stale(self, now: float) -> int:
+        """Drop per-comm baselines idle for longer than the state TTL."""
+        return self.baseline.evict_stale(now)
+
+    def memory_usage(self) -> dict[str, int]:
+        """Entry counts and approximate bytes of the bounded Stage 5 state."""
+        baseline_bytes = self.baseline.memory_bytes()
+        lineage_bytes = self.lineage.memory_bytes()
+        other_bytes = sys.getsizeof(self._last_emit) + sys.getsizeof(self._seen_pids)
+        return {
+            "comms": len(self.baseline),
+            "lineage_edges": len(self.lineage),
+            "lineage_established_hashed": len(self.lineage._established),
+            "cooldowns": len(self._last_emit),
+            "seen_pids": len(self._seen_pids),
+            "bytes": baseline_bytes + lineage_bytes + other_bytes,
+        }
+
     def _meta(self, sample: ProcSample, kind: str) -> dict:
         return {
             "stage": 5,
@@ -92,14 +329,13 @@ class ProcBaselineDetector:
             return out
 
         # --- lineage (observe each pid once, after it is old enough to score) ---
-        if len(self._seen_pids) > 20000:
-            self._seen_pids.clear()
         for sample in samples:
             if sample.pid in self._seen_pids:
+                self._seen_pids.move_to_end(sample.pid)
                 continue
             if sample.age_sec < self.lineage.min_age_sec:
                 continue  # wait until the child settles; don't mark seen yet
-            self._seen_pids.add(sample.pid)
+            self._mark_seen(sample.pid)
             count = self.lineage.observe(sample.parent_comm, sample.comm)
             if sample.age_sec > self.lineage.max_alert_age_sec:
                 continue  # learn long-lived edges silently
@@ -163,25 +399,21 @@ class ProcBaselineDetector:
                 return out
 
         # --- per-comm EWMA (fd / threads / rss) ---
-        vectors: dict[str, float] = {}
+        # One vector per comm per tick (the last sample of a comm wins).
         owners: dict[str, ProcSample] = {}
-        min_std: dict[str, float] = {}
         for sample in samples:
-            for feat, value in sample.score_vector().items():
-                key = f"{sample.comm}::{feat}"
-                vectors[key] = value
-                owners[key] = sample
-                min_std[key] = PROC_MIN_STD.get(feat, 1.0)
-
-        scores = self.baseline.update_and_score(vectors, min_std)
-        ranked = sorted(scores.values(), key=lambda s: s.z, reverse=True)
+            owners[sample.comm] = sample
+        scores: list[Score] = []
+        for comm, sample in owners.items():
+            scores.extend(self.baseline.update_and_score(comm, sample.score_vector(), now))
+        ranked = sorted(scores, key=lambda s: s.z, reverse=True)
         for sc in ranked:
             if sc.warm or sc.z < self.z_warn or sc.value <= sc.mean:
                 continue
-            sample = owners.get(sc.name)
+            comm, _, feat = sc.name.rpartition("::")
+            sample = owners.get(comm)
             if sample is None:
                 continue
-            feat = sc.name.split("::", 1)[-1]
             ckey = f"proc:{sample.comm}:{feat}"
             if not self._cooldown_ok(ckey, now):
                 continue
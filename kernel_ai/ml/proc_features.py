@@ -3,14 +3,27 @@
 Host-wide Stages 1–2 cannot name *which* process is odd. This module samples a
 bounded set of PIDs and builds a small feature vector + parent→child lineage
 edge per process. No root required; io/fd best-effort when readable.
+
+The scan is incremental: ``/proc/<pid>/stat`` is the only file read for every
+pid each tick (plus a ``stat()`` of ``/proc/<pid>``, whose owner follows the
+euid). comm, uids and parent_comm are cached per ``(pid, starttime)``; uids
+are re-read when the directory owner changes (setuid / commit_creds without
+an exec) and parent_comm when the ppid changes (reparenting). fd counts, rss
+and uids are refreshed every tick for the shortlist that the cheap interest
+ranking selects.
+Both the stat pass and the shortlist refresh fan out across the shared /proc
+scan pool (:mod:`kernel_ai.collectors.fanout`).
 """
 
 from __future__ import annotations
 
+import heapq
 import os
 import time
 from dataclasses import dataclass, field
 
+from kernel_ai.collectors.fanout import fan_out
+
 
 # Helix band for process/lineage mutations (scheduler region).
 PROC_POSITION = 0.12
@@ -99,17 +112,14 @@ def _read_uids(pid: int) -> tuple[int, int]:
     return ruid, euid
 
 
-def _read_vm_rss_mb(pid: int) -> float:
+def _read_statm_rss_mb(pid: int, page_size: int) -> float:
+    """Resident set size from ``/proc/<pid>/statm`` (size resident shared ...)."""
     try:
-        with open(f"/proc/{pid}/status", "r", encoding="utf-8", errors="ignore") as fh:
-            for line in fh:
-                if line.startswith("VmRSS:"):
-                    # kB
-                    kb = float(line.split()[1])
-                    return kb / 1024.0
+        with open(f"/proc/{pid}/statm", "r", encoding="utf-8", errors="ignore") as fh:
+            pages = int(fh.read().split()[1])
     except (OSError, ValueError, IndexError):
-        pass
-    return 0.0
+        return 0.0
+    return pages * page_size / (1024.0 * 1024.0)
 
 
 def _count_fds(pid: int) -> int:
@@ -137,6 +147,61 @@ def _clk_tck() -> float:
         return 100.0
 
 
+def _page_size() -> int:
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE"))
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+
+def _interest(age_sec: float, ruid: int, euid: int, fd_count: int, num_threads: int) -> float:
+    """Prefer young / privileged-odd / fd-heavy processes for the budget."""
+    interest = 0.0
+    if age_sec < 60:
+        interest += 5.0 - min(5.0, age_sec / 12.0)
+    if euid == 0 and ruid != 0:
+        interest += 8.0
+    if fd_count > 32:
+        interest += min(4.0, fd_count / 64.0)
+    if num_threads > 8:
+        interest += 1.0
+    return interest
+
+
+@dataclass
+class _ProcStatic:
+    """Per-process fields cached for the lifetime of one ``(pid, starttime)``.
+
+    ``comm`` is part of the key too: an exec (possibly of a setuid binary)
+    keeps pid and starttime but changes comm, and must re-read the uids.
+    ``owner`` (the ``/proc/<pid>`` uid) and ``ppid`` are the cheap change
+    signals for uids and parent_comm in between.
+    ``fd_count`` is the last value counted, used for cheap ranking only.
+    """
+
+    starttime: int
+    comm: str
+    ppid: int
+    parent_comm: str
+    owner: int
+    ruid: int
+    euid: int
+    fd_count: int = 0
+
+
+def _owner_uid(pid: int) -> int:
+    """Owner of ``/proc/<pid>``: the euid (root once the task is non-dumpable)."""
+    try:
+        return os.stat(f"/proc/{pid}").st_uid
+    except OSError:
+        return -1
+
+
+def _stat_or_none(pid: int) -> tuple[int, tuple[str, str, int, int, int, int], int] | None:
+    stat = _parse_stat(pid)
+    return (pid, stat, _owner_uid(pid)) if stat is not None else None
+
+
 class ProcFeatureExtractor:
     """Sample up to ``max_pids`` interesting processes each tick."""
 
@@ -144,7 +209,9 @@ class ProcFeatureExtractor:
         self.max_pids = max(8, max_pids)
         self._boot = _boot_time()
         self._hz = _clk_tck()
+        self._page = _page_size()
         self._comm_cache: dict[int, str] = {}
+        self._static: dict[int, _ProcStatic] = {}
 
     def _parent_comm(self, ppid: int) -> str:
         if ppid <= 0:
@@ -156,52 +223,84 @@ class ProcFeatureExtractor:
         self._comm_cache[ppid] = name
         return name
 
+    def _static_for(self, pid: int, comm: str, ppid: int, starttime: int, owner: int) -> _ProcStatic:
+        info = self._static.get(pid)
+        if info is None or info.starttime != starttime or info.comm != comm:
+            ruid, euid = _read_uids(pid)
+            info = _ProcStatic(
+                starttime=starttime,
+                comm=comm,
+                ppid=ppid,
+                parent_comm=self._parent_comm(ppid),
+                owner=owner,
+                ruid=ruid,
+                euid=euid,
+                # Count once on first sight so fd-heavy pids can rank later.
+                fd_count=_count_fds(pid),
+            )
+            self._static[pid] = info
+            return info
+        if info.owner != owner:
+            # Credentials changed in place (setuid, commit_creds): no exec, same comm.
+            info.owner = owner
+            info.ruid, info.euid = _read_uids(pid)
+        if info.ppid != ppid:
+            info.ppid = ppid
+            info.parent_comm = self._parent_comm(ppid)
+        return info
+
     def collect(self) -> list[ProcSample]:
         now = time.time()
-        candidates: list[tuple[float, ProcSample]] = []
         try:
             pids = [int(d) for d in os.listdir("/proc") if d.isdigit()]
         except OSError:
             return []
 
-        # Refresh lightly; drop stale cache entries opportunistically.
-        if len(self._comm_cache) > 4096:
-            self._comm_cache.clear()
+        parsed: dict[int, tuple[str, str, int, int, int, int]] = {}
+        owners: dict[int, int] = {}
+        for pid, stat, owner in fan_out(_stat_or_none, pids):
+            parsed[pid] = stat
+            owners[pid] = owner
+            self._comm_cache[pid] = stat[0]
 
-        for pid in pids:
-            parsed = _parse_stat(pid)
-            if parsed is None:
-                continue
-            comm, _state, ppid, _minflt, num_threads, starttime = parsed
-            self._comm_cache[pid] = comm
+        # Evict exited pids (instead of dropping the whole cache at a size cap).
+        for cache in (self._comm_cache, self._static):
+            for dead in [p for p in cache if p not in parsed]:
+                del cache[dead]
+
+        # Pass 1: rank every pid on cheap fields (stat + cached statics).
+        ranked: list[tuple[float, int, int, int, float, _ProcStatic]] = []
+        for pid, (comm, _state, ppid, _minflt, num_threads, starttime) in parsed.items():
+            info = self._static_for(pid, comm, ppid, starttime, owners[pid])
             age_sec = max(0.0, now - (self._boot + starttime / self._hz))
-            ruid, euid = _read_uids(pid)
-            fd_count = _count_fds(pid)
-            vm_rss_mb = _read_vm_rss_mb(pid)
-            parent_comm = self._parent_comm(ppid)
+            interest = _interest(age_sec, info.ruid, info.euid, info.fd_count, num_threads)
+            ranked.append((interest, pid, ppid, num_threads, age_sec, info))
+
+        # Pass 2: refresh fd count, rss and uids only for the shortlist, then re-rank.
+        shortlist = heapq.nlargest(self.max_pids * 2, ranked, key=lambda r: r[0])
+        fresh = fan_out(
+            lambda r: (_count_fds(r[1]), _read_statm_rss_mb(r[1], self._page), _read_uids(r[1])),
+            shortlist,
+            min_shard=8,
+        )
+        candidates: list[tuple[float, ProcSample]] = []
+        for (_interest_cheap, pid, ppid, num_threads, age_sec, info), (fd_count, rss_mb, uids) in zip(shortlist, fresh):
+            info.fd_count = fd_count
+            info.ruid, info.euid = uids
             sample = ProcSample(
                 pid=pid,
                 ppid=ppid,
-                comm=comm,
-                parent_comm=parent_comm,
-                ruid=ruid,
-                euid=euid,
+                comm=info.comm,
+                parent_comm=info.parent_comm,
+                ruid=info.ruid,
+                euid=info.euid,
                 age_sec=age_sec,
                 num_threads=num_threads,
-                fd_count=fd_count,
-                vm_rss_mb=vm_rss_mb,
+                fd_count=info.fd_count,
+                vm_rss_mb=rss_mb,
             )
             sample.features = sample.score_vector()
-            # Prefer young / privileged-odd / fd-heavy processes for the budget.
-            interest = 0.0
-            if age_sec < 60:
-                interest += 5.0 - min(5.0, age_sec / 12.0)
-            if euid == 0 and ruid != 0:
-                interest += 8.0
-            if fd_count > 32:
-                interest += min(4.0, fd_count / 64.0)
-            if num_threads > 8:
-                interest += 1.0
+            interest = _interest(age_sec, info.ruid, info.euid, info.fd_count, num_threads)
             candidates.append((interest, sample))
 
         candidates.sort(key=lambda x: x[0], reverse=True)
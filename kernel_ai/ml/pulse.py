@@ -0,0 +1,133 @@
+"""Live "ML pulse": the worker's latest tick, shared with Flask through mmap.
+
+The dashboard otherwise only sees ML state that went through the store. The
+worker already holds the live feature vector, z-scores and stage verdicts in
+memory every tick, so it publishes a compact JSON snapshot of them into a
+small fixed-size file (tmpfs by default) guarded by a seqlock:
+
+    offset 0   magic   8s   b"KAIPULS1"
+    offset 8   seq     u64  odd while a write is in progress
+    offset 16  ts      f64  unix time of the tick
+    offset 24  length  u32  payload bytes
+    offset 32  payload      UTF-8 JSON, at most ``capacity`` bytes
+
+The single writer bumps ``seq`` to odd, writes ts/length/payload, then bumps
+it to even. Readers copy the payload and retry if ``seq`` was odd or changed
+meanwhile, so a request never blocks the worker and never sees a torn tick.
+Reading costs one memcpy and a ``json.loads``: no DB query, and nothing the
+worker waits on (request threads only share a lock around the mapping cache).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+
+logger = logging.getLogger("kernel_ai.ml.pulse")
+
+MAGIC = b"KAIPULS1"
+_HEADER = struct.Struct("<8sQdI4x")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+_BODY = struct.Struct("<dI")
+_BODY_OFFSET = 16
+
+DEFAULT_CAPACITY = 64 * 1024
+
+
+class PulseWriter:
+    """Single-writer side (the ML worker)."""
+
+    def __init__(self, path: str, *, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.path = path
+        self.capacity = capacity
+        size = _HEADER.size + capacity
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        self._seq = 0
+        _HEADER.pack_into(self._mm, 0, MAGIC, 0, 0.0, 0)
+
+    def publish(self, payload: dict, ts: float) -> bool:
+        """Publish one tick; returns False (and skips) if it does not fit."""
+        data = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        if len(data) > self.capacity:
+            logger.warning("pulse payload too large (%d > %d bytes), skipped", len(data), self.capacity)
+            return False
+        mm = self._mm
+        self._seq += 1
+        _SEQ.pack_into(mm, _SEQ_OFFSET, self._seq)  # odd: write in progress
+        _BODY.pack_into(mm, _BODY_OFFSET, ts, len(data))
+        mm[_HEADER.size:_HEADER.size + len(data)] = data
+        self._seq += 1
+        _SEQ.pack_into(mm, _SEQ_OFFSET, self._seq)  # even: consistent
+        return True
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+# Per-process reader mapping, re-opened if the worker recreated the file.
+# Request threads share it: lookups and replacement go through the lock, and a
+# replaced mapping is not closed explicitly, since another thread may still be
+# copying out of it; it is unmapped once the last reference goes away.
+_reader: dict = {}
+_reader_lock = threading.Lock()
+
+
+def _mapping(path: str) -> mmap.mmap | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (st.st_dev, st.st_ino, st.st_size)
+    with _reader_lock:
+        cached = _reader.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        if st.st_size < _HEADER.size:
+            return None
+        try:
+            with open(path, "rb") as fh:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # recreated or truncated since the stat
+            return None
+        if mm[:len(MAGIC)] != MAGIC:
+            mm.close()
+            return None
+        _reader[path] = (key, mm)
+        return mm
+
+
+def read_pulse(path: str, *, retries: int = 50) -> dict | None:
+    """Latest consistent tick as ``{"seq", "ts", "payload"}``, or None if unavailable."""
+    mm = _mapping(path)
+    if mm is None:
+        return None
+    limit = len(mm) - _HEADER.size
+    for _ in range(retries):
+        (seq,) = _SEQ.unpack_from(mm, _SEQ_OFFSET)
+        if seq == 0:
+            return None  # worker started but has not published yet
+        if seq & 1:
+            continue
+        ts, length = _BODY.unpack_from(mm, _BODY_OFFSET)
+        data = mm[_HEADER.size:_HEADER.size + min(length, limit)]
+        if _SEQ.unpack_from(mm, _SEQ_OFFSET)[0] != seq:
+            continue
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            continue
+        return {"seq": seq // 2, "ts": ts, "payload": payload}
+    return None
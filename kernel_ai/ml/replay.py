@@ -0,0 +1,312 @@
+"""Offline record / replay harness for the ML worker.
+
+Modes:
+  record  — capture the raw inputs of each tick (global procfs counters,
+            Stage 4 syscall bursts, Stage 5 process samples) to a gzip JSONL file
+  replay  — feed a recording through :class:`MLWorker` (features, baselines,
+            IsolationForest, STIDE, Stage 5) with no sleeping, and report
+            throughput, per-stage latency, anomalies and incidents by source
+
+Replay never touches the database: anomalies / n-grams / lineage go to a
+:class:`NullStore` that only counts them. The worker's clock follows the
+recorded timestamps, so cooldowns and drift buckets behave as they did live.
+
+Examples:
+  python -m kernel_ai.ml.replay record --out incident.jsonl.gz --ticks 300
+  python -m kernel_ai.ml.replay replay incident.jsonl.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gzip
+import json
+import logging
+import time
+from collections import Counter
+from typing import Iterator
+
+from kernel_ai.ml.config import MLConfig
+from kernel_ai.ml.features import FeatureExtractor
+from kernel_ai.ml.proc_features import ProcFeatureExtractor, ProcSample
+from kernel_ai.ml.sequence import SyscallSampler
+
+logger = logging.getLogger("kernel_ai.ml.replay")
+
+FORMAT_VERSION = 1
+
+
+class NullStore:
+    """MLStore that persists nothing and counts what the worker emits."""
+
+    def __init__(self) -> None:
+        self.anomalies: Counter[str] = Counter()
+        self.incidents: Counter[str] = Counter()
+        self.feature_rows = 0
+        self._next_id = 0
+
+    def insert_feature_snapshot(self, features: dict[str, float]) -> None:
+        self.feature_rows += 1
+
+    def insert_anomalies(self, anomalies: list[dict]) -> None:
+        self.anomalies.update(str(a.get("source") or "unknown") for a in anomalies)
+
+    def save_incidents(self, incidents: list[dict]) -> list[int]:
+        ids = []
+        for inc in incidents:
+            if inc.get("id") is None:
+                self._next_id += 1
+                self.incidents[str(inc.get("source") or "unknown")] += 1
+                ids.append(self._next_id)
+            else:
+                ids.append(inc["id"])
+        return ids
+
+    def upsert_ngram_counts(self, n: int, counts: dict[str, int]) -> None:
+        pass
+
+    def insert_proc_snapshots(self, rows: list[dict]) -> None:
+        pass
+
+    def upsert_lineage_counts(self, edges: list[tuple[str, str, int]]) -> None:
+        pass
+
+    def load_lineage_counts(self) -> list[tuple[str, str, int]]:
+        return []
+
+    def save_baseline(self, rows: list[dict]) -> None:
+        pass
+
+    def load_baseline(self) -> list[dict]:
+        return []
+
+    def save_drift_state(self, state: dict) -> None:
+        pass
+
+    def load_drift_state(self) -> dict | None:
+        return None
+
+    def insert_drift(self, record: dict) -> None:
+        pass
+
+    def prune(self, features_hours: int, anomalies_hours: int, drift_hours: int | None = None) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------- recording
+
+
+def record(path: str, cfg: MLConfig, *, ticks: int, interval_sec: float | None = None) -> int:
+    """Sample ``ticks`` ticks from the live host into ``path``; return ticks written.
+
+    Each line is one tick; the first line is a header describing the capture.
+    """
+    interval = cfg.interval_sec if interval_sec is None else interval_sec
+    extractor = FeatureExtractor(burst_period_sec=max(0, cfg.burst_sample_ms) / 1000.0)
+    sampler = None
+    if cfg.enable_stage4 and cfg.seq_source == "procfs":
+        sampler = SyscallSampler(max_pids=cfg.seq_max_pids, hot_fraction=cfg.seq_hot_fraction)
+    procs = ProcFeatureExtractor(max_pids=cfg.proc_max_pids) if cfg.enable_stage5 else None
+    bursts = max(1, cfg.seq_subsamples)
+    gap = max(0.0, cfg.seq_subsample_gap_ms / 1000.0)
+
+    written = 0
+    try:
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            header = {
+                "version": FORMAT_VERSION,
+                "interval_sec": interval,
+                "seq_subsamples": bursts if sampler is not None else 0,
+                "stage5": procs is not None,
+            }
+            fh.write(json.dumps(header) + "\n")
+            for _ in range(ticks):
+                start = time.time()
+                tick: dict = {"raw": extractor.read_raw(), "syscalls": [], "procs": []}
+                if sampler is not None:
+                    sampler.refresh()
+                    for i in range(bursts):
+                        tick["syscalls"].append(sampler.sample())
+                        if i < bursts - 1 and gap:
+                            time.sleep(gap)
+                if procs is not None:
+                    tick["procs"] = [dataclasses.asdict(s) for s in procs.collect()]
+                fh.write(json.dumps(tick, separators=(",", ":")) + "\n")
+                written += 1
+                time.sleep(max(0.0, interval - (time.time() - start)))
+    finally:
+        extractor.close()
+        if sampler is not None:
+            sampler.close()
+    return written
+
+
+def read_ticks(path: str) -> tuple[dict, Iterator[dict]]:
+    """Open a recording: return ``(header, iterator over tick records)``."""
+    fh = gzip.open(path, "rt", encoding="utf-8")
+    header = json.loads(fh.readline() or "{}")
+    if header.get("version") != FORMAT_VERSION:
+        fh.close()
+        raise ValueError(f"unsupported recording version: {header.get('version')!r}")
+
+    def ticks() -> Iterator[dict]:
+        with fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+    return header, ticks()
+
+
+# ---------------------------------------------------------------- replay sources
+
+
+class _ReplayFeatures(FeatureExtractor):
+    """FeatureExtractor whose procfs read returns the current recorded tick."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.snapshot: dict = {}
+
+    def read_raw(self) -> dict:
+        return self.snapshot
+
+
+class _ReplaySampler:
+    """SyscallSampler stand-in that hands out the tick's recorded bursts."""
+
+    def __init__(self) -> None:
+        self.bursts: list[dict[int, str]] = []
+
+    def load(self, bursts: list[dict]) -> None:
+        # JSON object keys are strings; the tracker keys history by int pid.
+        self.bursts = [{int(pid): name for pid, name in b.items()} for b in bursts]
+
+    def refresh(self) -> None:
+        pass
+
+    def sample(self) -> dict[int, str]:
+        return self.bursts.pop(0) if self.bursts else {}
+
+    def close(self) -> None:
+        pass
+
+
+class _ReplayProcs:
+    """ProcFeatureExtractor stand-in returning the tick's recorded samples."""
+
+    def __init__(self) -> None:
+        self.samples: list[ProcSample] = []
+
+    def load(self, rows: list[dict]) -> None:
+        self.samples = [ProcSample(**row) for row in rows]
+
+    def collect(self) -> list[ProcSample]:
+        return self.samples
+
+
+# ---------------------------------------------------------------- replay
+
+
+def _percentile(sorted_vals: list[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[idx]
+
+
+def run_replay(path: str, cfg: MLConfig | None = None) -> dict:
+    """Replay a recording through MLWorker as fast as possible; return a report."""
+    from kernel_ai.ml.worker import MLWorker
+
+    header, ticks = read_ticks(path)
+    base = cfg or MLConfig()
+    has_seq = int(header.get("seq_subsamples") or 0) > 0
+    cfg = dataclasses.replace(
+        base,
+        enable_stage4=base.enable_stage4 and has_seq,
+        enable_stage5=bool(header.get("stage5")),
+        seq_source="procfs",
+        seq_subsamples=max(1, int(header.get("seq_subsamples") or 1)),
+        seq_subsample_gap_ms=0,
+    )
+    store = NullStore()
+    worker = MLWorker(cfg, store=store)
+    if worker._seq_loader is not None:
+        worker._seq_loader.join()  # score from the first tick, as a warm worker would
+
+    features = _ReplayFeatures()
+    worker.extractor.close()
+    worker.extractor = features
+    sampler = _ReplaySampler()
+    if worker.seq_sampler is not None:
+        worker.seq_sampler = sampler
+    procs = _ReplayProcs()
+    if worker.proc_extractor is not None:
+        worker.proc_extractor = procs
+
+    clock = {"now": 0.0}
+    worker._clock = lambda: clock["now"]
+
+    timings: dict[str, list[float]] = {}
+    tick_times: list[float] = []
+    count = 0
+    started = time.perf_counter()
+    for tick in ticks:
+        features.snapshot = tick["raw"]
+        clock["now"] = float(tick["raw"]["ts"])
+        sampler.load(tick.get("syscalls") or [])
+        procs.load(tick.get("procs") or [])
+        t0 = time.perf_counter()
+        worker._tick()
+        tick_times.append(time.perf_counter() - t0)
+        for stage, sec in worker.stage_timings.items():
+            timings.setdefault(stage, []).append(sec)
+        count += 1
+    elapsed = time.perf_counter() - started
+
+    def summary(vals: list[float]) -> dict[str, float]:
+        vals = sorted(vals)
+        return {
+            "p50_ms": round(_percentile(vals, 0.50) * 1000.0, 3),
+            "p95_ms": round(_percentile(vals, 0.95) * 1000.0, 3),
+            "max_ms": round((vals[-1] if vals else 0.0) * 1000.0, 3),
+        }
+
+    return {
+        "ticks": count,
+        "elapsed_sec": round(elapsed, 4),
+        "ticks_per_sec": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "tick": summary(tick_times),
+        "stages": {stage: summary(vals) for stage, vals in timings.items()},
+        "anomalies": dict(worker.emitted),
+        "incidents": dict(store.incidents),
+    }
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    parser = argparse.ArgumentParser(description="Record / replay ML worker ticks")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    rec = sub.add_parser("record", help="capture live procfs ticks to a gzip JSONL file")
+    rec.add_argument("--out", required=True)
+    rec.add_argument("--ticks", type=int, default=300)
+    rec.add_argument("--interval", type=float, default=None, help="seconds between ticks")
+    rep = sub.add_parser("replay", help="replay a recording through MLWorker")
+    rep.add_argument("path")
+    args = parser.parse_args()
+
+    cfg = MLConfig()
+    if args.mode == "record":
+        n = record(args.out, cfg, ticks=args.ticks, interval_sec=args.interval)
+        logger.info("recorded %d ticks to %s", n, args.out)
+    else:
+        print(json.dumps(run_replay(args.path, cfg), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -41,6 +41,7 @@ def run(*, only_if_drift: bool, min_samples: int) -> int:
             trees=cfg.if_n_estimators,
             exclude_anomalous=True,
             enforce_guardrails=True,
+            run_sweep=cfg.if_sweep,
         )
     except SystemExit as exc:
         # Soft-skip (not enough clean data, or guardrail tripped): keep previous
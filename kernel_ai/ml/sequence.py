@@ -8,21 +8,32 @@ during normal operation. STIDE (Sequence TIme-Delay Embedding) learns the set of
 normal n-grams and flags windows with a high fraction of unseen n-grams.
 
 Data source:
-  * L0 ``procfs`` — sample ``/proc/<pid>/syscall`` each tick (coarse).
+  * L0 ``procfs`` — sample ``/proc/<pid>/syscall`` of an activity-ranked
+    working set each tick (coarse).
   * L2 ``socket`` — Stage 6 collector pushes ordered events
     (see ``docs/ML_STAGE6_L2_COLLECTOR.md``). Only the source changes; the
     n-gram model / store / UI stay the same.
 
 Components:
-    SyscallSampler  - read current syscall per pid from procfs (L0)
+    SyscallSampler  - read current syscall of hot/rotating pids from procfs (L0)
     NgramTracker    - per-pid rolling deques -> stream of syscall n-grams
     StideModel      - set of "normal" n-grams + window mismatch scoring
+    PackedStideModel - same scoring over a compact, mmap-loaded artifact
 """
 
 from __future__ import annotations
 
+import bisect
+import errno
+import hashlib
+import heapq
+import json
 import logging
+import mmap
 import os
+import struct
+import sys
+from array import array
 from collections import deque
 from dataclasses import dataclass, field
 
@@ -33,39 +44,169 @@ logger = logging.getLogger("kernel_ai.ml.sequence")
 # Separator for serialising an n-gram tuple into a stable string key.
 _SEP = "|"
 
+# procfs mount point (overridable in tests).
+_PROC = "/proc"
 
-class SyscallSampler:
-    """Sample the current syscall of running processes from procfs."""
+# Packed profile: magic, n, count, meta length; then meta JSON padded to 8
+# bytes, then ``count`` sorted little-endian uint64 n-gram ids.
+_PACKED_MAGIC = b"STIDE64\0"
+_PACKED_HEADER = struct.Struct("<8sIQI")
 
-    def __init__(self, max_pids: int = 160) -> None:
-        self.max_pids = max_pids
 
-    def sample(self) -> dict[int, str]:
-        """Return ``{pid: syscall_name}`` for tasks currently in a syscall."""
-        out: dict[int, str] = {}
+class SyscallSampler:
+    """Sample the current syscall of an adaptive working set of processes.
+
+    Reading ``/proc/<pid>/syscall`` for the first N pids in numeric order mostly
+    hits low-pid idle daemons parked in one syscall, which yield homogeneous
+    n-grams and little information. Instead, :meth:`refresh` (once per tick)
+    ranks pids by recent activity from ``/proc/<pid>/stat`` (runnable state or
+    utime+stime delta) and fills the working set with the hottest ones, then
+    rotates through the remaining pids round-robin so quiet processes are still
+    visited. :meth:`sample` (several times per tick) re-reads the working set
+    through persistent fds with ``pread`` instead of open/read/close.
+
+    Pids whose ``syscall`` file is not readable (EACCES/EPERM: no ptrace
+    access) are remembered and skipped until they exit; pids that vanished
+    (ESRCH/ENOENT) are dropped from the working set. Both are counted in
+    :attr:`stats`.
+    """
+
+    def __init__(self, max_pids: int = 160, hot_fraction: float = 0.5) -> None:
+        self.max_pids = max(1, max_pids)
+        self.hot_fraction = min(1.0, max(0.0, hot_fraction))
+        self._fds: dict[int, int] = {}
+        # pid -> utime+stime (clock ticks) at the previous refresh.
+        self._cpu: dict[int, int] = {}
+        self._denied: set[int] = set()
+        self._rr_cursor = 0
+        self._refreshed = False
+        self.stats = {"eacces": 0, "esrch": 0, "hot": 0, "rotated": 0}
+
+    def refresh(self) -> None:
+        """Re-select the working set: hottest pids first, then round-robin."""
+        self._refreshed = True
         try:
-            pids = sorted((int(d) for d in os.listdir("/proc") if d.isdigit()))
+            pids = sorted(int(d) for d in os.listdir(_PROC) if d.isdigit())
         except OSError:
-            return out
-        for pid in pids[: self.max_pids]:
-            path = f"/proc/{pid}/syscall"
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as fh:
-                    line = fh.read().strip()
-            except (OSError, PermissionError):
+            return
+        live = set(pids)
+        self._denied &= live
+
+        activity: dict[int, int] = {}
+        cpu: dict[int, int] = {}
+        for pid in pids:
+            if pid in self._denied:
                 continue
-            if not line or line == "-1" or line.startswith("running"):
+            parsed = _read_stat_activity(pid)
+            if parsed is None:
                 continue
-            head = line.split(" ", 1)[0]
+            state, ticks = parsed
+            cpu[pid] = ticks
+            delta = ticks - self._cpu.get(pid, ticks)
+            score = delta + (1 if state == "R" else 0)
+            if score > 0:
+                activity[pid] = score
+        self._cpu = cpu
+
+        hot_budget = int(round(self.max_pids * self.hot_fraction))
+        hot = heapq.nlargest(hot_budget, activity, key=activity.__getitem__)
+        chosen = list(hot)
+        taken = set(hot)
+
+        # Fill the rest of the budget round-robin over the remaining pids.
+        rest = [p for p in cpu if p not in taken]
+        if rest:
+            start = bisect.bisect_left(rest, self._rr_cursor)
+            want = min(self.max_pids - len(chosen), len(rest))
+            for i in range(want):
+                chosen.append(rest[(start + i) % len(rest)])
+            if want:
+                self._rr_cursor = chosen[-1] + 1
+        self.stats["hot"] = len(hot)
+        self.stats["rotated"] = len(chosen) - len(hot)
+
+        keep = set(chosen)
+        for pid in [p for p in self._fds if p not in keep]:
+            self._close(pid)
+        for pid in chosen:
+            if pid not in self._fds:
+                self._open(pid)
+
+    def _open(self, pid: int) -> None:
+        try:
+            self._fds[pid] = os.open(f"{_PROC}/{pid}/syscall", os.O_RDONLY)
+        except OSError as exc:
+            self._note_error(pid, exc)
+
+    def _close(self, pid: int) -> None:
+        fd = self._fds.pop(pid, None)
+        if fd is not None:
             try:
-                num = int(head)
-            except ValueError:
-                continue
-            if num < 0:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _note_error(self, pid: int, exc: OSError) -> None:
+        if exc.errno in (errno.EACCES, errno.EPERM):
+            self.stats["eacces"] += 1
+            self._denied.add(pid)
+        elif exc.errno in (errno.ESRCH, errno.ENOENT):
+            self.stats["esrch"] += 1
+        self._close(pid)
+
+    def sample(self) -> dict[int, str]:
+        """Return ``{pid: syscall_name}`` for working-set tasks in a syscall."""
+        if not self._refreshed:
+            self.refresh()
+        out: dict[int, str] = {}
+        for pid, fd in list(self._fds.items()):
+            try:
+                raw = os.pread(fd, 256, 0)
+            except OSError as exc:
+                self._note_error(pid, exc)
                 continue
-            out[int(pid)] = SYSCALL_NAMES.get(num, f"sys_{num}")
+            name = _parse_syscall_line(raw.decode("ascii", errors="ignore"))
+            if name is not None:
+                out[pid] = name
         return out
 
+    def close(self) -> None:
+        for pid in list(self._fds):
+            self._close(pid)
+
+
+def _read_stat_activity(pid: int) -> tuple[str, int] | None:
+    """Return ``(state, utime + stime)`` from ``/proc/<pid>/stat``."""
+    try:
+        with open(f"{_PROC}/{pid}/stat", "r", encoding="utf-8", errors="ignore") as fh:
+            raw = fh.read()
+    except OSError:
+        return None
+    rpar = raw.rfind(")")
+    if rpar < 0:
+        return None
+    rest = raw[rpar + 2 :].split()
+    # rest[0]=state, [11]=utime, [12]=stime
+    try:
+        return rest[0], int(rest[11]) + int(rest[12])
+    except (IndexError, ValueError):
+        return None
+
+
+def _parse_syscall_line(line: str) -> str | None:
+    """Map a ``/proc/<pid>/syscall`` line to a syscall name (None if not in one)."""
+    line = line.strip()
+    if not line or line == "-1" or line.startswith("running"):
+        return None
+    head = line.split(" ", 1)[0]
+    try:
+        num = int(head)
+    except ValueError:
+        return None
+    if num < 0:
+        return None
+    return SYSCALL_NAMES.get(num, f"sys_{num}")
+
 
 class NgramTracker:
     """Maintain per-pid syscall histories and emit n-grams as they complete.
@@ -75,10 +216,11 @@ class NgramTracker:
     homogeneous n-grams -- those are normal and end up in the profile.
     """
 
-    def __init__(self, n: int = 3, window: int = 400, max_pids: int = 4096) -> None:
+    def __init__(self, n: int = 3, window: int = 400, max_pids: int = 4096, max_pending: int = 50000) -> None:
         self.n = max(2, n)
         self.window = window
         self.max_pids = max_pids
+        self.max_pending = max(1, max_pending)
         self._hist: dict[int, deque[str]] = {}
         # Rolling window of recent n-gram keys used for live scoring.
         self._recent: deque[str] = deque(maxlen=window)
@@ -128,12 +270,31 @@ class NgramTracker:
     def recent(self) -> list[str]:
         return list(self._recent)
 
+    def sizes(self) -> dict[str, int]:
+        """Entry counts of the tracker's in-memory state (for metrics)."""
+        return {"pids": len(self._hist), "window": len(self._recent), "pending": len(self._pending)}
+
     def drain_pending(self) -> dict[str, int]:
         """Return + clear n-gram counts accumulated since the last drain."""
         pending = self._pending
         self._pending = {}
         return pending
 
+    def restore_pending(self, counts: dict[str, int]) -> None:
+        """Fold back counts whose flush failed, so the next flush retries them.
+
+        During a long store outage the retried map would grow with every
+        distinct n-gram seen; past ``max_pending`` keys the rarest are dropped
+        (they only under-count, and the profile keeps whatever was flushed).
+        """
+        for key, count in counts.items():
+            self._pending[key] = self._pending.get(key, 0) + count
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            for key in heapq.nsmallest(overflow, self._pending, key=self._pending.__getitem__):
+                del self._pending[key]
+            logger.warning("n-gram flush backlog over %d keys: dropped %d rarest", self.max_pending, overflow)
+
 
 @dataclass
 class StideModel:
@@ -178,6 +339,128 @@ class StideModel:
         return cls(n=int(obj["n"]), ngrams=set(obj["ngrams"]), meta=dict(obj.get("meta", {})))
 
 
+def ngram_id(key: str) -> int:
+    """Stable 64-bit id of an n-gram key (blake2b; collisions are negligible)."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class PackedStideModel:
+    """STIDE vocabulary as a sorted ``uint64`` array of n-gram ids, mmap-loaded.
+
+    8 bytes per n-gram instead of a Python ``str`` in a ``set`` (~100 bytes),
+    and loading maps the file instead of unpickling it, so even a
+    multi-million n-gram profile loads in microseconds and its pages are
+    shared with the page cache. Membership is a binary search; consecutive
+    windows overlap almost entirely, so verdicts are memoised in a small
+    bounded dict and most keys are never hashed twice.
+    """
+
+    _CACHE_MAX = 1 << 16
+
+    def __init__(self, n: int, ids, meta: dict | None = None, *, _mm: mmap.mmap | None = None) -> None:
+        self.n = n
+        self.meta = meta or {}
+        self._ids = ids
+        self._mm = _mm
+        self._cache: dict[str, bool] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: str) -> bool:
+        want = ngram_id(key)
+        i = bisect.bisect_left(self._ids, want)
+        return i < len(self._ids) and self._ids[i] == want
+
+    def _unseen(self, window: list[str]) -> dict[str, bool]:
+        cache = self._cache
+        if len(cache) > self._CACHE_MAX:
+            cache.clear()
+        for g in window:
+            if g not in cache:
+                cache[g] = g not in self
+        return cache
+
+    def score_window(self, window: list[str]) -> tuple[float, int]:
+        """Same contract as :meth:`StideModel.score_window`."""
+        if not window:
+            return 0.0, 0
+        unseen = self._unseen(window)
+        misses = sum(1 for g in window if unseen[g])
+        return misses / len(window), misses
+
+    def top_unseen(self, window: list[str], limit: int = 3) -> list[str]:
+        unseen = self._unseen(window)
+        counts: dict[str, int] = {}
+        for g in window:
+            if unseen[g]:
+                counts[g] = counts.get(g, 0) + 1
+        ordered = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)
+        return [g.replace(_SEP, "→") for g, _ in ordered[:limit]]
+
+    @staticmethod
+    def write(path: str, n: int, ngrams, meta: dict | None = None) -> int:
+        """Write a packed profile atomically (tmp + rename); return the n-gram count.
+
+        The rename keeps a reader that still maps the previous file valid: its
+        inode lives until the old mapping is dropped.
+        """
+        ids = array("Q", sorted({ngram_id(g) for g in ngrams}))
+        if sys.byteorder != "little":
+            ids.byteswap()
+        blob = json.dumps(meta or {}).encode("utf-8")
+        blob += b" " * (-(len(blob) + _PACKED_HEADER.size) % 8)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as fh:
+            fh.write(_PACKED_HEADER.pack(_PACKED_MAGIC, n, len(ids), len(blob)))
+            fh.write(blob)
+            fh.write(ids.tobytes())
+        os.replace(tmp, path)
+        return len(ids)
+
+    @classmethod
+    def load(cls, path: str) -> "PackedStideModel":
+        with open(path, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, count, meta_len = _PACKED_HEADER.unpack_from(mm, 0)
+        if magic != _PACKED_MAGIC:
+            mm.close()
+            raise ValueError(f"{path}: not a packed STIDE profile")
+        start = _PACKED_HEADER.size + meta_len
+        meta = json.loads(mm[_PACKED_HEADER.size:start] or b"{}")
+        if sys.byteorder == "little":
+            ids = memoryview(mm)[start:start + count * 8].cast("Q")
+        else:  # rare: byteswap into a private copy
+            ids = array("Q", mm[start:start + count * 8])
+            ids.byteswap()
+        return cls(n=int(n), ids=ids, meta=meta, _mm=mm)
+
+
+LEGACY_STIDE_FILENAME = "stide_latest.joblib"
+
+
+def resolve_stide_path(path: str) -> str:
+    """``path``, or the legacy ``stide_latest.joblib`` next to it if ``path`` is missing.
+
+    Deployments that relied on the old default keep Stage 4 until the profile
+    is rebuilt in the packed format.
+    """
+    if os.path.exists(path):
+        return path
+    legacy = os.path.join(os.path.dirname(path), LEGACY_STIDE_FILENAME)
+    return legacy if os.path.exists(legacy) else path
+
+
+def load_stide(path: str) -> "StideModel | PackedStideModel":
+    """Load a STIDE profile in either format (packed, or legacy joblib set)."""
+    with open(path, "rb") as fh:
+        magic = fh.read(len(_PACKED_MAGIC))
+    if magic == _PACKED_MAGIC:
+        return PackedStideModel.load(path)
+    return StideModel.load(path)
+
+
 def build_profile(cfg) -> dict:
     """(Re)build the STIDE normal profile from accumulated n-gram counts.
 
@@ -206,8 +489,7 @@ def build_profile(cfg) -> dict:
         "vocab_kept": len(kept),
         "min_count": cfg.seq_min_ngram_count,
     }
-    model = StideModel(n=cfg.seq_n, ngrams=kept, meta=meta)
-    model.save(cfg.seq_model_path)
+    PackedStideModel.write(cfg.seq_model_path, cfg.seq_n, kept, meta)
     logger.info(
         "saved STIDE profile -> %s (kept %d/%d n-grams, n=%d)",
         cfg.seq_model_path, len(kept), total, cfg.seq_n,
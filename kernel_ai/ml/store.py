@@ -3,20 +3,36 @@
 Schema (all created on demand):
     ml_feature_snapshots  - one JSONB row per tick (raw features, for training)
     ml_anomalies          - detected mutations served to the Kernel DNA UI
+                            (one row per coalesced incident: first_ts/count)
     ml_baseline_state     - EWMA state, persisted for warm restarts
+    ml_drift_state        - rolling drift sufficient statistics (live drift)
+
+High-volume counters (syscall n-grams, process lineage) are flushed with
+``COPY`` into an unlogged staging table and merged by one
+``INSERT ... SELECT ... ON CONFLICT DO UPDATE`` per flush, instead of one
+upsert statement per key.
 
 The worker owns one long-lived connection. The Flask read path opens a fresh
 short-lived connection per call (thread-safe, low volume), and tolerates the DB
 being unreachable by returning empty results instead of raising.
+
+Backends are picked by the ``MLConfig.dsn`` scheme: ``postgresql://`` uses
+:class:`PostgresStore`, ``sqlite:///<path>`` the embedded single-node
+:mod:`kernel_ai.ml.store_sqlite` backend. :func:`open_store` and the
+module-level ``fetch_*`` readers dispatch on it, so callers never branch.
 """
 
 from __future__ import annotations
 
 import logging
+from typing import Protocol
 
 import psycopg
 from psycopg.types.json import Json
 
+from kernel_ai.ml import store_sqlite
+from kernel_ai.ml.store_sqlite import is_sqlite_dsn
+
 logger = logging.getLogger("kernel_ai.ml.store")
 
 _SCHEMA = """
@@ -43,6 +59,9 @@ CREATE TABLE IF NOT EXISTS ml_anomalies (
     meta          jsonb
 );
 CREATE INDEX IF NOT EXISTS ml_anomalies_ts_idx ON ml_anomalies (ts);
+-- Incident coalescing (kernel_ai.ml.incidents): ts is the last occurrence.
+ALTER TABLE ml_anomalies ADD COLUMN IF NOT EXISTS first_ts timestamptz;
+ALTER TABLE ml_anomalies ADD COLUMN IF NOT EXISTS count integer NOT NULL DEFAULT 1;
 
 CREATE TABLE IF NOT EXISTS ml_baseline_state (
     name       text PRIMARY KEY,
@@ -63,6 +82,12 @@ CREATE TABLE IF NOT EXISTS ml_drift (
 );
 CREATE INDEX IF NOT EXISTS ml_drift_ts_idx ON ml_drift (ts);
 
+CREATE TABLE IF NOT EXISTS ml_drift_state (
+    name       text PRIMARY KEY,
+    state      jsonb       NOT NULL,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
 CREATE TABLE IF NOT EXISTS ml_syscall_ngrams (
     ngram      text PRIMARY KEY,
     n          smallint    NOT NULL,
@@ -89,9 +114,49 @@ CREATE TABLE IF NOT EXISTS ml_proc_lineage (
     last_seen   timestamptz NOT NULL DEFAULT now(),
     PRIMARY KEY (parent_comm, child_comm)
 );
+
+-- Staging tables for bulk COPY + single-statement merge (no WAL, truncated
+-- inside each flush transaction).
+CREATE UNLOGGED TABLE IF NOT EXISTS ml_syscall_ngrams_stage (
+    ngram text     NOT NULL,
+    n     smallint NOT NULL,
+    count bigint   NOT NULL
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS ml_proc_lineage_stage (
+    parent_comm text   NOT NULL,
+    child_comm  text   NOT NULL,
+    count       bigint NOT NULL
+);
 """
 
 
+class MLStore(Protocol):
+    """Write-side interface the worker relies on (one instance per process)."""
+
+    def insert_feature_snapshot(self, features: dict[str, float]) -> None: ...
+    def insert_anomalies(self, anomalies: list[dict]) -> None: ...
+    def save_incidents(self, incidents: list[dict]) -> list[int]: ...
+    def upsert_ngram_counts(self, n: int, counts: dict[str, int]) -> None: ...
+    def insert_proc_snapshots(self, rows: list[dict]) -> None: ...
+    def upsert_lineage_counts(self, edges: list[tuple[str, str, int]]) -> None: ...
+    def load_lineage_counts(self) -> list[tuple[str, str, int]]: ...
+    def save_baseline(self, rows: list[dict]) -> None: ...
+    def load_baseline(self) -> list[dict]: ...
+    def save_drift_state(self, state: dict) -> None: ...
+    def load_drift_state(self) -> dict | None: ...
+    def insert_drift(self, record: dict) -> None: ...
+    def prune(self, features_hours: int, anomalies_hours: int, drift_hours: int | None = None) -> None: ...
+    def close(self) -> None: ...
+
+
+def open_store(dsn: str) -> MLStore:
+    """Open the write-side store for ``dsn`` (Postgres or embedded SQLite)."""
+    if is_sqlite_dsn(dsn):
+        return store_sqlite.SqliteStore(dsn)
+    return PostgresStore(dsn)
+
+
 def connect(dsn: str, *, autocommit: bool = True) -> psycopg.Connection:
     return psycopg.connect(dsn, autocommit=autocommit)
 
@@ -149,21 +214,94 @@ class PostgresStore:
                 ],
             )
 
+    def save_incidents(self, incidents: list[dict]) -> list[int]:
+        """Insert new incident rows (``id`` None) / update open ones in place.
+
+        Returns the row id of every incident, in order.
+        """
+        ids: list[int] = []
+        with self.conn.transaction(), self.conn.cursor() as cur:
+            for inc in incidents:
+                params = {
+                    "source": inc.get("source", "stage1_baseline"),
+                    "feature": inc["feature"],
+                    "subsystem": inc.get("subsystem"),
+                    "type": inc["type"],
+                    "severity": inc["severity"],
+                    "score": inc["score"],
+                    "value": inc.get("value"),
+                    "baseline_mean": inc.get("baseline_mean"),
+                    "baseline_std": inc.get("baseline_std"),
+                    "position": inc.get("position"),
+                    "message": inc.get("message"),
+                    "meta": Json(inc.get("meta") or {}),
+                    "first_ts": inc["first_ts"],
+                    "last_ts": inc["last_ts"],
+                    "count": inc["count"],
+                    "id": inc.get("id"),
+                }
+                if params["id"] is None:
+                    cur.execute(
+                        """
+                        INSERT INTO ml_anomalies
+                            (ts, first_ts, count, source, feature, subsystem, type, severity,
+                             score, value, baseline_mean, baseline_std, position, message, meta)
+                        VALUES
+                            (to_timestamp(%(last_ts)s), to_timestamp(%(first_ts)s), %(count)s,
+                             %(source)s, %(feature)s, %(subsystem)s, %(type)s, %(severity)s,
+                             %(score)s, %(value)s, %(baseline_mean)s, %(baseline_std)s,
+                             %(position)s, %(message)s, %(meta)s)
+                        RETURNING id
+                        """,
+                        params,
+                    )
+                    ids.append(int(cur.fetchone()[0]))
+                else:
+                    cur.execute(
+                        """
+                        UPDATE ml_anomalies
+                        SET ts = to_timestamp(%(last_ts)s), count = %(count)s,
+                            severity = %(severity)s, score = %(score)s, value = %(value)s,
+                            baseline_mean = %(baseline_mean)s, baseline_std = %(baseline_std)s,
+                            message = %(message)s, meta = %(meta)s
+                        WHERE id = %(id)s
+                        """,
+                        params,
+                    )
+                    ids.append(int(params["id"]))
+        return ids
+
+    def _copy_merge(self, staging: str, columns: tuple[str, ...], rows, merge_sql: str) -> None:
+        """Stream ``rows`` into ``staging`` with COPY, then run ``merge_sql``.
+
+        One transaction: a failed flush leaves both tables untouched, so the
+        caller can retry the same counts later without double counting.
+        """
+        with self.conn.transaction(), self.conn.cursor() as cur:
+            cur.execute(f"TRUNCATE {staging}")
+            with cur.copy(f"COPY {staging} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+            cur.execute(merge_sql)
+            cur.execute(f"TRUNCATE {staging}")
+
     def upsert_ngram_counts(self, n: int, counts: dict[str, int]) -> None:
         """Accumulate observed syscall n-gram counts (profile growth)."""
         if not counts:
             return
-        with self.conn.cursor() as cur:
-            cur.executemany(
-                """
-                INSERT INTO ml_syscall_ngrams (ngram, n, count)
-                VALUES (%(ngram)s, %(n)s, %(count)s)
-                ON CONFLICT (ngram) DO UPDATE
-                    SET count = ml_syscall_ngrams.count + EXCLUDED.count,
-                        last_seen = now()
-                """,
-                [{"ngram": g, "n": n, "count": c} for g, c in counts.items()],
-            )
+        self._copy_merge(
+            "ml_syscall_ngrams_stage",
+            ("ngram", "n", "count"),
+            ((g, n, c) for g, c in counts.items()),
+            """
+            INSERT INTO ml_syscall_ngrams (ngram, n, count)
+            SELECT ngram, n, sum(count) FROM ml_syscall_ngrams_stage
+            GROUP BY ngram, n
+            ON CONFLICT (ngram) DO UPDATE
+                SET count = ml_syscall_ngrams.count + EXCLUDED.count,
+                    last_seen = now()
+            """,
+        )
 
     def insert_proc_snapshots(self, rows: list[dict]) -> None:
         """Persist a compact Stage 5 process sample batch."""
@@ -189,17 +327,19 @@ class PostgresStore:
     def upsert_lineage_counts(self, edges: list[tuple[str, str, int]]) -> None:
         if not edges:
             return
-        with self.conn.cursor() as cur:
-            cur.executemany(
-                """
-                INSERT INTO ml_proc_lineage (parent_comm, child_comm, count)
-                VALUES (%(parent)s, %(child)s, %(count)s)
-                ON CONFLICT (parent_comm, child_comm) DO UPDATE
-                    SET count = ml_proc_lineage.count + EXCLUDED.count,
-                        last_seen = now()
-                """,
-                [{"parent": p, "child": c, "count": n} for p, c, n in edges],
-            )
+        self._copy_merge(
+            "ml_proc_lineage_stage",
+            ("parent_comm", "child_comm", "count"),
+            edges,
+            """
+            INSERT INTO ml_proc_lineage (parent_comm, child_comm, count)
+            SELECT parent_comm, child_comm, sum(count) FROM ml_proc_lineage_stage
+            GROUP BY parent_comm, child_comm
+            ON CONFLICT (parent_comm, child_comm) DO UPDATE
+                SET count = ml_proc_lineage.count + EXCLUDED.count,
+                    last_seen = now()
+            """,
+        )
 
     def load_lineage_counts(self) -> list[tuple[str, str, int]]:
         with self.conn.cursor() as cur:
@@ -231,7 +371,29 @@ class PostgresStore:
                 for r in cur.fetchall()
             ]
 
-    def prune(self, features_hours: int, anomalies_hours: int) -> None:
+    def save_drift_state(self, state: dict) -> None:
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO ml_drift_state (name, state, updated_at)
+                VALUES ('worker', %s, now())
+                ON CONFLICT (name) DO UPDATE
+                    SET state = EXCLUDED.state, updated_at = now()
+                """,
+                (Json(state),),
+            )
+
+    def load_drift_state(self) -> dict | None:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT state FROM ml_drift_state WHERE name = 'worker'")
+            row = cur.fetchone()
+        return row[0] if row and isinstance(row[0], dict) else None
+
+    def insert_drift(self, record: dict) -> None:
+        with self.conn.cursor() as cur:
+            _insert_drift(cur, record)
+
+    def prune(self, features_hours: int, anomalies_hours: int, drift_hours: int | None = None) -> None:
         with self.conn.cursor() as cur:
             cur.execute(
                 "DELETE FROM ml_feature_snapshots WHERE ts < now() - make_interval(hours => %s)",
@@ -245,6 +407,10 @@ class PostgresStore:
                 "DELETE FROM ml_proc_snapshots WHERE ts < now() - make_interval(hours => %s)",
                 (features_hours,),
             )
+            cur.execute(
+                "DELETE FROM ml_drift WHERE ts < now() - make_interval(hours => %s)",
+                (anomalies_hours if drift_hours is None else drift_hours,),
+            )
 
     def close(self) -> None:
         try:
@@ -255,6 +421,8 @@ class PostgresStore:
 
 def fetch_recent_feature_dicts(dsn: str, *, minutes: int = 30, limit: int = 5000) -> list[dict]:
     """Recent feature snapshots (as dicts) for drift measurement."""
+    if is_sqlite_dsn(dsn):
+        return store_sqlite.fetch_recent_feature_dicts(dsn, minutes=minutes, limit=limit)
     with connect(dsn) as conn, conn.cursor() as cur:
         cur.execute(
             """
@@ -275,8 +443,13 @@ def fetch_training_snapshots(
     guard_sec: int = 120,
 ) -> list[dict]:
     """Snapshots for (re)training. With ``exclude_anomalous`` we drop any
-    snapshot within +/- ``guard_sec`` of a HIGH-severity anomaly, so a real
-    incident can't poison the model's idea of "normal"."""
+    snapshot within ``guard_sec`` of a HIGH-severity anomaly's span (a
+    coalesced incident covers ``[first_ts, ts]``), so a real incident can't
+    poison the model's idea of "normal"."""
+    if is_sqlite_dsn(dsn):
+        return store_sqlite.fetch_training_snapshots(
+            dsn, limit=limit, exclude_anomalous=exclude_anomalous, guard_sec=guard_sec
+        )
     with connect(dsn) as conn, conn.cursor() as cur:
         if exclude_anomalous:
             cur.execute(
@@ -286,8 +459,8 @@ def fetch_training_snapshots(
                 WHERE NOT EXISTS (
                     SELECT 1 FROM ml_anomalies a
                     WHERE a.severity = 'high'
-                      AND a.ts BETWEEN s.ts - make_interval(secs => %s)
-                                   AND s.ts + make_interval(secs => %s)
+                      AND s.ts BETWEEN COALESCE(a.first_ts, a.ts) - make_interval(secs => %s)
+                                   AND a.ts + make_interval(secs => %s)
                 )
                 ORDER BY s.ts DESC LIMIT %s
                 """,
@@ -301,32 +474,60 @@ def fetch_training_snapshots(
         return [r[0] for r in cur.fetchall() if isinstance(r[0], dict)]
 
 
+def _insert_drift(cur, record: dict) -> None:
+    cur.execute(
+        """
+        INSERT INTO ml_drift
+            (flag_rate, expected_rate, feature_drift, n_recent, drifted, detail)
+        VALUES (%(flag_rate)s, %(expected_rate)s, %(feature_drift)s,
+                %(n_recent)s, %(drifted)s, %(detail)s)
+        """,
+        {
+            "flag_rate": record.get("flag_rate"),
+            "expected_rate": record.get("expected_rate"),
+            "feature_drift": record.get("feature_drift"),
+            "n_recent": record.get("n_recent"),
+            "drifted": record.get("drifted"),
+            "detail": Json(record.get("detail") or {}),
+        },
+    )
+
+
 def insert_drift(dsn: str, record: dict) -> None:
     """Persist one drift measurement (best-effort)."""
+    if is_sqlite_dsn(dsn):
+        return store_sqlite.insert_drift(dsn, record)
+    try:
+        with connect(dsn) as conn, conn.cursor() as cur:
+            _insert_drift(cur, record)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("insert_drift failed: %s", exc)
+
+
+def fetch_drift_state(dsn: str, *, max_age_sec: float) -> dict | None:
+    """The worker's persisted drift statistics, if updated recently enough."""
+    if is_sqlite_dsn(dsn):
+        return store_sqlite.fetch_drift_state(dsn, max_age_sec=max_age_sec)
     try:
         with connect(dsn) as conn, conn.cursor() as cur:
             cur.execute(
                 """
-                INSERT INTO ml_drift
-                    (flag_rate, expected_rate, feature_drift, n_recent, drifted, detail)
-                VALUES (%(flag_rate)s, %(expected_rate)s, %(feature_drift)s,
-                        %(n_recent)s, %(drifted)s, %(detail)s)
+                SELECT state FROM ml_drift_state
+                WHERE name = 'worker' AND updated_at > now() - make_interval(secs => %s)
                 """,
-                {
-                    "flag_rate": record.get("flag_rate"),
-                    "expected_rate": record.get("expected_rate"),
-                    "feature_drift": record.get("feature_drift"),
-                    "n_recent": record.get("n_recent"),
-                    "drifted": record.get("drifted"),
-                    "detail": Json(record.get("detail") or {}),
-                },
+                (max_age_sec,),
             )
+            row = cur.fetchone()
+        return row[0] if row and isinstance(row[0], dict) else None
     except Exception as exc:  # noqa: BLE001
-        logger.warning("insert_drift failed: %s", exc)
+        logger.warning("fetch_drift_state failed: %s", exc)
+        return None
 
 
 def fetch_ngram_counts(dsn: str, *, n: int) -> dict[str, int]:
     """Read accumulated syscall n-gram counts for STIDE profile building."""
+    if is_sqlite_dsn(dsn):
+        return store_sqlite.fetch_ngram_counts(dsn, n=n)
     with connect(dsn) as conn, conn.cursor() as cur:
         cur.execute("SELECT ngram, count FROM ml_syscall_ngrams WHERE n = %s", (n,))
         return {row[0]: int(row[1]) for row in cur.fetchall()}
@@ -338,6 +539,8 @@ def fetch_drift_status(dsn: str, *, history: int = 48) -> dict:
     Returns ``{"available": bool, "latest": {...}|None, "history": [...]}``.
     Never raises on DB trouble (API must degrade gracefully).
     """
+    if is_sqlite_dsn(dsn):
+        return store_sqlite.fetch_drift_status(dsn, history=history)
     try:
         with connect(dsn) as conn, conn.cursor() as cur:
             cur.execute(
@@ -367,12 +570,14 @@ def fetch_drift_status(dsn: str, *, history: int = 48) -> dict:
 
 def fetch_recent_anomalies(dsn: str, *, since_seconds: int = 120, limit: int = 100) -> list[dict]:
     """Read recent anomalies for the API. Never raises on DB trouble."""
+    if is_sqlite_dsn(dsn):
+        return store_sqlite.fetch_recent_anomalies(dsn, since_seconds=since_seconds, limit=limit)
     try:
         with connect(dsn) as conn, conn.cursor() as cur:
             cur.execute(
                 """
-                SELECT ts, source, feature, subsystem, type, severity, score, value,
-                       baseline_mean, baseline_std, position, message, meta
+                SELECT ts, first_ts, count, source, feature, subsystem, type, severity,
+                       score, value, baseline_mean, baseline_std, position, message, meta
                 FROM ml_anomalies
                 WHERE ts > now() - make_interval(secs => %s)
                 ORDER BY ts DESC
@@ -384,8 +589,9 @@ def fetch_recent_anomalies(dsn: str, *, since_seconds: int = 120, limit: int = 1
             out = []
             for row in cur.fetchall():
                 rec = dict(zip(cols, row))
-                if rec.get("ts") is not None:
-                    rec["ts"] = rec["ts"].isoformat()
+                for key in ("ts", "first_ts"):
+                    if rec.get(key) is not None:
+                        rec[key] = rec[key].isoformat()
                 meta = rec.get("meta") if isinstance(rec.get("meta"), dict) else {}
                 if meta.get("attack") and not rec.get("attack"):
                     rec["attack"] = meta["attack"]
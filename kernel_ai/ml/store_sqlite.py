@@ -0,0 +1,528 @@
+"""Embedded single-node store for the ML pipeline (SQLite in WAL mode).
+
+Same logical schema as :mod:`kernel_ai.ml.store` (feature snapshots, anomalies,
+baseline state, drift, n-grams, lineage), for single-box edge deployments
+that should not run a separate Postgres. Selected by a ``sqlite:///<path>``
+``MLConfig.dsn`` (same convention as the MLflow URI: an absolute path gives
+four slashes).
+
+* WAL journal + ``synchronous=NORMAL``: the worker writes while Flask readers
+  read concurrently, and commits don't fsync (only checkpoints do).
+* Writes are batched: the worker keeps one transaction open and commits at
+  most every ``batch_sec`` (and on housekeeping / close), so a tick costs no
+  commit at all.
+* Timestamps are unix epoch REALs; readers convert to ISO-8601 like Postgres.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+
+logger = logging.getLogger("kernel_ai.ml.store_sqlite")
+
+SCHEME = "sqlite:///"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ml_feature_snapshots (
+    ts        REAL NOT NULL,
+    features  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ml_feature_snapshots_ts_idx ON ml_feature_snapshots (ts);
+
+CREATE TABLE IF NOT EXISTS ml_anomalies (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts            REAL NOT NULL,
+    source        TEXT NOT NULL DEFAULT 'stage1_baseline',
+    feature       TEXT NOT NULL,
+    subsystem     TEXT,
+    type          TEXT NOT NULL,
+    severity      TEXT NOT NULL,
+    score         REAL NOT NULL,
+    value         REAL,
+    baseline_mean REAL,
+    baseline_std  REAL,
+    position      REAL,
+    message       TEXT,
+    meta          TEXT,
+    first_ts      REAL,
+    count         INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS ml_anomalies_ts_idx ON ml_anomalies (ts);
+
+CREATE TABLE IF NOT EXISTS ml_baseline_state (
+    name       TEXT PRIMARY KEY,
+    mean       REAL    NOT NULL,
+    var        REAL    NOT NULL,
+    count      INTEGER NOT NULL,
+    updated_at REAL    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ml_drift (
+    ts            REAL NOT NULL,
+    flag_rate     REAL,
+    expected_rate REAL,
+    feature_drift REAL,
+    n_recent      INTEGER,
+    drifted       INTEGER,
+    detail        TEXT
+);
+CREATE INDEX IF NOT EXISTS ml_drift_ts_idx ON ml_drift (ts);
+
+CREATE TABLE IF NOT EXISTS ml_drift_state (
+    name       TEXT PRIMARY KEY,
+    state      TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ml_syscall_ngrams (
+    ngram      TEXT PRIMARY KEY,
+    n          INTEGER NOT NULL,
+    count      INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL    NOT NULL,
+    last_seen  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ml_syscall_ngrams_n_idx ON ml_syscall_ngrams (n);
+
+CREATE TABLE IF NOT EXISTS ml_proc_snapshots (
+    ts        REAL    NOT NULL,
+    pid       INTEGER NOT NULL,
+    ppid      INTEGER,
+    comm      TEXT    NOT NULL,
+    features  TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ml_proc_snapshots_ts_idx ON ml_proc_snapshots (ts);
+
+CREATE TABLE IF NOT EXISTS ml_proc_lineage (
+    parent_comm TEXT    NOT NULL,
+    child_comm  TEXT    NOT NULL,
+    count       INTEGER NOT NULL DEFAULT 0,
+    first_seen  REAL    NOT NULL,
+    last_seen   REAL    NOT NULL,
+    PRIMARY KEY (parent_comm, child_comm)
+);
+"""
+
+
+def is_sqlite_dsn(dsn: str) -> bool:
+    return (dsn or "").startswith(SCHEME)
+
+
+def _path(dsn: str) -> str:
+    return dsn[len(SCHEME):]
+
+
+def connect(dsn: str) -> sqlite3.Connection:
+    path = _path(dsn)
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    # isolation_level=None: transactions are managed explicitly (BEGIN/COMMIT).
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+def _iso(ts: float | None) -> str | None:
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(float(ts), tz=timezone.utc).isoformat()
+
+
+def _loads(raw) -> dict:
+    try:
+        value = json.loads(raw) if raw else {}
+    except (TypeError, ValueError):
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+# Columns added after the first release: (table, column, DDL type).
+_ADDED_COLUMNS = (
+    ("ml_anomalies", "first_ts", "REAL"),
+    ("ml_anomalies", "count", "INTEGER NOT NULL DEFAULT 1"),
+)
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    """SQLite has no ``ADD COLUMN IF NOT EXISTS``; compare with table_info."""
+    for table, column, ddl in _ADDED_COLUMNS:
+        have = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in have:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+class SqliteStore:
+    """Write side, used by the worker over a single persistent connection."""
+
+    def __init__(self, dsn: str, *, batch_sec: float = 5.0) -> None:
+        self.dsn = dsn
+        self.batch_sec = batch_sec
+        self.conn = connect(dsn)
+        self.conn.executescript(_SCHEMA)
+        _add_missing_columns(self.conn)
+        self._tx_started: float | None = None
+
+    # --- batched transactions ---
+
+    def _begin(self) -> None:
+        if self._tx_started is None:
+            self.conn.execute("BEGIN")
+            self._tx_started = time.time()
+
+    def _maybe_commit(self) -> None:
+        if self._tx_started is not None and (time.time() - self._tx_started) >= self.batch_sec:
+            self.commit()
+
+    def commit(self) -> None:
+        if self._tx_started is not None:
+            self.conn.execute("COMMIT")
+            self._tx_started = None
+
+    def _write(self, sql: str, params=()) -> None:
+        self._begin()
+        self.conn.execute(sql, params)
+        self._maybe_commit()
+
+    def _write_many(self, sql: str, rows) -> None:
+        self._begin()
+        self.conn.executemany(sql, rows)
+        self._maybe_commit()
+
+    # --- worker write API (mirrors PostgresStore) ---
+
+    def insert_feature_snapshot(self, features: dict[str, float]) -> None:
+        self._write(
+            "INSERT INTO ml_feature_snapshots (ts, features) VALUES (?, ?)",
+            (time.time(), json.dumps(features)),
+        )
+
+    def insert_anomalies(self, anomalies: list[dict]) -> None:
+        if not anomalies:
+            return
+        now = time.time()
+        self._write_many(
+            """
+            INSERT INTO ml_anomalies
+                (ts, source, feature, subsystem, type, severity, score, value,
+                 baseline_mean, baseline_std, position, message, meta)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    now,
+                    a.get("source", "stage1_baseline"),
+                    a["feature"],
+                    a.get("subsystem"),
+                    a["type"],
+                    a["severity"],
+                    a["score"],
+                    a.get("value"),
+                    a.get("baseline_mean"),
+                    a.get("baseline_std"),
+                    a.get("position"),
+                    a.get("message"),
+                    json.dumps(a.get("meta") or {}),
+                )
+                for a in anomalies
+            ],
+        )
+
+    def save_incidents(self, incidents: list[dict]) -> list[int]:
+        """Insert new incident rows (``id`` None) / update open ones in place."""
+        ids: list[int] = []
+        self._begin()
+        for inc in incidents:
+            meta = json.dumps(inc.get("meta") or {})
+            if inc.get("id") is None:
+                cur = self.conn.execute(
+                    """
+                    INSERT INTO ml_anomalies
+                        (ts, first_ts, count, source, feature, subsystem, type, severity,
+                         score, value, baseline_mean, baseline_std, position, message, meta)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        inc["last_ts"], inc["first_ts"], inc["count"],
+                        inc.get("source", "stage1_baseline"), inc["feature"], inc.get("subsystem"),
+                        inc["type"], inc["severity"], inc["score"], inc.get("value"),
+                        inc.get("baseline_mean"), inc.get("baseline_std"), inc.get("position"),
+                        inc.get("message"), meta,
+                    ),
+                )
+                ids.append(int(cur.lastrowid))
+            else:
+                self.conn.execute(
+                    """
+                    UPDATE ml_anomalies
+                    SET ts = ?, count = ?, severity = ?, score = ?, value = ?,
+                        baseline_mean = ?, baseline_std = ?, message = ?, meta = ?
+                    WHERE id = ?
+                    """,
+                    (
+                        inc["last_ts"], inc["count"], inc["severity"], inc["score"], inc.get("value"),
+                        inc.get("baseline_mean"), inc.get("baseline_std"), inc.get("message"), meta,
+                        inc["id"],
+                    ),
+                )
+                ids.append(int(inc["id"]))
+        self._maybe_commit()
+        return ids
+
+    def upsert_ngram_counts(self, n: int, counts: dict[str, int]) -> None:
+        if not counts:
+            return
+        now = time.time()
+        self._write_many(
+            """
+            INSERT INTO ml_syscall_ngrams (ngram, n, count, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (ngram) DO UPDATE
+                SET count = count + excluded.count, last_seen = excluded.last_seen
+            """,
+            [(g, n, c, now, now) for g, c in counts.items()],
+        )
+
+    def insert_proc_snapshots(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        now = time.time()
+        self._write_many(
+            "INSERT INTO ml_proc_snapshots (ts, pid, ppid, comm, features) VALUES (?, ?, ?, ?, ?)",
+            [
+                (now, r["pid"], r.get("ppid"), r["comm"], json.dumps(r.get("features") or {}))
+                for r in rows
+            ],
+        )
+
+    def upsert_lineage_counts(self, edges: list[tuple[str, str, int]]) -> None:
+        if not edges:
+            return
+        now = time.time()
+        self._write_many(
+            """
+            INSERT INTO ml_proc_lineage (parent_comm, child_comm, count, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (parent_comm, child_comm) DO UPDATE
+                SET count = count + excluded.count, last_seen = excluded.last_seen
+            """,
+            [(p, c, k, now, now) for p, c, k in edges],
+        )
+
+    def load_lineage_counts(self) -> list[tuple[str, str, int]]:
+        rows = self.conn.execute("SELECT parent_comm, child_comm, count FROM ml_proc_lineage")
+        return [(r[0], r[1], int(r[2])) for r in rows.fetchall()]
+
+    def save_baseline(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        now = time.time()
+        self._write_many(
+            """
+            INSERT INTO ml_baseline_state (name, mean, var, count, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE
+                SET mean = excluded.mean, var = excluded.var,
+                    count = excluded.count, updated_at = excluded.updated_at
+            """,
+            [(r["name"], r["mean"], r["var"], r["count"], now) for r in rows],
+        )
+        # Baseline saves are the housekeeping checkpoint: make them durable.
+        self.commit()
+
+    def load_baseline(self) -> list[dict]:
+        rows = self.conn.execute("SELECT name, mean, var, count FROM ml_baseline_state")
+        return [{"name": r[0], "mean": r[1], "var": r[2], "count": r[3]} for r in rows.fetchall()]
+
+    def save_drift_state(self, state: dict) -> None:
+        self._write(
+            """
+            INSERT INTO ml_drift_state (name, state, updated_at) VALUES ('worker', ?, ?)
+            ON CONFLICT (name) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at
+            """,
+            (json.dumps(state), time.time()),
+        )
+
+    def load_drift_state(self) -> dict | None:
+        row = self.conn.execute("SELECT state FROM ml_drift_state WHERE name = 'worker'").fetchone()
+        return (_loads(row[0]) or None) if row else None
+
+    def insert_drift(self, record: dict) -> None:
+        self._write(_INSERT_DRIFT, _drift_params(record))
+
+    def prune(self, features_hours: int, anomalies_hours: int, drift_hours: int | None = None) -> None:
+        now = time.time()
+        self._begin()
+        self.conn.execute("DELETE FROM ml_feature_snapshots WHERE ts < ?", (now - features_hours * 3600,))
+        self.conn.execute("DELETE FROM ml_anomalies WHERE ts < ?", (now - anomalies_hours * 3600,))
+        self.conn.execute("DELETE FROM ml_proc_snapshots WHERE ts < ?", (now - features_hours * 3600,))
+        drift_hours = anomalies_hours if drift_hours is None else drift_hours
+        self.conn.execute("DELETE FROM ml_drift WHERE ts < ?", (now - drift_hours * 3600,))
+        self.commit()
+
+    def close(self) -> None:
+        try:
+            self.commit()
+        except Exception:  # noqa: BLE001 - best-effort cleanup
+            # Never leave a batched write transaction holding the database lock.
+            try:
+                self.conn.rollback()
+            except Exception:  # noqa: BLE001
+                pass
+            self._tx_started = None
+        try:
+            self.conn.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+
+_INSERT_DRIFT = """
+INSERT INTO ml_drift (ts, flag_rate, expected_rate, feature_drift, n_recent, drifted, detail)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _drift_params(record: dict) -> tuple:
+    drifted = record.get("drifted")
+    return (
+        time.time(),
+        record.get("flag_rate"),
+        record.get("expected_rate"),
+        record.get("feature_drift"),
+        record.get("n_recent"),
+        None if drifted is None else int(bool(drifted)),
+        json.dumps(record.get("detail") or {}),
+    )
+
+
+# --- read side (mirrors the module-level readers in kernel_ai.ml.store) ---
+
+
+def fetch_recent_feature_dicts(dsn: str, *, minutes: int = 30, limit: int = 5000) -> list[dict]:
+    with closing(connect(dsn)) as conn:
+        rows = conn.execute(
+            "SELECT features FROM ml_feature_snapshots WHERE ts > ? ORDER BY ts DESC LIMIT ?",
+            (time.time() - minutes * 60, limit),
+        ).fetchall()
+    return [d for d in (_loads(r[0]) for r in rows) if d]
+
+
+def fetch_training_snapshots(
+    dsn: str,
+    *,
+    limit: int = 50000,
+    exclude_anomalous: bool = True,
+    guard_sec: int = 120,
+) -> list[dict]:
+    with closing(connect(dsn)) as conn:
+        if exclude_anomalous:
+            rows = conn.execute(
+                """
+                SELECT s.features
+                FROM ml_feature_snapshots s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM ml_anomalies a
+                    WHERE a.severity = 'high'
+                      AND s.ts BETWEEN COALESCE(a.first_ts, a.ts) - ? AND a.ts + ?
+                )
+                ORDER BY s.ts DESC LIMIT ?
+                """,
+                (guard_sec, guard_sec, limit),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT features FROM ml_feature_snapshots ORDER BY ts DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+    return [d for d in (_loads(r[0]) for r in rows) if d]
+
+
+def insert_drift(dsn: str, record: dict) -> None:
+    try:
+        with closing(connect(dsn)) as conn:
+            conn.execute(_INSERT_DRIFT, _drift_params(record))
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("insert_drift failed: %s", exc)
+
+
+def fetch_drift_state(dsn: str, *, max_age_sec: float) -> dict | None:
+    try:
+        with closing(connect(dsn)) as conn:
+            row = conn.execute(
+                "SELECT state FROM ml_drift_state WHERE name = 'worker' AND updated_at > ?",
+                (time.time() - max_age_sec,),
+            ).fetchone()
+        return (_loads(row[0]) or None) if row else None
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("fetch_drift_state failed: %s", exc)
+        return None
+
+
+def fetch_ngram_counts(dsn: str, *, n: int) -> dict[str, int]:
+    with closing(connect(dsn)) as conn:
+        rows = conn.execute("SELECT ngram, count FROM ml_syscall_ngrams WHERE n = ?", (n,)).fetchall()
+    return {row[0]: int(row[1]) for row in rows}
+
+
+def fetch_drift_status(dsn: str, *, history: int = 48) -> dict:
+    try:
+        with closing(connect(dsn)) as conn:
+            cur = conn.execute(
+                """
+                SELECT ts, flag_rate, expected_rate, feature_drift, n_recent, drifted
+                FROM ml_drift ORDER BY ts DESC LIMIT ?
+                """,
+                (max(1, int(history)),),
+            )
+            cols = [d[0] for d in cur.description]
+            rows = []
+            for row in cur.fetchall():
+                rec = dict(zip(cols, row))
+                rec["ts"] = _iso(rec.get("ts"))
+                if rec.get("drifted") is not None:
+                    rec["drifted"] = bool(rec["drifted"])
+                rows.append(rec)
+        if not rows:
+            return {"available": True, "latest": None, "history": []}
+        return {"available": True, "latest": rows[0], "history": list(reversed(rows))}
+    except Exception as exc:  # noqa: BLE001 - API must degrade gracefully
+        logger.warning("fetch_drift_status failed: %s", exc)
+        return {"available": False, "latest": None, "history": []}
+
+
+def fetch_recent_anomalies(dsn: str, *, since_seconds: int = 120, limit: int = 100) -> list[dict]:
+    try:
+        with closing(connect(dsn)) as conn:
+            cur = conn.execute(
+                """
+                SELECT ts, first_ts, count, source, feature, subsystem, type, severity,
+                       score, value, baseline_mean, baseline_std, position, message, meta
+                FROM ml_anomalies
+                WHERE ts > ?
+                ORDER BY ts DESC
+                LIMIT ?
+                """,
+                (time.time() - since_seconds, limit),
+            )
+            cols = [d[0] for d in cur.description]
+            out = []
+            for row in cur.fetchall():
+                rec = dict(zip(cols, row))
+                rec["ts"] = _iso(rec.get("ts"))
+                rec["first_ts"] = _iso(rec.get("first_ts"))
+                meta = _loads(rec.get("meta"))
+                rec["meta"] = meta
+                if meta.get("attack") and not rec.get("attack"):
+                    rec["attack"] = meta["attack"]
+                out.append(rec)
+            return out
+    except Exception as exc:  # noqa: BLE001 - API must degrade gracefully
+        logger.warning("fetch_recent_anomalies failed: %s", exc)
+        return []
@@ -9,16 +9,25 @@ Flow:
 MLflow runs in a *file-light* sqlite store, so there's no always-on server.
 Inspect runs on demand with:  mlflow ui --backend-store-uri sqlite:///mlflow.db
 
+With ``--sweep`` (or ``KERNEL_AI_ML_IF_SWEEP=true``) a small grid of
+contamination x n_estimators x max_samples is fitted across a process pool;
+each candidate is scored on a held-out window of the most recent clean data
+(false-positive rate) and on synthetic attack vectors (recall), and logged as
+a nested MLflow run. The winner is refitted on all data using every core.
+
 Usage:
-    python -m kernel_ai.ml.train [--min-samples N] [--contamination C] [--trees T]
+    python -m kernel_ai.ml.train [--min-samples N] [--contamination C] [--trees T] [--sweep]
 """
 
 from __future__ import annotations
 
 import argparse
+import itertools
 import logging
 import os
 import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 from kernel_ai.ml.config import MLConfig
 from kernel_ai.ml.features import FEATURE_SPECS
@@ -27,7 +36,9 @@ from kernel_ai.ml.store import fetch_training_snapshots
 
 logger = logging.getLogger("kernel_ai.ml.train")
 
-# Canonical feature ordering shared by training and inference.
+# Canonical feature ordering shared by training and inference. Base features
+# only: burst aggregates exist only when the sampler is on, and older snapshots
+# would fill them with zeros.
 FEATURE_ORDER = list(FEATURE_SPECS.keys())
 
 
@@ -55,14 +66,124 @@ def _percentile(values: list[float], pct: float) -> float:
     return ordered[k]
 
 
+# Synthetic attack shapes for scoring sweep candidates: feature -> upward
+# shift in training-std units, applied to held-out clean vectors.
+_ATTACK_SHIFTS: dict[str, dict[str, float]] = {
+    "fork_bomb": {"proc_count": 8.0, "procs_running": 8.0, "ctxt_per_sec": 8.0, "cpu_busy_pct": 4.0},
+    "retrans_storm": {"tcp_retrans_per_sec": 10.0, "tcp_outseg_per_sec": 4.0, "net_softirq_per_sec": 4.0},
+    "miner": {"cpu_busy_pct": 6.0, "load1": 6.0, "run_queue": 6.0},
+    "memory_thrash": {
+        "pgmajfault_per_sec": 8.0, "pgscan_direct_per_sec": 8.0,
+        "psi_mem_some10": 6.0, "swap_io_per_sec": 6.0,
+    },
+}
+
+# Per-process sweep inputs, set once by the pool initializer (not per task).
+_SWEEP_DATA: dict = {}
+
+
+def _parse_max_samples(raw: str) -> int | float | str:
+    raw = raw.strip().lower()
+    if raw == "auto":
+        return raw
+    return float(raw) if "." in raw else int(raw)
+
+
+def _attack_vectors(matrix: list[list[float]], limit: int = 50) -> list[list[float]]:
+    stats = _feature_stats(matrix)
+    index = {name: i for i, name in enumerate(FEATURE_ORDER)}
+    out: list[list[float]] = []
+    for row in matrix[:limit]:
+        for shifts in _ATTACK_SHIFTS.values():
+            vec = list(row)
+            for name, k in shifts.items():
+                std = max(stats[name]["std"], FEATURE_SPECS[name].min_std)
+                vec[index[name]] += k * std
+            out.append(vec)
+    return out
+
+
+def _sweep_init(train_m: list[list[float]], holdout_m: list[list[float]], attacks: list[list[float]]) -> None:
+    _SWEEP_DATA.update(train=train_m, holdout=holdout_m, attacks=attacks)
+
+
+def _flag_rate(model: IsolationForestModel, matrix: list[list[float]]) -> float:
+    if not matrix:
+        return 0.0
+    return sum(1 for p in model.model.predict(matrix) if p == -1) / len(matrix)
+
+
+def _fit_candidate(params: dict) -> dict:
+    t0 = time.perf_counter()
+    model = IsolationForestModel(feature_names=FEATURE_ORDER).fit(
+        _SWEEP_DATA["train"],
+        contamination=params["contamination"],
+        n_estimators=params["n_estimators"],
+        max_samples=params["max_samples"],
+    )
+    return {
+        **params,
+        "fit_sec": time.perf_counter() - t0,
+        "train_flag_rate": _flag_rate(model, _SWEEP_DATA["train"]),
+        "holdout_flag_rate": _flag_rate(model, _SWEEP_DATA["holdout"]),
+        "attack_recall": _flag_rate(model, _SWEEP_DATA["attacks"]),
+    }
+
+
+def sweep(cfg: MLConfig, matrix: list[list[float]], *, holdout_frac: float = 0.2) -> dict:
+    """Fit the configured grid in parallel; return ``{"best": ..., "candidates": [...]}``.
+
+    ``matrix`` is newest-first (as fetched), so the held-out window is the most
+    recent clean data. A candidate is eligible only if its training flag rate
+    sits inside the retrain guardrail band; among those the best
+    ``attack_recall - holdout_flag_rate`` wins (fewer trees on ties: cheaper
+    per-tick scoring). ``best`` is None if no candidate is eligible.
+    """
+    n_hold = max(1, int(len(matrix) * holdout_frac))
+    holdout_m, train_m = matrix[:n_hold], matrix[n_hold:]
+    grid = [
+        {"contamination": float(c), "n_estimators": int(t), "max_samples": _parse_max_samples(m)}
+        for c, t, m in itertools.product(
+            cfg.if_sweep_contamination, cfg.if_sweep_trees, cfg.if_sweep_max_samples
+        )
+    ]
+    if not grid:
+        raise SystemExit("Empty hyperparameter grid (check KERNEL_AI_ML_IF_SWEEP_*)")
+    init_args = (train_m, holdout_m, _attack_vectors(holdout_m))
+    workers = min(len(grid), cfg.if_sweep_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        _sweep_init(*init_args)
+        candidates = [_fit_candidate(p) for p in grid]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_sweep_init, initargs=init_args) as pool:
+            candidates = list(pool.map(_fit_candidate, grid))
+
+    eligible = [
+        c for c in candidates
+        if cfg.retrain_min_flag_rate <= c["train_flag_rate"] <= cfg.retrain_max_flag_rate
+    ]
+    best = max(
+        eligible,
+        key=lambda c: (round(c["attack_recall"] - c["holdout_flag_rate"], 6), -c["n_estimators"]),
+        default=None,
+    )
+    logger.info(
+        "sweep: %d candidates on %d workers, %d eligible, best=%s",
+        len(candidates), workers, len(eligible), best,
+    )
+    return {"best": best, "candidates": candidates}
+
+
 def train(
     cfg: MLConfig,
     *,
     min_samples: int,
     contamination: float,
     trees: int,
+    max_samples: int | float | str = "auto",
     exclude_anomalous: bool = True,
     enforce_guardrails: bool = True,
+    run_sweep: bool = False,
 ) -> dict:
     rows = fetch_training_snapshots(
         cfg.dsn,
@@ -77,8 +198,23 @@ def train(
             f"Let the worker collect more (it runs every {cfg.interval_sec:.0f}s)."
         )
 
+    swept: dict | None = None
+    if run_sweep:
+        swept = sweep(cfg, matrix)
+        best = swept["best"]
+        if best is None and enforce_guardrails:
+            raise SystemExit("No sweep candidate inside the flag-rate guardrails. Keeping previous model.")
+        if best is not None:
+            contamination, trees, max_samples = best["contamination"], best["n_estimators"], best["max_samples"]
+
     model = IsolationForestModel(feature_names=FEATURE_ORDER)
-    model.fit(matrix, contamination=contamination, n_estimators=trees)
+    model.fit(
+        matrix,
+        contamination=contamination,
+        n_estimators=trees,
+        max_samples=max_samples,
+        n_jobs=cfg.if_n_jobs,
+    )
     # Stash training distribution so drift can be measured against it later.
     model.meta["feature_stats"] = _feature_stats(matrix)
 
@@ -97,6 +233,10 @@ def train(
         "score_max": max(scores) if scores else 0.0,
         "excluded_anomalous": 1.0 if exclude_anomalous else 0.0,
     }
+    if swept is not None and swept["best"] is not None:
+        metrics["sweep_candidates"] = float(len(swept["candidates"]))
+        metrics["holdout_flag_rate"] = swept["best"]["holdout_flag_rate"]
+        metrics["attack_recall"] = swept["best"]["attack_recall"]
 
     # Guardrail: refuse to promote a degenerate model (flags ~nothing or
     # ~everything). The previously saved artifact is left untouched.
@@ -135,6 +275,7 @@ def train(
                 {
                     "contamination": contamination,
                     "n_estimators": trees,
+                    "max_samples": max_samples,
                     "n_samples": n,
                     "n_features": len(FEATURE_ORDER),
                     "baseline_window": cfg.baseline_window,
@@ -142,6 +283,12 @@ def train(
                 }
             )
             mlflow.log_metrics(metrics)
+            for cand in (swept or {}).get("candidates", []):
+                with mlflow.start_run(nested=True):
+                    mlflow.log_params({k: cand[k] for k in ("contamination", "n_estimators", "max_samples")})
+                    mlflow.log_metrics(
+                        {k: cand[k] for k in ("fit_sec", "train_flag_rate", "holdout_flag_rate", "attack_recall")}
+                    )
             mlflow.sklearn.log_model(
                 model.model,
                 artifact_path="isoforest",
@@ -177,6 +324,8 @@ def main() -> None:
     parser.add_argument("--min-samples", type=int, default=100)
     parser.add_argument("--contamination", type=float, default=cfg.if_contamination)
     parser.add_argument("--trees", type=int, default=cfg.if_n_estimators)
+    parser.add_argument("--sweep", action="store_true", default=cfg.if_sweep,
+                        help="fit the KERNEL_AI_ML_IF_SWEEP_* grid in parallel and promote the best")
     args = parser.parse_args()
 
     metrics = train(
@@ -184,6 +333,7 @@ def main() -> None:
         min_samples=args.min_samples,
         contamination=args.contamination,
         trees=args.trees,
+        run_sweep=args.sweep,
     )
     logger.info("training done: %s", metrics)
 
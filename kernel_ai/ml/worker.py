@@ -3,7 +3,8 @@
     collect features -> score vs baseline -> emit anomalies -> persist
 
 Runs as its own process so it is fully isolated from the Flask request path.
-Anomalies are written to Postgres in a shape that maps directly onto Kernel DNA
+Anomalies are written to the store (Postgres, or embedded SQLite for
+single-box deployments) in a shape that maps directly onto Kernel DNA
 mutations (type / severity / message / position), enriched with the statistical
 evidence (z-score, baseline) that triggered them.
 """
@@ -13,12 +14,18 @@ from __future__ import annotations
 import logging
 import os
 import signal
+import threading
 import time
+from collections import Counter
 
 from kernel_ai.ml.baseline import EwmaBaseline, Score
 from kernel_ai.ml.config import MLConfig
-from kernel_ai.ml.features import FEATURE_SPECS, FeatureExtractor
-from kernel_ai.ml.store import PostgresStore
+from kernel_ai.ml.drift import DriftTracker
+from kernel_ai.ml.features import FeatureExtractor, active_feature_specs, feature_spec
+from kernel_ai.ml.incidents import IncidentAggregator
+from kernel_ai.ml.metrics import create_worker_metrics
+from kernel_ai.ml.pulse import PulseWriter
+from kernel_ai.ml.store import MLStore, open_store
 
 logger = logging.getLogger("kernel_ai.ml.worker")
 
@@ -35,7 +42,7 @@ def _build_anomalies(scores: dict[str, Score], cfg: MLConfig) -> list[dict]:
         # Attacks present as bursts: we flag upward deviations only.
         if sc.z < cfg.z_warn or sc.value <= sc.mean:
             continue
-        spec = FEATURE_SPECS.get(name)
+        spec = feature_spec(name)
         severity = "high" if sc.z >= cfg.z_crit else "medium"
         out.append(
             {
@@ -68,7 +75,7 @@ def _build_isoforest_anomaly(score: float, scores: dict[str, Score], cfg: MLConf
     """
     top = max(scores.values(), key=lambda s: abs(s.z), default=None)
     feature = top.name if top else "vector"
-    spec = FEATURE_SPECS.get(feature)
+    spec = feature_spec(feature)
     severity = "high" if score > 0.1 else "medium"
     label = spec.label if spec else feature
     return {
@@ -122,17 +129,43 @@ def _build_sequence_anomaly(mismatch: float, misses: int, window_len: int,
 
 
 class MLWorker:
-    def __init__(self, cfg: MLConfig | None = None) -> None:
+    def __init__(self, cfg: MLConfig | None = None, *, store: MLStore | None = None) -> None:
         self.cfg = cfg or MLConfig()
-        self.extractor = FeatureExtractor()
+        self.extractor = FeatureExtractor(burst_period_sec=max(0, self.cfg.burst_sample_ms) / 1000.0)
         self.baseline = EwmaBaseline(alpha=self.cfg.alpha, warmup_samples=self.cfg.warmup_samples)
-        self.store = PostgresStore(self.cfg.dsn)
+        self.store = store if store is not None else open_store(self.cfg.dsn)
         self._running = True
-        self._min_std = {n: s.min_std for n, s in FEATURE_SPECS.items()}
+        # Wall clock for cooldowns / drift buckets; offline replay swaps in the
+        # recorded tick time (kernel_ai.ml.replay).
+        self._clock = time.time
+        # Seconds spent per stage during the last tick (features, baseline, ...).
+        self.stage_timings: dict[str, float] = {}
+        # Compact summary of the last completed tick, published as the live pulse.
+        self.last_tick: dict | None = None
+        self.seq_live: dict | None = None
+        # Anomalies emitted so far, by source (before incident coalescing).
+        self.emitted: Counter[str] = Counter()
+        # Unix time of the last successful load per model ("isoforest", "stide").
+        self.model_loaded_at: dict[str, float] = {}
+        self.incidents: IncidentAggregator | None = None
+        if self.cfg.incident_gap_sec > 0:
+            self.incidents = IncidentAggregator(
+                gap_sec=self.cfg.incident_gap_sec,
+                flush_sec=self.cfg.incident_flush_sec,
+            )
+        self._min_std = {n: s.min_std for n, s in active_feature_specs(self.cfg.burst_sample_ms > 0).items()}
         # Stage 2 model (loaded lazily; absent until train.py has produced it).
         self.model = None
         self._model_mtime: float | None = None
         self._last_if_emit = 0.0
+        # Stage 3 live drift: rolling sufficient statistics, evaluated per tick.
+        self.drift = DriftTracker(
+            window_sec=self.cfg.drift_window_min * 60.0,
+            bucket_sec=self.cfg.drift_bucket_sec,
+        )
+        self.drift_live: dict | None = None
+        # (verdict, time) of the last ml_drift history row written.
+        self._drift_recorded: tuple[bool | None, float] = (None, 0.0)
         self._maybe_load_model()
 
         # Stage 4 (syscall sequence / STIDE). Source is selectable:
@@ -144,13 +177,16 @@ class MLWorker:
         self.seq_tracker = None
         self.seq_model = None
         self._seq_model_mtime: float | None = None
+        self._seq_loader: threading.Thread | None = None
         self._last_seq_emit = 0.0
         self._last_seq_flush = 0.0
         self._seq_source = (self.cfg.seq_source or "procfs").strip().lower()
         if self.cfg.enable_stage4 and self._seq_source != "off":
             from kernel_ai.ml.sequence import NgramTracker, SyscallSampler
 
-            self.seq_tracker = NgramTracker(n=self.cfg.seq_n, window=self.cfg.seq_window)
+            self.seq_tracker = NgramTracker(
+                n=self.cfg.seq_n, window=self.cfg.seq_window, max_pending=self.cfg.seq_max_pending
+            )
             if self._seq_source == "socket":
                 from kernel_ai.ml.collectors.socket_source import SocketSyscallSource
 
@@ -160,7 +196,10 @@ class MLWorker:
                 )
                 logger.info("Stage 4 source=socket (%s)", self.cfg.seq_socket)
             else:
-                self.seq_sampler = SyscallSampler(max_pids=self.cfg.seq_max_pids)
+                self.seq_sampler = SyscallSampler(
+                    max_pids=self.cfg.seq_max_pids,
+                    hot_fraction=self.cfg.seq_hot_fraction,
+                )
                 logger.info("Stage 4 source=procfs")
             self._maybe_load_seq_model()
 
@@ -181,6 +220,10 @@ class MLWorker:
                 lineage_min_count=self.cfg.proc_lineage_min_count,
                 cooldown_sec=self.cfg.proc_cooldown_sec,
                 max_emit_per_tick=self.cfg.proc_max_emit,
+                max_comms=self.cfg.proc_max_comms,
+                state_ttl_sec=self.cfg.proc_state_ttl_sec,
+                max_seen_pids=self.cfg.proc_max_seen_pids,
+                max_lineage=self.cfg.proc_max_lineage,
             )
             try:
                 self.proc_detector.lineage.load_counts(self.store.load_lineage_counts())
@@ -224,29 +267,51 @@ class MLWorker:
             from kernel_ai.ml.model import IsolationForestModel
 
             self.model = IsolationForestModel.load(path)
+            if self._model_mtime is not None:
+                # Flag counts so far describe the previous model.
+                self.drift.reset_flags()
             self._model_mtime = mtime
+            self.model_loaded_at["isoforest"] = time.time()
             logger.info("loaded Stage 2 model: %s (%s)", path, self.model.meta)
         except Exception as exc:  # noqa: BLE001 - keep running on Stage 1 only
             logger.warning("failed to load Stage 2 model: %s", exc)
 
     def _maybe_load_seq_model(self) -> None:
-        """Load / hot-reload the STIDE profile artifact if present and changed."""
+        """Hot-reload the STIDE profile if present and changed, off the tick path.
+
+        The (mmap) load runs in a background thread and the new model is
+        swapped in with a single attribute assignment, so a tick in progress
+        keeps scoring against the previous profile.
+        """
         if not self.cfg.enable_stage4:
             return
-        path = self.cfg.seq_model_path
+        from kernel_ai.ml.sequence import resolve_stide_path
+
+        path = resolve_stide_path(self.cfg.seq_model_path)
         try:
             mtime = os.path.getmtime(path)
         except OSError:
             return  # no profile yet -> sequence scoring stays dormant
         if self._seq_model_mtime is not None and mtime <= self._seq_model_mtime:
             return
+        if self._seq_loader is not None and self._seq_loader.is_alive():
+            return
+        self._seq_model_mtime = mtime
+        self._seq_loader = threading.Thread(
+            target=self._load_seq_model, args=(path,), name="stide-loader", daemon=True,
+        )
+        self._seq_loader.start()
+
+    def _load_seq_model(self, path: str) -> None:
         try:
-            from kernel_ai.ml.sequence import StideModel
+            from kernel_ai.ml.sequence import load_stide
 
-            self.seq_model = StideModel.load(path)
-            self._seq_model_mtime = mtime
-            logger.info("loaded Stage 4 STIDE profile: %s (%s)", path, self.seq_model.meta)
+            model = load_stide(path)
+            self.seq_model = model
+            self.model_loaded_at["stide"] = time.time()
+            logger.info("loaded Stage 4 STIDE profile: %s (%s)", path, model.meta)
         except Exception as exc:  # noqa: BLE001 - keep running without Stage 4
+            self._seq_model_mtime = None  # retry at the next housekeeping pass
             logger.warning("failed to load STIDE profile: %s", exc)
 
     def _tick_sequence(self) -> dict | None:
@@ -259,8 +324,10 @@ class MLWorker:
             if events:
                 self.seq_tracker.update_stream(events)
         elif self.seq_sampler is not None:
-            # Burst of rapid sub-samples: parked daemons still yield X,X,X (normal),
-            # while actively-working processes reveal real syscall transitions.
+            # Pick this tick's working set (hot pids + round-robin rotation) once,
+            # then burst rapid sub-samples over it: parked daemons still yield
+            # X,X,X (normal), while busy processes reveal real syscall transitions.
+            self.seq_sampler.refresh()
             bursts = max(1, self.cfg.seq_subsamples)
             gap = max(0.0, self.cfg.seq_subsample_gap_ms / 1000.0)
             for i in range(bursts):
@@ -273,12 +340,18 @@ class MLWorker:
             return None
 
         # Periodically persist newly observed n-grams so the profile can grow.
-        now = time.time()
+        now = self._clock()
         if (now - self._last_seq_flush) >= self.cfg.seq_flush_sec:
             pending = self.seq_tracker.drain_pending()
-            if pending:
-                self.store.upsert_ngram_counts(self.cfg.seq_n, pending)
             self._last_seq_flush = now
+            if pending:
+                try:
+                    self.store.upsert_ngram_counts(self.cfg.seq_n, pending)
+                except Exception:
+                    # Keep pre-aggregating: the counts ride along with the next
+                    # window's flush instead of being lost.
+                    self.seq_tracker.restore_pending(pending)
+                    raise
 
         if self.seq_model is None:
             return None
@@ -286,6 +359,7 @@ class MLWorker:
         if len(window) < self.cfg.seq_min_window:
             return None
         mismatch, misses = self.seq_model.score_window(window)
+        self.seq_live = {"mismatch": round(mismatch, 4), "misses": misses, "window": len(window)}
         if mismatch < self.cfg.seq_mismatch_warn:
             return None
         if (now - self._last_seq_emit) < self.cfg.seq_cooldown_sec:
@@ -311,7 +385,7 @@ class MLWorker:
         neg = float(score.get("neg_avg_logprob") or score.get("perplexity") or 0.0)
         if neg < self.cfg.stage8_score_warn:
             return None
-        now = time.time()
+        now = self._clock()
         if (now - self._last_stage8_emit) < self.cfg.stage8_cooldown_sec:
             return None
         self._last_stage8_emit = now
@@ -322,62 +396,142 @@ class MLWorker:
         if self.proc_extractor is None or self.proc_detector is None:
             return []
         samples = self.proc_extractor.collect()
-        now = time.time()
+        now = self._clock()
         anomalies = self.proc_detector.score(samples, now=now)
 
-        if self.cfg.proc_store_snapshots and samples and (now - self._last_proc_flush) >= self.cfg.proc_flush_sec:
-            # Persist a compact interesting subset (already interest-ranked).
-            rows = [
-                {
-                    "pid": s.pid,
-                    "ppid": s.ppid,
-                    "comm": s.comm,
-                    "features": {
-                        **s.features,
-                        "parent_comm": s.parent_comm,
-                        "age_sec": round(s.age_sec, 2),
-                        "ruid": s.ruid,
-                        "euid": s.euid,
-                    },
-                }
-                for s in samples[:16]
-            ]
-            try:
-                self.store.insert_proc_snapshots(rows)
-            except Exception as exc:  # noqa: BLE001
-                logger.warning("proc snapshot insert failed: %s", exc)
+        if (now - self._last_proc_flush) >= self.cfg.proc_flush_sec:
+            if self.cfg.proc_store_snapshots and samples:
+                # Persist a compact interesting subset (already interest-ranked).
+                rows = [
+                    {
+                        "pid": s.pid,
+                        "ppid": s.ppid,
+                        "comm": s.comm,
+                        "features": {
+                            **s.features,
+                            "parent_comm": s.parent_comm,
+                            "age_sec": round(s.age_sec, 2),
+                            "ruid": s.ruid,
+                            "euid": s.euid,
+                        },
+                    }
+                    for s in samples[:16]
+                ]
+                try:
+                    self.store.insert_proc_snapshots(rows)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("proc snapshot insert failed: %s", exc)
+            # Lineage counts are flushed even without snapshots: unflushed
+            # pending edges are pinned in memory by the whitelist's eviction.
             pending = self.proc_detector.lineage.drain_pending()
             if pending:
                 try:
                     self.store.upsert_lineage_counts(pending)
                 except Exception as exc:  # noqa: BLE001
-                    logger.warning("lineage upsert failed: %s", exc)
+                    self.proc_detector.lineage.restore_pending(pending)
+                    logger.warning("lineage upsert failed (retrying next flush): %s", exc)
             self._last_proc_flush = now
         return anomalies
 
+    def _tick_drift(self, features: dict[str, float], flagged: bool | None) -> None:
+        now = self._clock()
+        self.drift.update(features, flagged=flagged, now=now)
+        if self.model is None:
+            self.drift_live = None
+            return
+        was_drifted = bool(self.drift_live and self.drift_live.get("drifted"))
+        self.drift_live = self.drift.evaluate(self.model.meta, self.cfg, now=now)
+        if self.drift_live.get("drifted") != was_drifted:
+            logger.info(
+                "drift %s: flag_rate=%.3f feature_drift=%.2f",
+                "detected" if self.drift_live["drifted"] else "cleared",
+                self.drift_live["flag_rate"], self.drift_live["feature_drift"],
+            )
+
+    def _save_drift(self) -> None:
+        self.store.save_drift_state(self.drift.export_state())
+        if self.drift_live is None:
+            return
+        now = self._clock()
+        drifted = bool(self.drift_live.get("drifted"))
+        if drifted == self._drift_recorded[0] and now - self._drift_recorded[1] < self.cfg.drift_record_sec:
+            return
+        self.store.insert_drift(self.drift_live)
+        self._drift_recorded = (drifted, now)
+
+    def _reopen_store(self) -> None:
+        """Replace the store after a failure, releasing the old connection first.
+
+        SQLite batches writes in one open transaction; leaving it behind would
+        keep the lock (and the connection) alive under the new store.
+        """
+        old = self.store
+        try:
+            old.close()
+        except Exception:  # noqa: BLE001 - the old connection may already be dead
+            pass
+        self.store = open_store(self.cfg.dsn)
+
     def stop(self, *_args) -> None:
         self._running = False
 
+    def _lap(self, stage: str, started: float) -> float:
+        """Record time spent in ``stage`` since ``started``; return the new mark."""
+        mark = time.perf_counter()
+        self.stage_timings[stage] = mark - started
+        return mark
+
+    def _pulse_payload(self, features: dict[str, float], scores: dict[str, Score],
+                       if_verdict: dict | None, anomalies: list[dict]) -> dict:
+        """Compact view of this tick for the live pulse (see kernel_ai.ml.pulse)."""
+        return {
+            "features": {k: round(v, 3) for k, v in features.items()},
+            "z": {k: round(sc.z, 2) for k, sc in scores.items() if not sc.warm},
+            "warm": sum(1 for sc in scores.values() if sc.warm),
+            "isoforest": if_verdict,
+            "sequence": self.seq_live,
+            "drift": self.drift_live,
+            "anomalies": [
+                {k: a.get(k) for k in ("source", "feature", "type", "severity", "score")}
+                for a in anomalies
+            ],
+            "timings_ms": {k: round(v * 1000.0, 3) for k, v in self.stage_timings.items()},
+        }
+
     def _tick(self) -> int:
+        self.stage_timings = {}
+        self.last_tick = None
+        mark = time.perf_counter()
         features = self.extractor.collect()
+        mark = self._lap("features", mark)
         if not features:
             return 0
         scores = self.baseline.update_and_score(features, self._min_std)
         anomalies = _build_anomalies(scores, self.cfg)
+        mark = self._lap("baseline", mark)
 
         # Stage 2 second opinion: the forest can catch unusual *combinations*
         # the per-feature z-score misses. Rate-limited so a sustained anomaly
         # doesn't spam one mutation per tick.
+        flagged: bool | None = None
+        if_verdict: dict | None = None
         if self.model is not None:
             try:
                 is_anom, if_score = self.model.score_one(features)
+                flagged = is_anom
+                if_verdict = {"flagged": is_anom, "score": round(if_score, 4)}
             except Exception as exc:  # noqa: BLE001
                 is_anom, if_score = False, 0.0
                 logger.warning("isoforest scoring failed: %s", exc)
-            now = time.time()
+            now = self._clock()
             if is_anom and (now - self._last_if_emit) >= self.cfg.if_cooldown_sec:
                 anomalies.append(_build_isoforest_anomaly(if_score, scores, self.cfg))
                 self._last_if_emit = now
+            mark = self._lap("isoforest", mark)
+
+        # Stage 3 live drift: O(features) per tick, no re-scoring of history.
+        self._tick_drift(features, flagged)
+        mark = self._lap("drift", mark)
 
         # Stage 4 second opinion: anomalous *ordering* of syscalls.
         if self.cfg.enable_stage4:
@@ -387,6 +541,7 @@ class MLWorker:
                     anomalies.append(seq_anom)
             except Exception as exc:  # noqa: BLE001 - never let Stage 4 kill the tick
                 logger.warning("sequence scoring failed: %s", exc)
+            mark = self._lap("sequence", mark)
 
         # Stage 5: which *process* looks odd (lineage / per-comm baselines).
         if self.cfg.enable_stage5:
@@ -394,6 +549,7 @@ class MLWorker:
                 anomalies.extend(self._tick_process())
             except Exception as exc:  # noqa: BLE001 - never let Stage 5 kill the tick
                 logger.warning("process scoring failed: %s", exc)
+            mark = self._lap("process", mark)
 
         # Stage 8: deep sequence (Markov/LSTM) — stub no-op without artifact.
         if self.cfg.enable_stage8:
@@ -403,6 +559,7 @@ class MLWorker:
                     anomalies.append(deep_anom)
             except Exception as exc:  # noqa: BLE001
                 logger.warning("stage8 scoring failed: %s", exc)
+            mark = self._lap("stage8", mark)
 
         # Stage 7: ATT&CK / Sigma-lite labels on whatever Stages 1–5 emitted.
         if self.cfg.enable_stage7 and anomalies:
@@ -415,11 +572,19 @@ class MLWorker:
                 )
             except Exception as exc:  # noqa: BLE001
                 logger.warning("attribution enrich failed: %s", exc)
+            mark = self._lap("attribution", mark)
 
+        self.emitted.update(str(a.get("source") or "unknown") for a in anomalies)
         if self.cfg.store_features:
             self.store.insert_feature_snapshot(features)
-        if anomalies:
+        if self.incidents is not None:
+            now = self._clock()
+            self.incidents.add(anomalies, now)
+            self.incidents.flush(self.store, now)
+        elif anomalies:
             self.store.insert_anomalies(anomalies)
+        self._lap("store", mark)
+        self.last_tick = self._pulse_payload(features, scores, if_verdict, anomalies)
         return len(anomalies)
 
     def run(self) -> None:
@@ -430,6 +595,7 @@ class MLWorker:
         if restored:
             self.baseline.load_state(restored)
             logger.info("restored baseline state for %d features", len(restored))
+        self.drift.load_state(self.store.load_drift_state())
 
         logger.info(
             "ML worker started: interval=%.1fs window=%d warmup=%d z_warn=%.1f z_crit=%.1f",
@@ -437,27 +603,50 @@ class MLWorker:
             self.cfg.z_warn, self.cfg.z_crit,
         )
 
+        metrics = create_worker_metrics(self.cfg)
+        pulse = None
+        if self.cfg.pulse_path:
+            try:
+                pulse = PulseWriter(self.cfg.pulse_path)
+            except OSError as exc:
+                logger.warning("live pulse disabled (%s): %s", self.cfg.pulse_path, exc)
         ticks = 0
         while self._running:
             start = time.time()
             try:
                 n = self._tick()
                 ticks += 1
+                if metrics is not None:
+                    metrics.observe_tick(self, time.time() - start)
+                if pulse is not None and self.last_tick is not None:
+                    pulse.publish({"tick": ticks, **self.last_tick}, ts=start)
                 if n:
                     logger.info("tick %d: emitted %d anomalies", ticks, n)
                 if ticks % _HOUSEKEEPING_EVERY == 0:
                     self.store.save_baseline(self.baseline.export_state())
-                    self.store.prune(self.cfg.retain_features_hours, self.cfg.retain_anomalies_hours)
+                    self._save_drift()
+                    self.store.prune(
+                        self.cfg.retain_features_hours,
+                        self.cfg.retain_anomalies_hours,
+                        self.cfg.retain_drift_hours,
+                    )
                     # Pick up a freshly retrained model without a restart.
                     self._maybe_load_model()
                     self._maybe_load_seq_model()
                     if self.deep_scorer is not None:
                         self.deep_scorer.maybe_reload()
+                    if self.proc_detector is not None:
+                        self.proc_detector.evict_stale(self._clock())
+                        logger.info("stage5 state: %s", self.proc_detector.memory_usage())
+                    if metrics is not None:
+                        metrics.observe_housekeeping(self)
             except Exception as exc:  # noqa: BLE001 - keep the loop alive
                 logger.exception("tick failed: %s", exc)
+                if metrics is not None:
+                    metrics.tick_failures.inc()
                 # Reconnect on DB hiccups rather than dying.
                 try:
-                    self.store = PostgresStore(self.cfg.dsn)
+                    self._reopen_store()
                 except Exception:  # noqa: BLE001
                     time.sleep(2.0)
 
@@ -466,8 +655,17 @@ class MLWorker:
 
         # Graceful shutdown: persist what we learned.
         try:
+            if self.incidents is not None:
+                self.incidents.expire(float("inf"))
+                self.incidents.flush(self.store, self._clock(), force=True)
             self.store.save_baseline(self.baseline.export_state())
+            self.store.save_drift_state(self.drift.export_state())
         finally:
+            if self.seq_sampler is not None:
+                self.seq_sampler.close()
+            self.extractor.close()
+            if pulse is not None:
+                pulse.close()
             self.store.close()
         logger.info("ML worker stopped after %d ticks", ticks)
 
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import itertools
 import logging
 import platform
 import sys
@@ -9,6 +10,7 @@ import time
 
 import psutil
 
+from kernel_ai.collectors.fanout import REQUEST_SCAN_DEADLINE_SEC, fan_out
 from kernel_ai.logging_helpers import log_event
 
 logger = logging.getLogger(__name__)
@@ -369,17 +371,15 @@ def get_io_open_files(limit=40, max_procs=600):
     """
     try:
         counts = {}
-        scanned = 0
-        for proc in psutil.process_iter(["pid", "name"]):
-            if scanned >= max_procs:
-                break
-            scanned += 1
+        procs = list(itertools.islice(psutil.process_iter(["pid", "name"]), max_procs))
+
+        def read_open_files(proc):
             try:
-                open_files = proc.open_files()
+                return proc.info.get("name") or "", proc.info.get("pid"), proc.open_files()
             except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
-                continue
-            name = proc.info.get("name") or ""
-            pid = proc.info.get("pid")
+                return None
+
+        for name, pid, open_files in fan_out(read_open_files, procs, deadline_sec=REQUEST_SCAN_DEADLINE_SEC):
             for file in open_files:
                 path = getattr(file, "path", None)
                 if not path:
@@ -435,7 +435,9 @@ def get_nginx_open_files():
     """Get open files for Nginx process."""
     try:
         nginx_processes = []
-        for proc in psutil.process_iter(["pid", "name", "open_files"]):
+        # Only the name is needed to pick the process; prefetching open_files
+        # here used to walk the fd table of every process on the host.
+        for proc in psutil.process_iter(["pid", "name"]):
             try:
                 if proc.info["name"] and "nginx" in proc.info["name"].lower():
                     nginx_processes.append(proc.info["pid"])
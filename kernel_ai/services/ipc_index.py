@@ -0,0 +1,267 @@
+"""Incremental system-wide ownership index for sockets, pipes, shared maps and namespaces.
+
+``/api/ipc-links`` used to ``readlink`` every fd of every process, read every
+full ``/proc/<pid>/maps`` and six namespace links per pid on each request.
+:class:`IpcOwnershipIndex` keeps what it learned per pid between requests and
+only re-reads a process when it looks changed:
+
+* identity is ``(pid, starttime)`` from ``/proc/<pid>/stat`` (a reused pid is
+  a new process);
+* fds are re-read when the fd directory signature (fd count from its
+  ``st_size`` or a listing, plus ``st_mtime_ns``) moved;
+* shared mappings are re-read when the mapped size moved. procfs reports
+  ``st_size == 0`` for ``maps``, so the total program size from
+  ``/proc/<pid>/statm`` stands in for it;
+* namespaces only change on ``setns``/``unshare`` and are re-read with the rest
+  on the periodic full rescan.
+
+Every pid is fully rescanned at least every ``rescan_sec`` to bound what the
+heuristics can miss (an fd swapped for another at the same count). Inverted
+maps (inode/key -> owner pids) are maintained alongside, so pair computation
+runs in memory.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+
+from kernel_ai.collectors.fanout import REQUEST_SCAN_DEADLINE_SEC, fan_out
+
+NAMESPACE_KEYS = ("mnt", "pid", "net", "ipc", "uts", "user")
+_SOCKET_RE = re.compile(r"^socket:\[(\d+)\]$")
+_PIPE_RE = re.compile(r"^pipe:\[(\d+)\]$")
+_NS_RE = re.compile(r"\[(\d+)\]")
+
+
+class _PidEntry:
+    __slots__ = ("start", "comm", "fd_sig", "statm_size", "scanned_at", "sockets", "pipes", "shm", "namespaces")
+
+    def __init__(self, start, comm):
+        self.start = start
+        self.comm = comm
+        self.fd_sig = None
+        self.statm_size = None
+        self.scanned_at = None
+        self.sockets = frozenset()
+        self.pipes = frozenset()
+        self.shm = frozenset()
+        self.namespaces = frozenset()
+
+
+class IpcOwnershipIndex:
+    """Owner pids per socket inode, pipe inode, shared mapping and namespace."""
+
+    def __init__(self, proc_root="/proc", rescan_sec=30.0, deadline_sec=REQUEST_SCAN_DEADLINE_SEC):
+        self.proc_root = proc_root
+        self.rescan_sec = rescan_sec
+        self.deadline_sec = deadline_sec
+        self.lock = threading.Lock()
+        self._pids = {}
+        self.sockets = {}
+        self.pipes = {}
+        self.shm = {}
+        self.namespaces = {}
+        self.stats = {"pids": 0, "fd_scans": 0, "maps_scans": 0, "ns_scans": 0, "skipped": 0}
+
+    # ------------------------------------------------------------ per-pid reads
+
+    def _read_stat(self, pid):
+        """``(comm, starttime)`` or None if the process is gone."""
+        try:
+            with open(f"{self.proc_root}/{pid}/stat", "r", encoding="utf-8", errors="replace") as f:
+                raw = f.read()
+        except (OSError, PermissionError):
+            return None
+        head, sep, tail = raw.rpartition(")")
+        if not sep:
+            return None
+        comm = head.partition("(")[2].strip()
+        fields = tail.split()
+        start = fields[19] if len(fields) > 19 else ""
+        return comm, start
+
+    def _fd_signature(self, pid):
+        fd_dir = f"{self.proc_root}/{pid}/fd"
+        try:
+            st = os.stat(fd_dir)
+            count = st.st_size or len(os.listdir(fd_dir))
+        except (OSError, PermissionError):
+            return None
+        return count, st.st_mtime_ns
+
+    def _read_fds(self, pid):
+        fd_dir = f"{self.proc_root}/{pid}/fd"
+        sockets = set()
+        pipes = set()
+        try:
+            fd_entries = os.listdir(fd_dir)
+        except (OSError, PermissionError):
+            return frozenset(), frozenset()
+        for fd_entry in fd_entries:
+            try:
+                target = os.readlink(f"{fd_dir}/{fd_entry}")
+            except (OSError, PermissionError):
+                continue
+            sm = _SOCKET_RE.match(target)
+            if sm:
+                sockets.add(int(sm.group(1)))
+                continue
+            pm = _PIPE_RE.match(target)
+            if pm:
+                pipes.add(int(pm.group(1)))
+        return frozenset(sockets), frozenset(pipes)
+
+    def _statm_size(self, pid):
+        try:
+            with open(f"{self.proc_root}/{pid}/statm", "r", encoding="utf-8") as f:
+                return int(f.read().split()[0])
+        except (OSError, PermissionError, ValueError, IndexError):
+            return None
+
+    def _read_shared_maps(self, pid):
+        keys = set()
+        try:
+            with open(f"{self.proc_root}/{pid}/maps", "r", encoding="utf-8", errors="replace") as maps_file:
+                for map_line in maps_file:
+                    parts = map_line.strip().split(None, 5)
+                    if len(parts) < 6:
+                        continue
+                    perms, dev, inode_text, map_path = parts[1], parts[3], parts[4], parts[5]
+                    if len(perms) < 4 or perms[3] != "s":
+                        continue
+                    if not inode_text.isdigit() or int(inode_text) <= 0:
+                        continue
+                    if not map_path or map_path.startswith("["):
+                        continue
+                    keys.add(f"{dev}:{inode_text}:{map_path}")
+        except (OSError, PermissionError):
+            pass
+        return frozenset(keys)
+
+    def _read_namespaces(self, pid):
+        keys = set()
+        for ns_name in NAMESPACE_KEYS:
+            try:
+                target = os.readlink(f"{self.proc_root}/{pid}/ns/{ns_name}")
+            except (OSError, PermissionError):
+                continue
+            match = _NS_RE.search(target)
+            keys.add(f"{ns_name}:{match.group(1) if match else target}")
+        return frozenset(keys)
+
+    # ------------------------------------------------------------ inverted maps
+
+    @staticmethod
+    def _swap(inverted, pid, old, new):
+        for key in old - new:
+            owners = inverted.get(key)
+            if owners is not None:
+                owners.discard(pid)
+                if not owners:
+                    del inverted[key]
+        for key in new - old:
+            inverted.setdefault(key, set()).add(pid)
+
+    def _drop(self, pid):
+        entry = self._pids.pop(pid)
+        self._swap(self.sockets, pid, entry.sockets, frozenset())
+        self._swap(self.pipes, pid, entry.pipes, frozenset())
+        self._swap(self.shm, pid, entry.shm, frozenset())
+        self._swap(self.namespaces, pid, entry.namespaces, frozenset())
+
+    def _probe(self, pid, now):
+        """Read whatever changed for ``pid``; never mutates the index (runs on the scan pool)."""
+        ident = self._read_stat(pid)
+        if ident is None or not ident[0]:
+            return None
+        comm, start = ident
+        entry = self._pids.get(pid)
+        if entry is not None and entry.start != start:
+            entry = None
+        full = entry is None or entry.scanned_at is None or now - entry.scanned_at >= self.rescan_sec
+        probe = {"pid": pid, "comm": comm, "start": start, "full": full,
+                 "fd_sig": self._fd_signature(pid), "fds": None, "statm": None, "shm": None, "ns": None}
+        if probe["fd_sig"] is None:
+            # Unreadable fd table (permissions / exiting): keep the name only.
+            return probe
+        if full or probe["fd_sig"] != entry.fd_sig:
+            probe["fds"] = self._read_fds(pid)
+        probe["statm"] = self._statm_size(pid)
+        if full or probe["statm"] != entry.statm_size:
+            probe["shm"] = self._read_shared_maps(pid)
+        if full:
+            probe["ns"] = self._read_namespaces(pid)
+        return probe
+
+    def _apply(self, probe, now):
+        pid = probe["pid"]
+        entry = self._pids.get(pid)
+        if entry is not None and entry.start != probe["start"]:
+            self._drop(pid)
+            entry = None
+        if entry is None:
+            entry = self._pids[pid] = _PidEntry(probe["start"], probe["comm"])
+        entry.comm = probe["comm"]
+        entry.fd_sig = probe["fd_sig"]
+        if entry.fd_sig is None:
+            probe["fds"] = (frozenset(), frozenset())
+        touched = False
+        if probe["fds"] is not None:
+            sockets, pipes = probe["fds"]
+            self._swap(self.sockets, pid, entry.sockets, sockets)
+            self._swap(self.pipes, pid, entry.pipes, pipes)
+            entry.sockets, entry.pipes = sockets, pipes
+            self.stats["fd_scans"] += 1
+            touched = True
+        if probe["shm"] is not None:
+            self._swap(self.shm, pid, entry.shm, probe["shm"])
+            entry.shm, entry.statm_size = probe["shm"], probe["statm"]
+            self.stats["maps_scans"] += 1
+            touched = True
+        if probe["ns"] is not None:
+            self._swap(self.namespaces, pid, entry.namespaces, probe["ns"])
+            entry.namespaces = probe["ns"]
+            entry.scanned_at = now
+            self.stats["ns_scans"] += 1
+        if not touched:
+            self.stats["skipped"] += 1
+
+    # ------------------------------------------------------------ public
+
+    def refresh(self, now=None):
+        """Bring the index up to date with the live process table (call under ``lock``).
+
+        Per-pid reads fan out across the shared /proc scan pool; the index
+        itself is only mutated here, in pid-list order. Pids the scan did not
+        reach before ``deadline_sec`` keep their previous entry; only pids gone
+        from the listing are dropped.
+        """
+        now = time.monotonic() if now is None else now
+        pids = [int(d) for d in os.listdir(self.proc_root) if d.isdigit()]
+        for probe in fan_out(lambda pid: self._probe(pid, now), pids, deadline_sec=self.deadline_sec):
+            self._apply(probe, now)
+        listed = set(pids)
+        for pid in [p for p in self._pids if p not in listed]:
+            self._drop(pid)
+        self.stats["pids"] = len(self._pids)
+        return self
+
+    def names(self):
+        """Current ``{pid: comm}`` of indexed processes."""
+        return {pid: entry.comm for pid, entry in self._pids.items()}
+
+    def sockets_of(self, pid):
+        """Socket inodes held open by ``pid`` (empty if unknown or unreadable)."""
+        entry = self._pids.get(pid)
+        return entry.sockets if entry is not None else frozenset()
+
+
+_IPC_INDEX = IpcOwnershipIndex()
+
+
+def get_ipc_index():
+    """Process-wide index shared by request threads."""
+    return _IPC_INDEX
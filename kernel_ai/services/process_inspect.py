@@ -4,16 +4,23 @@ from __future__ import annotations
 
 import os
 import re
+import threading
 import time
 
 import psutil
 
+from kernel_ai.collectors.fanout import fan_out
+from kernel_ai.services import ipc_index as _ipc_index_service
 from kernel_ai.services import system_view as _system_view_service
 from kernel_ai.sentry_helpers import capture_exception
 
 
-def _parse_proc_net_socket_inodes():
-    """Map socket inodes to coarse transport families available from /proc/net."""
+def _parse_proc_net_socket_inodes(tcp_endpoints=None):
+    """Map socket inodes to coarse transport families available from /proc/net.
+
+    When ``tcp_endpoints`` is given it is filled with connected TCP sockets as
+    ``(local, remote) -> inode`` (raw hex ``addr:port`` as in /proc/net/tcp*).
+    """
     socket_kinds = {}
 
     try:
@@ -40,139 +47,82 @@ def _parse_proc_net_socket_inodes():
                     if len(parts) < 10 or parts[0] == "sl":
                         continue
                     if parts[9].isdigit():
-                        socket_kinds[int(parts[9])] = kind
+                        inode = int(parts[9])
+                        socket_kinds[inode] = kind
+                        if (
+                            tcp_endpoints is not None
+                            and kind == "tcp"
+                            and inode
+                            and not parts[2].endswith(":0000")
+                        ):
+                            tcp_endpoints[(parts[1], parts[2])] = inode
         except (OSError, PermissionError):
             continue
 
     return socket_kinds
 
 
-def _collect_local_tcp_pairs(proc_names_by_pid):
-    """Return local process-name pairs connected through TCP loopback/local sockets."""
-    endpoints = {}
-    try:
-        connections = psutil.net_connections(kind="tcp")
-    except (psutil.AccessDenied, OSError):
-        return []
-
-    for conn in connections:
-        pid = getattr(conn, "pid", None)
-        laddr = getattr(conn, "laddr", None)
-        raddr = getattr(conn, "raddr", None)
-        if not pid or not laddr or not raddr:
-            continue
-        if not hasattr(laddr, "ip") or not hasattr(raddr, "ip"):
-            continue
-        endpoints[(laddr.ip, int(laddr.port), raddr.ip, int(raddr.port))] = int(pid)
+def _collect_local_tcp_pairs(proc_names_by_pid, tcp_endpoints, socket_owners):
+    """Return local process-name pairs connected through TCP loopback/local sockets.
 
+    Both ends of a local connection show up in /proc/net/tcp* with swapped
+    addresses; their inodes resolve to pids through the ownership index.
+    """
     pairs = set()
-    for (local_ip, local_port, remote_ip, remote_port), left_pid in endpoints.items():
-        right_pid = endpoints.get((remote_ip, remote_port, local_ip, local_port))
-        if not right_pid or right_pid == left_pid:
+    for (local, remote), inode in tcp_endpoints.items():
+        peer_inode = tcp_endpoints.get((remote, local))
+        if not peer_inode:
             continue
-        left_name = proc_names_by_pid.get(left_pid)
-        right_name = proc_names_by_pid.get(right_pid)
-        if not left_name or not right_name:
-            continue
-        pairs.add(tuple(sorted((left_name, right_name))))
+        for left_pid in socket_owners.get(inode, ()):
+            for right_pid in socket_owners.get(peer_inode, ()):
+                if right_pid == left_pid:
+                    continue
+                left_name = proc_names_by_pid.get(left_pid)
+                right_name = proc_names_by_pid.get(right_pid)
+                if not left_name or not right_name:
+                    continue
+                pairs.add(tuple(sorted((left_name, right_name))))
 
     return sorted(pairs)
 
 
 def get_ipc_links_summary(max_pairs=120, max_nodes=24):
-    """Collect IPC relationships by shared sockets, pipes and shared memory mappings."""
-    socket_inode_re = re.compile(r"^socket:\[(\d+)\]$")
-    pipe_inode_re = re.compile(r"^pipe:\[(\d+)\]$")
-    socket_kinds = _parse_proc_net_socket_inodes()
-    socket_owners = {}
-    other_socket_owners = {}
-    unix_socket_owners = {}
-    tcp_socket_owners = {}
-    pipe_owners = {}
-    shm_owners = {}
-    namespace_keys = ["mnt", "pid", "net", "ipc", "uts", "user"]
-    namespace_owners = {}
-    proc_names_by_pid = {}
-
-    for proc_dir in os.listdir("/proc"):
-        if not proc_dir.isdigit():
-            continue
-        pid = int(proc_dir)
-        try:
-            with open(f"/proc/{pid}/comm", "r", encoding="utf-8", errors="replace") as f:
-                proc_name = f.read().strip()
-        except (OSError, PermissionError):
-            continue
-        if not proc_name:
-            continue
-        proc_names_by_pid[pid] = proc_name
-
-        fd_dir = f"/proc/{pid}/fd"
-        try:
-            fd_entries = os.listdir(fd_dir)
-        except (OSError, PermissionError):
-            continue
-
-        for fd_entry in fd_entries:
-            fd_path = f"{fd_dir}/{fd_entry}"
-            try:
-                target = os.readlink(fd_path)
-            except (OSError, PermissionError):
-                continue
-
-            sm = socket_inode_re.match(target)
-            if sm:
-                inode = int(sm.group(1))
-                socket_owners.setdefault(inode, set()).add((pid, proc_name))
-                socket_kind = socket_kinds.get(inode)
-                if socket_kind == "unix":
-                    unix_socket_owners.setdefault(inode, set()).add((pid, proc_name))
-                elif socket_kind == "tcp":
-                    tcp_socket_owners.setdefault(inode, set()).add((pid, proc_name))
-                else:
-                    other_socket_owners.setdefault(inode, set()).add((pid, proc_name))
-                continue
-
-            pm = pipe_inode_re.match(target)
-            if pm:
-                inode = int(pm.group(1))
-                pipe_owners.setdefault(inode, set()).add((pid, proc_name))
+    """Collect IPC relationships by shared sockets, pipes and shared memory mappings.
 
-        maps_path = f"/proc/{pid}/maps"
-        try:
-            with open(maps_path, "r", encoding="utf-8", errors="replace") as maps_file:
-                for map_line in maps_file:
-                    parts = map_line.strip().split(None, 5)
-                    if len(parts) < 5:
-                        continue
-                    perms = parts[1]
-                    dev = parts[3]
-                    inode_text = parts[4]
-                    map_path = parts[5] if len(parts) > 5 else ""
-
-                    if len(perms) < 4 or perms[3] != "s":
-                        continue
-                    if not inode_text.isdigit():
-                        continue
-                    inode = int(inode_text)
-                    if inode <= 0:
-                        continue
-                    if not map_path:
-                        continue
-                    if map_path.startswith("["):
-                        continue
+    Ownership comes from the incremental :mod:`kernel_ai.services.ipc_index`;
+    only processes that changed since the previous request are re-read.
+    """
+    tcp_endpoints = {}
+    socket_kinds = _parse_proc_net_socket_inodes(tcp_endpoints)
+    index = _ipc_index_service.get_ipc_index()
+    with index.lock:
+        index.refresh()
+        proc_names_by_pid = index.names()
+
+        def owners_of(inverted, shared_only=False):
+            return {
+                key: {(pid, proc_names_by_pid[pid]) for pid in pids}
+                for key, pids in inverted.items()
+                if not shared_only or len(pids) > 1
+            }
 
-                    shm_key = f"{dev}:{inode}:{map_path}"
-                    shm_owners.setdefault(shm_key, set()).add((pid, proc_name))
-        except (OSError, PermissionError):
-            continue
+        socket_owners = owners_of(index.sockets, shared_only=True)
+        pipe_owners = owners_of(index.pipes, shared_only=True)
+        shm_owners = owners_of(index.shm, shared_only=True)
+        namespace_owners = owners_of(index.namespaces, shared_only=True)
+        tcp_socket_pids = {inode: set(index.sockets.get(inode, ())) for inode in tcp_endpoints.values()}
 
-        for ns_name in namespace_keys:
-            ns_inode = _system_view_service.read_namespace_inode(pid, ns_name)
-            if not ns_inode:
-                continue
-            ns_key = f"{ns_name}:{ns_inode}"
-            namespace_owners.setdefault(ns_key, set()).add((pid, proc_name))
+    other_socket_owners = {}
+    unix_socket_owners = {}
+    tcp_socket_owners = {}
+    for inode, owners in socket_owners.items():
+        socket_kind = socket_kinds.get(inode)
+        if socket_kind == "unix":
+            unix_socket_owners[inode] = owners
+        elif socket_kind == "tcp":
+            tcp_socket_owners[inode] = owners
+        else:
+            other_socket_owners[inode] = owners
 
     pair_totals = {}
     pair_socket = {}
@@ -242,7 +192,7 @@ def get_ipc_links_summary(max_pairs=120, max_nodes=24):
     consume_inode_owners(pipe_owners, "pipe")
     consume_inode_owners(shm_owners, "shm")
     consume_inode_owners(namespace_owners, "namespace")
-    local_tcp_pairs = _collect_local_tcp_pairs(proc_names_by_pid)
+    local_tcp_pairs = _collect_local_tcp_pairs(proc_names_by_pid, tcp_endpoints, tcp_socket_pids)
     for left_name, right_name in local_tcp_pairs:
         add_pair_counts(left_name, right_name, "tcp")
 
@@ -296,9 +246,9 @@ def get_ipc_links_summary(max_pairs=120, max_nodes=24):
     }
 
 
-def get_process_threads_info(pid):
+def get_process_threads_info(pid, proc=None):
     try:
-        proc = psutil.Process(pid)
+        proc = proc or psutil.Process(pid)
         threads = proc.threads()
         thread_count = proc.num_threads()
 
@@ -329,11 +279,12 @@ def get_process_threads_info(pid):
         return {"error": str(e)}
 
 
-def get_process_cpu_info(pid):
+def get_process_cpu_info(pid, proc=None, interval=0.1):
+    """CPU times and usage; ``interval=None`` expects ``proc.cpu_percent()`` to have been primed."""
     try:
-        proc = psutil.Process(pid)
+        proc = proc or psutil.Process(pid)
         cpu_times = proc.cpu_times()
-        cpu_percent = proc.cpu_percent(interval=0.1)
+        cpu_percent = proc.cpu_percent(interval=interval)
 
         try:
             cpu_affinity = proc.cpu_affinity()
@@ -470,9 +421,9 @@ def get_process_namespace_fingerprint(pid):
     }
 
 
-def get_process_fds_info(pid):
+def get_process_fds_info(pid, proc=None, namespace_fingerprint=None):
     try:
-        proc = psutil.Process(pid)
+        proc = proc or psutil.Process(pid)
 
         try:
             num_fds = proc.num_fds()
@@ -580,10 +531,106 @@ def get_process_fds_info(pid):
             "open_files": open_files[:20],
             "connections": connections[:20],
             "descriptors": descriptors[:40],
-            "namespace_fingerprint": get_process_namespace_fingerprint(pid),
+            "namespace_fingerprint": namespace_fingerprint or get_process_namespace_fingerprint(pid),
         }
     except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
         return {"error": f"Access denied or process not found: {str(e)}"}
     except Exception as e:
         capture_exception(e, where="services.process_inspect.get_process_fds_info")
         return {"error": f"Error getting FDs: {str(e)}"}
+
+
+BATCH_SECTIONS = ("threads", "cpu", "fds", "namespaces")
+BATCH_MAX_PIDS = 32
+BATCH_CACHE_TTL_S = 2.0
+_BATCH_CACHE = {}
+_BATCH_CACHE_LOCK = threading.Lock()
+
+
+def _batch_sections(pid, proc, sections):
+    """Compute ``sections`` for one process from a single ``oneshot`` view (runs on the scan pool)."""
+    out = {}
+    with proc.oneshot():
+        fingerprint = None
+        if "namespaces" in sections or "fds" in sections:
+            fingerprint = get_process_namespace_fingerprint(pid)
+        if "threads" in sections:
+            out["threads"] = get_process_threads_info(pid, proc=proc)
+        if "cpu" in sections:
+            out["cpu"] = get_process_cpu_info(pid, proc=proc, interval=None)
+        if "fds" in sections:
+            out["fds"] = get_process_fds_info(pid, proc=proc, namespace_fingerprint=fingerprint)
+        if "namespaces" in sections:
+            out["namespaces"] = fingerprint
+    return pid, out
+
+
+def get_process_batch_info(pids, include=BATCH_SECTIONS):
+    """Threads / cpu / fds / namespace details for several pids in one pass.
+
+    Replaces one request per pid and section: each process gets one
+    ``psutil.Process`` (read under ``oneshot``), a single shared 100 ms CPU
+    sampling window instead of one per pid, and one namespace fingerprint shared
+    by the ``fds`` and ``namespaces`` sections. Sections are cached per pid for
+    ``BATCH_CACHE_TTL_S`` so hover-driven repeats do not touch /proc.
+    """
+    include = list(dict.fromkeys(include))
+    unknown = [section for section in include if section not in BATCH_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown include section(s): {', '.join(unknown)}")
+    pids = list(dict.fromkeys(int(pid) for pid in pids))
+    if not pids or not include:
+        raise ValueError("Expected at least one pid and one include section")
+    if len(pids) > BATCH_MAX_PIDS:
+        raise ValueError(f"At most {BATCH_MAX_PIDS} pids per batch")
+
+    now = time.time()
+    results = {pid: {} for pid in pids}
+    procs = {}
+    idents = {}
+    for pid in pids:
+        try:
+            procs[pid] = psutil.Process(pid)
+            # create_time tells a reused pid apart from the process cached before.
+            idents[pid] = (pid, procs[pid].create_time())
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            procs.pop(pid, None)
+            results[pid] = {section: {"error": str(e)} for section in include}
+
+    pending = {}
+    cached_hits = 0
+    with _BATCH_CACHE_LOCK:
+        for pid in procs:
+            for section in include:
+                cached = _BATCH_CACHE.get((idents[pid], section))
+                if cached is not None and now - cached[0] < BATCH_CACHE_TTL_S:
+                    results[pid][section] = cached[1]
+                    cached_hits += 1
+                else:
+                    pending.setdefault(pid, []).append(section)
+
+    sampled = [procs[pid] for pid, sections in pending.items() if "cpu" in sections]
+    for proc in sampled:
+        try:
+            proc.cpu_percent(interval=None)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    if sampled:
+        time.sleep(0.1)
+
+    computed_rows = fan_out(lambda pid: _batch_sections(pid, procs[pid], pending[pid]), list(pending), min_shard=2)
+    with _BATCH_CACHE_LOCK:
+        for pid, computed in computed_rows:
+            results[pid].update(computed)
+            for section, payload in computed.items():
+                if not (isinstance(payload, dict) and "error" in payload):
+                    _BATCH_CACHE[(idents[pid], section)] = (now, payload)
+        if len(_BATCH_CACHE) > 1024:
+            for key in [k for k, (ts, _payload) in _BATCH_CACHE.items() if now - ts >= BATCH_CACHE_TTL_S]:
+                del _BATCH_CACHE[key]
+
+    return {
+        "include": include,
+        "processes": {str(pid): results[pid] for pid in pids},
+        "cache_hits": cached_hits,
+    }
@@ -3,16 +3,19 @@
 from __future__ import annotations
 
 from datetime import datetime
+import time
 
 import psutil
 
+from kernel_ai.services import timeline_sampler as _timeline_sampler_service
+
 
 def _clamp_window_s(window_s: int | float | None) -> int:
     try:
         value = int(window_s or 30)
     except (TypeError, ValueError):
         value = 30
-    return max(5, min(120, value))
+    return max(5, min(_timeline_sampler_service.MAX_WINDOW_SEC, value))
 
 
 def _stamp_events_with_time_window(ordered_events: list[dict], proc_create_time: float, window_s: int) -> list[dict]:
@@ -186,8 +189,38 @@ def _read_lock_unlock_event(pid: int) -> dict | None:
     return {"type": "lock/unlock", "name": "proc_locks", "count": lock_count}
 
 
+def _stamp_sampled_events(events: list[dict], pid: int, start_ts: float) -> list[dict]:
+    """Render ring events (``ts`` = real sample time) in the timeline row shape."""
+    timeline = []
+    for ev in events:
+        row = dict(ev)
+        event_ts = row.pop("ts")
+        row["pid"] = pid
+        row["timestamp"] = datetime.fromtimestamp(event_ts).isoformat()
+        row["relative_s"] = round(event_ts - start_ts, 3)
+        timeline.append(row)
+    return timeline
+
+
+def _sampled_timeline(pid: int, create_time: float, window_s: int) -> list[dict] | None:
+    """Real events of ``pid`` from the background sampler, or None until it has a ring."""
+    now_ts = time.time()
+    start_ts = now_ts - window_s
+    events = _timeline_sampler_service.get_timeline_sampler().events(pid, start_ts)
+    if events is None:
+        return None
+    if create_time and create_time >= start_ts:
+        events.insert(0, {"ts": float(create_time), "type": "exec", "name": "exec"})
+    return _stamp_sampled_events(events, pid, start_ts)
+
+
 def get_proc_timeline_data(pid, window_s: int = 30):
-    """Build timeline-like process events from /proc snapshots."""
+    """Process events for the last ``window_s`` seconds.
+
+    Served from the background sampler's ring for ``pid`` (real timestamps).
+    The first request for a pid only starts watching it, so it gets the old
+    snapshot timeline spread over the window instead.
+    """
     if not pid:
         raise ValueError("PID parameter required")
 
@@ -199,6 +232,24 @@ def get_proc_timeline_data(pid, window_s: int = 30):
     proc_info = proc.as_dict(["pid", "name", "create_time", "status"])
     base_ts = float(proc_info["create_time"])
     window_s = _clamp_window_s(window_s)
+    sampler = _timeline_sampler_service.get_timeline_sampler()
+    sampler.watch(pid)
+
+    sampled = _sampled_timeline(pid, base_ts, window_s)
+    if sampled is not None:
+        return {
+            "timeline": sampled,
+            "pid": pid,
+            "name": proc_info.get("name", "unknown"),
+            "timestamp": datetime.now().isoformat(),
+            "window_s": window_s,
+            "timeline_source": "sampler",
+            "timeline_time_basis": (
+                f"Events are deltas of /proc/{pid} counters sampled every "
+                f"{int(sampler.period_sec * 1000)} ms, stamped with the sample time."
+            ),
+        }
+
     ordered_events = [{"type": "exec", "name": "exec", "pid": pid}]
 
     syscall_ev = _read_proc_syscall_event(pid)
@@ -247,16 +298,62 @@ def get_proc_timeline_data(pid, window_s: int = 30):
         "name": proc_info.get("name", "unknown"),
         "timestamp": datetime.now().isoformat(),
         "window_s": window_s,
+        "timeline_source": "snapshot",
         "timeline_time_basis": "Events are sampled from /proc and distributed over selected window as a relative timeline (not exact per-event kernel timestamps).",
     }
 
 
+def _sampled_branches(top: list[dict], limit: int, events: int, window_s: int) -> list[dict]:
+    branches = []
+    for candidate in top:
+        if len(branches) >= limit:
+            break
+        pid = int(candidate["pid"])
+        timeline = _sampled_timeline(pid, 0.0, window_s)
+        if not timeline:
+            continue
+        timeline = timeline[-events:]
+        branches.append(
+            {
+                "pid": pid,
+                "name": str(candidate.get("name") or ""),
+                "cpu_percent": float(candidate.get("cpu_percent") or 0.0),
+                "memory_mb": float(candidate.get("memory_mb") or 0.0),
+                "timeline": timeline,
+                "event_count": len(timeline),
+            }
+        )
+    return branches
+
+
 def get_proc_timeline_branches_data(limit: int = 6, events: int = 10, window_s: int = 30):
-    """Build process-branch timeline payload for multi-branch visualization."""
+    """Build process-branch timeline payload for multi-branch visualization.
+
+    Branches come from the sampler's top CPU consumers and their rings, so a
+    request does not scan the process table. Until the sampler has data (first
+    request after idle) the per-request snapshot path below is used.
+    """
     limit = max(1, min(12, int(limit)))
     events = max(3, min(24, int(events)))
     window_s = _clamp_window_s(window_s)
 
+    sampler = _timeline_sampler_service.get_timeline_sampler()
+    sampler.watch()
+    branches = _sampled_branches(sampler.top(), limit, events, window_s)
+    if branches:
+        return {
+            "branches": branches,
+            "timestamp": datetime.now().isoformat(),
+            "meta": {
+                "limit": limit,
+                "events_per_branch": events,
+                "window_s": window_s,
+                "branch_count": len(branches),
+                "mode": "multi-branch-v1",
+                "timeline_source": "sampler",
+            },
+        }
+
     candidates = []
     for proc in psutil.process_iter(["pid", "name", "cpu_percent", "memory_info"]):
         try:
@@ -315,5 +412,6 @@ def get_proc_timeline_branches_data(limit: int = 6, events: int = 10, window_s:
             "window_s": window_s,
             "branch_count": len(branches),
             "mode": "multi-branch-v1",
+            "timeline_source": "snapshot",
         },
     }
@@ -0,0 +1,288 @@
+"""Maintained ppid tree with incremental subtree aggregates, backing ``/api/process-tree``.
+
+:class:`ProcessTreeIndex` keeps one node per live process (keyed by pid and
+checked against ``starttime`` so a reused pid is a new process) and, for every
+node, the sum of cpu / rss / fds / threads / process count over its subtree.
+Each refresh reads ``/proc/<pid>/stat`` and the fd directory size of every
+pid on the shared scan pool, then touches the aggregates only along the
+ancestor chains of what changed:
+
+* a birth or death adds / subtracts the node's subtree sums up its chain;
+* a reparent (``ppid`` moved, e.g. to a subreaper after the parent exited)
+  subtracts from the old chain and adds to the new one;
+* a counter change adds the delta up the chain.
+
+So "which service tree is eating the box" costs O(changed x depth) per tick
+instead of rebuilding and summing the whole tree on every request.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+import heapq
+import os
+import threading
+import time
+
+from kernel_ai.collectors.fanout import REQUEST_SCAN_DEADLINE_SEC, fan_out
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Aggregate slots: own and subtree values are plain lists in this order.
+METRICS = ("cpu_percent", "rss_bytes", "fds", "threads", "processes")
+SORT_KEYS = {"cpu": 0, "rss": 1, "fds": 2, "threads": 3, "processes": 4}
+
+
+class _Node:
+    __slots__ = ("pid", "ppid", "start", "comm", "ticks", "sampled_at", "own", "agg", "parent", "children")
+
+    def __init__(self, pid, probe, now):
+        self.pid = pid
+        self.ppid = probe["ppid"]
+        self.start = probe["start"]
+        self.comm = probe["comm"]
+        self.ticks = probe["ticks"]
+        self.sampled_at = now
+        self.own = [0.0, probe["rss"], probe["fds"], probe["threads"], 1]
+        self.agg = list(self.own)
+        self.parent = None
+        self.children = set()
+
+
+class ProcessTreeIndex:
+    """Live process tree keyed by pid with per-subtree resource sums."""
+
+    def __init__(self, proc_root="/proc", min_interval_sec=1.0, clock=time.monotonic,
+                 deadline_sec=REQUEST_SCAN_DEADLINE_SEC):
+        self.proc_root = proc_root
+        self.min_interval_sec = min_interval_sec
+        self.deadline_sec = deadline_sec
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.nodes = {}
+        self.refreshed_at = None
+        self.stats = {"pids": 0, "births": 0, "deaths": 0, "reparents": 0, "updates": 0}
+
+    # ------------------------------------------------------------ per-pid reads
+
+    def _probe(self, pid):
+        """Counters of one process, or None if it is gone (runs on the scan pool)."""
+        try:
+            with open(f"{self.proc_root}/{pid}/stat", "r", encoding="utf-8", errors="replace") as f:
+                raw = f.read()
+        except (OSError, PermissionError):
+            return None
+        head, sep, tail = raw.rpartition(")")
+        if not sep:
+            return None
+        fields = tail.split()
+        try:
+            probe = {
+                "pid": pid,
+                "comm": head.partition("(")[2],
+                "ppid": int(fields[1]),
+                "ticks": int(fields[11]) + int(fields[12]),
+                "threads": int(fields[17]),
+                "start": fields[19],
+                "rss": int(fields[21]) * _PAGE_SIZE,
+            }
+        except (IndexError, ValueError):
+            return None
+        fd_dir = f"{self.proc_root}/{pid}/fd"
+        try:
+            probe["fds"] = os.stat(fd_dir).st_size or len(os.listdir(fd_dir))
+        except (OSError, PermissionError):
+            probe["fds"] = 0
+        return probe
+
+    # ------------------------------------------------------------ aggregates
+
+    def _bubble(self, node, delta):
+        """Add ``delta`` to the subtree sums of every ancestor of ``node``."""
+        parent = self.nodes.get(node.parent) if node.parent is not None else None
+        while parent is not None:
+            agg = parent.agg
+            for i, d in enumerate(delta):
+                agg[i] += d
+            parent = self.nodes.get(parent.parent) if parent.parent is not None else None
+
+    def _detach(self, node):
+        parent = self.nodes.get(node.parent)
+        if parent is not None:
+            parent.children.discard(node.pid)
+            self._bubble(node, [-v for v in node.agg])
+        node.parent = None
+
+    def _attach(self, node, ppid):
+        ancestor = ppid
+        while ancestor is not None:
+            if ancestor == node.pid:
+                return  # would close a cycle (stale ppid across pid reuse); stay a root
+            ancestor = self.nodes[ancestor].parent
+        node.parent = ppid
+        self.nodes[ppid].children.add(node.pid)
+        self._bubble(node, node.agg)
+
+    def _remove(self, pid):
+        node = self.nodes[pid]
+        self._detach(node)
+        for child_pid in node.children:
+            self.nodes[child_pid].parent = None
+        del self.nodes[pid]
+
+    # ------------------------------------------------------------ public
+
+    def refresh(self, now=None, force=False):
+        """Bring the tree up to date (call under ``lock``); no-op within ``min_interval_sec``.
+
+        Pids the scan did not reach before ``deadline_sec`` keep their node as
+        last seen; only pids gone from the listing (or whose probe shows a
+        different process) count as deaths.
+        """
+        now = self.clock() if now is None else now
+        if not force and self.refreshed_at is not None and now - self.refreshed_at < self.min_interval_sec:
+            return self
+        try:
+            pids = [int(d) for d in os.listdir(self.proc_root) if d.isdigit()]
+        except OSError:
+            return self
+        probes = {probe["pid"]: probe for probe in fan_out(self._probe, pids, deadline_sec=self.deadline_sec)}
+
+        listed = set(pids)
+        gone = [p for p, n in self.nodes.items() if p not in listed or (p in probes and probes[p]["start"] != n.start)]
+        for pid in gone:
+            self._remove(pid)
+            self.stats["deaths"] += 1
+
+        for pid, probe in probes.items():
+            node = self.nodes.get(pid)
+            if node is None:
+                self.nodes[pid] = _Node(pid, probe, now)
+                self.stats["births"] += 1
+                continue
+            # Per node: a pid skipped by an earlier deadline spans several refreshes.
+            elapsed = now - node.sampled_at
+            cpu = max(0, probe["ticks"] - node.ticks) / _CLK_TCK / elapsed * 100.0 if elapsed > 0 else 0.0
+            own = [cpu, probe["rss"], probe["fds"], probe["threads"], 1]
+            delta = [new - old for new, old in zip(own, node.own)]
+            node.ticks = probe["ticks"]
+            node.sampled_at = now
+            node.comm = probe["comm"]
+            node.ppid = probe["ppid"]
+            if any(delta):
+                node.own = own
+                for i, d in enumerate(delta):
+                    node.agg[i] += d
+                self._bubble(node, delta)
+                self.stats["updates"] += 1
+
+        for node in self.nodes.values():
+            want = node.ppid if node.ppid in self.nodes and node.ppid != node.pid else None
+            if node.parent == want:
+                continue
+            if node.parent is not None:
+                self._detach(node)
+                self.stats["reparents"] += 1
+            if want is not None:
+                self._attach(node, want)
+
+        self.refreshed_at = now
+        self.stats["pids"] = len(self.nodes)
+        return self
+
+    def roots(self):
+        return [node for node in self.nodes.values() if node.parent is None]
+
+    def ancestors(self, pid):
+        """``[(pid, comm), ...]`` from the root down to the parent of ``pid``."""
+        chain = []
+        node = self.nodes.get(pid)
+        while node is not None and node.parent is not None:
+            node = self.nodes[node.parent]
+            chain.append((node.pid, node.comm))
+        return chain[::-1]
+
+
+def _metrics(values):
+    return {
+        "cpu_percent": round(max(0.0, values[0]), 2),
+        "rss_mb": round(max(0, values[1]) / (1024 * 1024), 1),
+        "fds": int(values[2]),
+        "threads": int(values[3]),
+        "processes": int(values[4]),
+    }
+
+
+def _render(index, node, depth, max_children, slot):
+    """Node dict with its heaviest children expanded down to ``depth``; the rest summed up."""
+    out = {"pid": node.pid, "ppid": node.ppid, "name": node.comm,
+           "self": _metrics(node.own), "subtree": _metrics(node.agg), "children": []}
+    children = [index.nodes[pid] for pid in node.children]
+    shown = heapq.nlargest(max_children, children, key=lambda n: n.agg[slot]) if depth > 0 else []
+    for child in shown:
+        out["children"].append(_render(index, child, depth - 1, max_children, slot))
+    if len(children) > len(shown):
+        hidden = [0.0, 0, 0, 0, 0]
+        shown_pids = {child.pid for child in shown}
+        for child in children:
+            if child.pid not in shown_pids:
+                for i, v in enumerate(child.agg):
+                    hidden[i] += v
+        out["collapsed"] = {"subtrees": len(children) - len(shown), **_metrics(hidden)}
+    return out
+
+
+def _service_trees(index):
+    """Subtrees worth ranking: init's and kthreadd's children, plus any other roots."""
+    tops = []
+    for root in index.roots():
+        if root.pid in (1, 2):
+            tops.extend(index.nodes[pid] for pid in root.children)
+        else:
+            tops.append(root)
+    return tops
+
+
+_TREE_INDEX = ProcessTreeIndex()
+
+
+def get_process_tree_index():
+    """Process-wide tree shared by request threads."""
+    return _TREE_INDEX
+
+
+def get_process_tree_data(pid=None, depth=3, limit=8, max_children=12, sort="cpu"):
+    """Data for ``/api/process-tree``.
+
+    With ``pid``: the subtree rooted there (plus its ancestor chain). Without:
+    the ``limit`` heaviest service trees by ``sort``. Children beyond
+    ``max_children`` per node, or below ``depth``, are folded into a
+    ``collapsed`` summary.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(sorted(SORT_KEYS))}")
+    slot = SORT_KEYS[sort]
+    index = get_process_tree_index()
+    with index.lock:
+        index.refresh()
+        if pid is not None:
+            node = index.nodes.get(int(pid))
+            if node is None:
+                raise ProcessLookupError(f"process {pid} not found")
+            trees = [_render(index, node, depth, max_children, slot)]
+            ancestors = [{"pid": p, "name": name} for p, name in index.ancestors(node.pid)]
+        else:
+            tops = heapq.nlargest(limit, _service_trees(index), key=lambda n: n.agg[slot])
+            trees = [_render(index, node, depth, max_children, slot) for node in tops]
+            ancestors = []
+        stats = dict(index.stats)
+    return {
+        "pid": pid,
+        "sort": sort,
+        "depth": depth,
+        "trees": trees,
+        "ancestors": ancestors,
+        "stats": stats,
+        "timestamp": datetime.now().isoformat(),
+    }
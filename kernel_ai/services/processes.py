@@ -8,31 +8,89 @@ from __future__ import annotations
 
 from datetime import datetime
 import math
-import os
+from typing import Iterator
 
 import psutil
 
+from kernel_ai.services import ipc_index as _ipc_index_service
 from kernel_ai.services import processes_runtime as _runtime
 
 
+def _basic_row(proc) -> dict | None:
+    try:
+        memory_info = proc.info.get("memory_info")
+        memory_mb = (memory_info.rss / 1024 / 1024) if memory_info else 0.0
+        return {
+            "pid": proc.info["pid"],
+            "name": proc.info.get("name"),
+            "status": proc.info.get("status"),
+            "memory_mb": round(memory_mb, 1),
+        }
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+def query_processes_basic(*, sort=None, limit=None, offset=0, q=None, user=None) -> tuple[int, Iterator[dict]]:
+    """``(total, rows of the requested page)`` for the lightweight list.
+
+    See :func:`processes_runtime.select_processes` for the query parameters
+    and when ``total()`` is final.
+    """
+    total, page = _runtime.select_processes(
+        ["pid", "name", "status", "memory_info"], sort=sort, limit=limit, offset=offset, q=q, user=user,
+    )
+    return total, (row for row in map(_basic_row, page) if row is not None)
+
+
+def iter_processes_basic() -> Iterator[dict]:
+    """Yield the lightweight process rows one by one (streamed by the API)."""
+    return query_processes_basic()[1]
+
+
 def get_processes_basic_data() -> list[dict]:
     """Collect lightweight process list for generic process table endpoint."""
-    processes = []
-    for proc in psutil.process_iter(["pid", "name", "status", "memory_info"]):
-        try:
-            memory_info = proc.info.get("memory_info")
-            memory_mb = (memory_info.rss / 1024 / 1024) if memory_info else 0.0
-            processes.append(
-                {
-                    "pid": proc.info["pid"],
-                    "name": proc.info.get("name"),
-                    "status": proc.info.get("status"),
-                    "memory_mb": round(memory_mb, 1),
-                }
-            )
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-    return processes
+    return list(iter_processes_basic())
+
+
+def _read_tcp_inodes(path):
+    """Socket inodes listed in one ``/proc/<pid>/net/tcp[6]`` table; None if unreadable."""
+    inodes = set()
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            next(f, None)
+            for line in f:
+                parts = line.split()
+                if len(parts) > 9 and parts[9].isdigit():
+                    inodes.add(int(parts[9]))
+    except (OSError, PermissionError):
+        return None
+    return inodes
+
+
+def _tcp_socket_counts(pids):
+    """Exact number of TCP sockets owned by each of ``pids``.
+
+    Socket ownership comes from the shared incremental fd index; the TCP
+    tables are read once per network namespace that holds one of ``pids``
+    (through any member process), not once per process.
+    """
+    wanted = set(pids)
+    index = _ipc_index_service.get_ipc_index()
+    with index.lock:
+        index.refresh()
+        owned = {pid: index.sockets_of(pid) for pid in wanted}
+        netns_members = [sorted(owners) for key, owners in index.namespaces.items()
+                         if key.startswith("net:") and owners & wanted]
+    tcp_inodes = set()
+    for members in netns_members:
+        for member in members:
+            tables = [_read_tcp_inodes(f"/proc/{member}/net/{name}") for name in ("tcp", "tcp6")]
+            if tables[0] is None:
+                continue  # member exited meanwhile; read the namespace through the next one
+            for table in tables:
+                tcp_inodes.update(table or ())
+            break
+    return {pid: len(owned[pid] & tcp_inodes) for pid in wanted}
 
 
 def get_proc_matrix_data() -> list[dict]:
@@ -57,16 +115,6 @@ def get_proc_matrix_data() -> list[dict]:
             if io_counters:
                 io_total_mb = (io_counters.read_bytes + io_counters.write_bytes) / 1024 / 1024
 
-            net_connections = 0
-            tcp_path = f"/proc/{pid}/net/tcp"
-            try:
-                if os.path.exists(tcp_path):
-                    with open(tcp_path, "r", encoding="utf-8", errors="ignore") as f:
-                        lines = f.readlines()
-                        net_connections = max(0, len(lines) - 1)
-            except (IOError, PermissionError):
-                pass
-
             num_fds = info.get("num_fds") or 0
 
             processes.append(
@@ -76,7 +124,7 @@ def get_proc_matrix_data() -> list[dict]:
                     "cpu": float(cpu_percent),
                     "mem": float(mem_mb),
                     "io": float(io_total_mb),
-                    "net": int(net_connections),
+                    "net": 0,
                     "fd": int(num_fds),
                 }
             )
@@ -84,13 +132,25 @@ def get_proc_matrix_data() -> list[dict]:
             continue
 
     processes.sort(key=lambda p: p["cpu"], reverse=True)
-    return processes[:20]
+    top = processes[:20]
+    net_counts = _tcp_socket_counts([p["pid"] for p in top])
+    for row in top:
+        row["net"] = int(net_counts.get(row["pid"], 0))
+    return top
 
 
 def get_processes_detailed_data() -> list[dict]:
     return _runtime.get_processes_detailed_data()
 
 
+def iter_processes_detailed() -> Iterator[dict]:
+    return _runtime.iter_processes_detailed()
+
+
+def query_processes_detailed(**query) -> tuple[int, Iterator[dict]]:
+    return _runtime.query_processes_detailed(**query)
+
+
 def collect_processes_realtime():
     """Collect process subsystem telemetry payload."""
     return _runtime.collect_processes_realtime()
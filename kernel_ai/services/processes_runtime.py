@@ -7,11 +7,14 @@ focused on lightweight matrix/graph APIs.
 from __future__ import annotations
 
 from datetime import datetime
+import heapq
 import logging
 import os
+from typing import Iterator
 
 import psutil
 
+from kernel_ai.collectors.fanout import REQUEST_SCAN_DEADLINE_SEC, fan_out
 from kernel_ai.logging_helpers import log_event
 
 logger = logging.getLogger(__name__)
@@ -33,74 +36,155 @@ def _record_degradation(name: str, reason: str):
         )
 
 
+# Sort keys for the process list endpoints, each over a field psutil fills cheaply
+# in process_iter (``num_fds`` is only requested when sorting by it).
+PROCESS_SORT_FIELDS = {"cpu": "cpu_percent", "rss": "memory_info", "fds": "num_fds"}
+_PROCESS_SORT_KEYS = {
+    "cpu": lambda info: float(info.get("cpu_percent") or 0.0),
+    "rss": lambda info: int(getattr(info.get("memory_info"), "rss", 0) or 0),
+    "fds": lambda info: int(info.get("num_fds") or 0),
+}
+
+
+def select_processes(fields, *, sort=None, limit=None, offset=0, q=None, user=None):
+    """Filter, rank and page processes on cheap ``process_iter`` fields only.
+
+    ``q`` matches a case-insensitive substring of the name or an exact pid;
+    ``user`` matches the username. With ``sort`` the page comes from
+    ``heapq.nlargest(offset + limit)``, so no full sort is needed for the
+    usual "top 20" view. Without it the page is streamed straight from
+    ``process_iter`` and nothing is held beyond the current process.
+
+    Returns ``(total, page of psutil.Process)``; callers fetch expensive fields
+    for the page only. ``total()`` is the number of matching processes; for an
+    unsorted listing it is a running count, final once ``page`` is exhausted.
+    """
+    if sort is not None and sort not in _PROCESS_SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(sorted(_PROCESS_SORT_KEYS))}")
+    attrs = list(fields)
+    if sort is not None and PROCESS_SORT_FIELDS[sort] not in attrs:
+        attrs.append(PROCESS_SORT_FIELDS[sort])
+    if user and "username" not in attrs:
+        attrs.append("username")
+    needle = str(q).strip().lower() if q else ""
+
+    def matching():
+        for proc in psutil.process_iter(attrs):
+            info = proc.info
+            if needle and needle not in str(info.get("name") or "").lower() and needle != str(info.get("pid")):
+                continue
+            if user and info.get("username") != user:
+                continue
+            yield proc
+
+    offset = max(0, int(offset or 0))
+    end = offset + int(limit) if limit is not None else None
+    if sort is not None:
+        key = _PROCESS_SORT_KEYS[sort]
+        matched = list(matching())
+        if end is not None:
+            ranked = heapq.nlargest(end, matched, key=lambda proc: key(proc.info))
+        else:
+            ranked = sorted(matched, key=lambda proc: key(proc.info), reverse=True)
+        total = len(matched)
+        return (lambda: total), ranked[offset:end]
+
+    seen = [0]
+
+    def page():
+        for proc in matching():
+            index = seen[0]
+            seen[0] += 1
+            if index >= offset and (end is None or index < end):
+                yield proc
+
+    return (lambda: seen[0]), page()
+
+
 def get_processes_detailed_data() -> list[dict]:
     """Collect detailed process list for process visualization UI."""
-    processes = []
-    fields = ["pid", "name", "status", "memory_info", "cpu_percent", "num_threads", "num_fds"]
-    for proc in psutil.process_iter(fields):
+    return list(iter_processes_detailed())
+
+
+def _count_fds(proc) -> int:
+    num_fds = proc.info.get("num_fds")
+    if num_fds is None:
         try:
-            memory_info = proc.info.get("memory_info")
-            if memory_info is None:
-                continue
-            memory_mb = float(memory_info.rss) / 1024 / 1024
+            num_fds = proc.num_fds()
+        except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+            num_fds = None
+    if not num_fds:
+        try:
+            fd_dir = f"/proc/{proc.info['pid']}/fd"
+            if os.path.exists(fd_dir):
+                num_fds = len([f for f in os.listdir(fd_dir) if f.isdigit()])
+        except (OSError, PermissionError):
+            num_fds = 0
+    return int(num_fds or 0)
 
-            num_fds = proc.info.get("num_fds")
-            if num_fds is None or num_fds == 0:
-                try:
-                    pid = proc.info["pid"]
-                    fd_dir = f"/proc/{pid}/fd"
-                    if os.path.exists(fd_dir):
-                        num_fds = len([f for f in os.listdir(fd_dir) if f.isdigit()])
-                    else:
-                        num_fds = 0
-                except (OSError, PermissionError):
-                    num_fds = 0
-            if num_fds is None:
-                num_fds = 0
 
-            process_name = proc.info.get("name") or f'pid-{proc.info.get("pid", "unknown")}'
-            try:
-                cmdline = proc.cmdline()
-                if cmdline and len(cmdline) > 0:
-                    if cmdline[0] == "nginx:" and len(cmdline) > 1:
-                        process_name = f"nginx: {cmdline[1]}"
-            except (psutil.AccessDenied, psutil.NoSuchProcess):
-                pass
-
-            cmdline_str = ""
-            try:
-                cmdline = proc.cmdline()
-                if cmdline:
-                    cmdline_str = " ".join(cmdline)
-            except (psutil.AccessDenied, psutil.NoSuchProcess):
-                pass
-
-            processes.append(
-                {
-                    "pid": proc.info["pid"],
-                    "name": process_name,
-                    "cmdline": cmdline_str,
-                    "status": proc.info.get("status", "unknown"),
-                    "memory_mb": round(memory_mb, 1),
-                    "cpu_percent": round(float(proc.info.get("cpu_percent", 0) or 0), 1),
-                    "num_threads": int(proc.info.get("num_threads", 0) or 0),
-                    "num_fds": int(num_fds or 0),
-                }
-            )
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            continue
-        except (OSError, ValueError, TypeError, KeyError) as exc:
-            log_event(
-                logger,
-                "DEBUG",
-                "Skipping process in detailed scan due to unexpected data",
-                event_dataset="kernel_ai.app",
-                component="services.processes_runtime",
-                operation="get_processes_detailed_data",
-                event_data={"error": str(exc)},
-            )
-            continue
-    return processes
+def _detailed_row(proc) -> dict | None:
+    """Full row for one process; cmdline and fd count are read here, per page item."""
+    try:
+        memory_info = proc.info.get("memory_info")
+        if memory_info is None:
+            return None
+        memory_mb = float(memory_info.rss) / 1024 / 1024
+        num_fds = _count_fds(proc)
+
+        process_name = proc.info.get("name") or f'pid-{proc.info.get("pid", "unknown")}'
+        cmdline_str = ""
+        try:
+            cmdline = proc.cmdline()
+            if cmdline:
+                cmdline_str = " ".join(cmdline)
+                if cmdline[0] == "nginx:" and len(cmdline) > 1:
+                    process_name = f"nginx: {cmdline[1]}"
+        except (psutil.AccessDenied, psutil.NoSuchProcess):
+            pass
+
+        return {
+            "pid": proc.info["pid"],
+            "name": process_name,
+            "cmdline": cmdline_str,
+            "status": proc.info.get("status", "unknown"),
+            "memory_mb": round(memory_mb, 1),
+            "cpu_percent": round(float(proc.info.get("cpu_percent", 0) or 0), 1),
+            "num_threads": int(proc.info.get("num_threads", 0) or 0),
+            "num_fds": num_fds,
+        }
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+    except (OSError, ValueError, TypeError, KeyError) as exc:
+        log_event(
+            logger,
+            "DEBUG",
+            "Skipping process in detailed scan due to unexpected data",
+            event_dataset="kernel_ai.app",
+            component="services.processes_runtime",
+            operation="get_processes_detailed_data",
+            event_data={"error": str(exc)},
+        )
+        return None
+
+
+def _iter_rows(page, build) -> Iterator[dict]:
+    for proc in page:
+        row = build(proc)
+        if row is not None:
+            yield row
+
+
+def query_processes_detailed(*, sort=None, limit=None, offset=0, q=None, user=None) -> tuple[int, Iterator[dict]]:
+    """``(total, rows of the requested page)`` for the detailed list (see :func:`select_processes`)."""
+    fields = ["pid", "name", "status", "memory_info", "cpu_percent", "num_threads"]
+    total, page = select_processes(fields, sort=sort, limit=limit, offset=offset, q=q, user=user)
+    return total, _iter_rows(page, _detailed_row)
+
+
+def iter_processes_detailed() -> Iterator[dict]:
+    """Yield detailed process rows one by one (streamed by the API)."""
+    return query_processes_detailed()[1]
 
 
 def _parse_meminfo_kb():
@@ -703,6 +787,68 @@ def _build_memory_visual_rows(meminfo_kb, syscall_nodes, vm, swap):
     return rows, summary
 
 
+def _syscall_node(proc):
+    """Per-process syscall-pressure node (runs on the /proc scan pool)."""
+    try:
+        pid = int(proc.info.get("pid") or 0)
+        if pid <= 0:
+            return None
+        ppid = int(proc.info.get("ppid") or 0)
+        name = str(proc.info.get("name") or "unknown")
+        user = str(proc.info.get("username") or "")
+        cpu = float(proc.info.get("cpu_percent") or 0.0)
+        mem = float(proc.info.get("memory_percent") or 0.0)
+        threads = int(proc.info.get("num_threads") or 0)
+        try:
+            rss = int(getattr(proc.memory_info(), "rss", 0) or 0)
+        except (psutil.Error, OSError, TypeError, ValueError):
+            rss = 0
+        try:
+            fd_count = int(proc.num_fds() or 0)
+        except (psutil.Error, OSError, TypeError, ValueError):
+            fd_count = 0
+        fd_semantics = _read_proc_fd_semantics(pid)
+        seccomp_mode = "unknown"
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8", errors="ignore") as f:
+            for ln in f:
+                if ln.startswith("Seccomp:"):
+                    raw = ln.split(":", 1)[1].strip()
+                    if raw == "0":
+                        seccomp_mode = "none"
+                    elif raw == "1":
+                        seccomp_mode = "strict"
+                    elif raw == "2":
+                        seccomp_mode = "filter"
+                    else:
+                        seccomp_mode = "unknown"
+                    break
+        syscall_pressure = min(100, int(cpu * 1.5 + threads * 0.35 + mem * 0.8))
+        return {
+            "pid": pid,
+            "ppid": ppid,
+            "name": name,
+            "user": user,
+            "fd_count": fd_count,
+            "fd_semantics": fd_semantics,
+            "num_threads": threads,
+            "syscall_pressure": syscall_pressure,
+            "seccomp_mode": seccomp_mode,
+            "memory_percent": round(mem, 2),
+            "rss_bytes": rss,
+        }
+    except (psutil.Error, OSError, ValueError, TypeError, KeyError) as exc:
+        log_event(
+            logger,
+            "DEBUG",
+            "Skipping process in realtime collection",
+            event_dataset="kernel_ai.app",
+            component="services.processes_runtime",
+            operation="collect_processes_realtime",
+            event_data={"error": str(exc)},
+        )
+        return None
+
+
 def collect_processes_realtime():
     """Collect process subsystem telemetry payload."""
     lsm_raw = ""
@@ -720,70 +866,11 @@ def collect_processes_realtime():
     except OSError:
         yama_scope = ""
 
-    syscall_nodes = []
     seccomp_modes = {"none": 0, "strict": 0, "filter": 0, "unknown": 0}
-    for proc in psutil.process_iter(["pid", "ppid", "name", "username", "cpu_percent", "memory_percent", "num_threads"]):
-        try:
-            pid = int(proc.info.get("pid") or 0)
-            if pid <= 0:
-                continue
-            ppid = int(proc.info.get("ppid") or 0)
-            name = str(proc.info.get("name") or "unknown")
-            user = str(proc.info.get("username") or "")
-            cpu = float(proc.info.get("cpu_percent") or 0.0)
-            mem = float(proc.info.get("memory_percent") or 0.0)
-            threads = int(proc.info.get("num_threads") or 0)
-            try:
-                rss = int(getattr(proc.memory_info(), "rss", 0) or 0)
-            except (psutil.Error, OSError, TypeError, ValueError):
-                rss = 0
-            try:
-                fd_count = int(proc.num_fds() or 0)
-            except (psutil.Error, OSError, TypeError, ValueError):
-                fd_count = 0
-            fd_semantics = _read_proc_fd_semantics(pid)
-            seccomp_mode = "unknown"
-            with open(f"/proc/{pid}/status", "r", encoding="utf-8", errors="ignore") as f:
-                for ln in f:
-                    if ln.startswith("Seccomp:"):
-                        raw = ln.split(":", 1)[1].strip()
-                        if raw == "0":
-                            seccomp_mode = "none"
-                        elif raw == "1":
-                            seccomp_mode = "strict"
-                        elif raw == "2":
-                            seccomp_mode = "filter"
-                        else:
-                            seccomp_mode = "unknown"
-                        break
-            seccomp_modes[seccomp_mode] = seccomp_modes.get(seccomp_mode, 0) + 1
-            syscall_pressure = min(100, int(cpu * 1.5 + threads * 0.35 + mem * 0.8))
-            syscall_nodes.append(
-                {
-                    "pid": pid,
-                    "ppid": ppid,
-                    "name": name,
-                    "user": user,
-                    "fd_count": fd_count,
-                    "fd_semantics": fd_semantics,
-                    "num_threads": threads,
-                    "syscall_pressure": syscall_pressure,
-                    "seccomp_mode": seccomp_mode,
-                    "memory_percent": round(mem, 2),
-                    "rss_bytes": rss,
-                }
-            )
-        except (psutil.Error, OSError, ValueError, TypeError, KeyError) as exc:
-            log_event(
-                logger,
-                "DEBUG",
-                "Skipping process in realtime collection",
-                event_dataset="kernel_ai.app",
-                component="services.processes_runtime",
-                operation="collect_processes_realtime",
-                event_data={"error": str(exc)},
-            )
-            continue
+    procs = list(psutil.process_iter(["pid", "ppid", "name", "username", "cpu_percent", "memory_percent", "num_threads"]))
+    syscall_nodes = fan_out(_syscall_node, procs, deadline_sec=REQUEST_SCAN_DEADLINE_SEC)
+    for node in syscall_nodes:
+        seccomp_modes[node["seccomp_mode"]] = seccomp_modes.get(node["seccomp_mode"], 0) + 1
     syscall_nodes.sort(key=lambda x: x.get("syscall_pressure", 0), reverse=True)
     syscall_nodes = syscall_nodes[:14]
 
@@ -11,11 +11,15 @@ z-score).
 Nothing here attacks or perturbs the kernel; it only reads procfs.
 """
 
+import heapq
 import json
 import os
+import threading
 import time
 from datetime import datetime, timezone
 
+from kernel_ai.collectors.fanout import REQUEST_SCAN_DEADLINE_SEC, fan_out
+
 # --- PELT constants (mirror kernel/sched/pelt.c) -------------------------------
 # The signal decays one period every ~1024us, halving every 32 periods, i.e.
 # y = 0.5 ** (1/32). LOAD_AVG_MAX is the asymptotic value of the geometric
@@ -49,12 +53,29 @@ PRIO_TO_WEIGHT = [
 # States we treat as "on the runqueue / competing for the CPU".
 RUNNABLE_STATES = {"R"}
 
+# /proc/<pid>/sched is parsed for PREFILTER_FACTOR * top_n schedstat-selected
+# candidates: the final ranking is by PELT util_avg, which runtime only approximates.
+PREFILTER_FACTOR = 3
+
+# Per mode: (monotonic ts, cumulative on-CPU ns per (pid, tid)), the baseline
+# runtime deltas are taken against. Concurrent or back-to-back requests share
+# it; it only moves forward once older than SCHEDSTAT_BASELINE_MIN_S, so one
+# client polling fast cannot shrink every other client's delta window to ~0.
+_SCHEDSTAT_PREV = {}
+_SCHEDSTAT_LOCK = threading.Lock()
+SCHEDSTAT_BASELINE_MIN_S = 1.0
+
 
-def _read_sched_file(pid):
+def _task_dir(pid, tid=None):
+    """``/proc/<pid>`` or, in per-thread mode, ``/proc/<pid>/task/<tid>``."""
+    return f"/proc/{pid}" if tid is None else f"/proc/{pid}/task/{tid}"
+
+
+def _read_sched_file(pid, tid=None):
     """Parse ``/proc/<pid>/sched`` ("key : value" lines) into a dict."""
     out = {}
     try:
-        with open(f"/proc/{pid}/sched", "r", encoding="utf-8", errors="ignore") as fh:
+        with open(f"{_task_dir(pid, tid)}/sched", "r", encoding="utf-8", errors="ignore") as fh:
             for line in fh:
                 if ":" in line:
                     key, _, val = line.partition(":")
@@ -71,18 +92,18 @@ def _fnum(mapping, key, default=0.0):
         return default
 
 
-def _read_comm(pid):
+def _read_comm(pid, tid=None):
     try:
-        with open(f"/proc/{pid}/comm", "r", encoding="utf-8", errors="ignore") as fh:
+        with open(f"{_task_dir(pid, tid)}/comm", "r", encoding="utf-8", errors="ignore") as fh:
             return fh.read().strip() or "?"
     except OSError:
         return "?"
 
 
-def _read_state(pid):
+def _read_state(pid, tid=None):
     """First char of the process state from ``/proc/<pid>/stat`` (after comm)."""
     try:
-        with open(f"/proc/{pid}/stat", "r", encoding="utf-8", errors="ignore") as fh:
+        with open(f"{_task_dir(pid, tid)}/stat", "r", encoding="utf-8", errors="ignore") as fh:
             data = fh.read()
         rparen = data.rfind(")")
         rest = data[rparen + 2:].split()
@@ -91,14 +112,19 @@ def _read_state(pid):
         return "?"
 
 
-def _read_schedstat(pid):
-    """``/proc/<pid>/schedstat`` -> (on_cpu_ns, wait_ns, timeslices)."""
+def _try_schedstat(pid, tid=None):
+    """``/proc/<pid>/schedstat`` -> (on_cpu_ns, wait_ns, timeslices), or None if unreadable."""
     try:
-        with open(f"/proc/{pid}/schedstat", "r", encoding="utf-8", errors="ignore") as fh:
+        with open(f"{_task_dir(pid, tid)}/schedstat", "r", encoding="utf-8", errors="ignore") as fh:
             parts = fh.read().split()
         return int(parts[0]), int(parts[1]), int(parts[2])
     except (OSError, ValueError, IndexError):
-        return 0, 0, 0
+        return None
+
+
+def _read_schedstat(pid, tid=None):
+    """``/proc/<pid>/schedstat`` -> (on_cpu_ns, wait_ns, timeslices)."""
+    return _try_schedstat(pid, tid) or (0, 0, 0)
 
 
 def _loadavg():
@@ -135,13 +161,13 @@ def _read_sched_debug_snapshot(path=None, max_age_s=SCHED_DEBUG_MAX_AGE_S):
     return data
 
 
-def _build_task(pid, sd):
+def _build_task(pid, sd, tid=None, schedstat=None):
     prio = int(_fnum(sd, "prio", 120))
     nice = max(-20, min(19, prio - 120))
     weight_raw = _fnum(sd, "se.load.weight")
     weight = weight_raw / (1 << SCHED_FIXEDPOINT_SHIFT) if weight_raw else float(PRIO_TO_WEIGHT[nice + 20])
-    on_cpu_ns, wait_ns, slices = _read_schedstat(pid)
-    state = _read_state(pid)
+    on_cpu_ns, wait_ns, slices = schedstat or _read_schedstat(pid, tid)
+    state = _read_state(pid, tid)
     vruntime = _fnum(sd, "se.vruntime")
     slice_ms = _fnum(sd, "se.slice") / 1e6
     # Real->virtual time scaling: a request of length `slice` costs
@@ -151,7 +177,8 @@ def _build_task(pid, sd):
     deadline_v = vruntime + vslice_ms
     return {
         "pid": pid,
-        "comm": _read_comm(pid),
+        "tid": tid,
+        "comm": _read_comm(pid, tid),
         "state": state,
         "runnable": state in RUNNABLE_STATES,
         # PELT signals (0..1024 range; 1024 == a full CPU of the resource)
@@ -181,41 +208,107 @@ def _build_task(pid, sd):
     }
 
 
-def collect_scheduler_pelt(top_n=14):
-    """Return real EEVDF/PELT telemetry for the busiest ``top_n`` tasks."""
-    prelim = []
+def _list_tasks(per_thread):
+    """``(pid, tid)`` for every process, or every thread when ``per_thread``."""
     try:
-        entries = os.listdir("/proc")
+        pids = [int(entry) for entry in os.listdir("/proc") if entry.isdigit()]
     except OSError:
-        entries = []
-    for entry in entries:
-        if not entry.isdigit():
-            continue
-        pid = int(entry)
-        sd = _read_sched_file(pid)
-        if not sd:
-            continue
-        prelim.append((pid, sd))
+        return []
+    if not per_thread:
+        return [(pid, None) for pid in pids]
+
+    def threads_of(pid):
+        try:
+            return [(pid, int(tid)) for tid in os.listdir(f"/proc/{pid}/task") if tid.isdigit()]
+        except OSError:
+            return None
+
+    return [task for group in fan_out(threads_of, pids, deadline_sec=REQUEST_SCAN_DEADLINE_SEC) for task in group]
+
+
+def _prefilter(tasks, k, mode):
+    """Top-``k`` tasks by on-CPU time since the previous sample of ``mode``.
+
+    ``/proc/<pid>/schedstat`` is three numbers, so reading it for every task
+    is far cheaper than parsing the full ``sched`` text. Runtime deltas against
+    the previous sample rank what is busy *now*; on the first sample (or for a
+    task that appeared since) the cumulative runtime stands in. A task whose
+    runtime went backwards is a reused id and is ranked on its full runtime.
+    """
+
+    def read(task):
+        st = _try_schedstat(*task)
+        return (task, st) if st else None
+
+    rows = fan_out(read, tasks, deadline_sec=REQUEST_SCAN_DEADLINE_SEC)
+    now = time.monotonic()
+    with _SCHEDSTAT_LOCK:
+        baseline = _SCHEDSTAT_PREV.get(mode)
+        if baseline is None or now - baseline[0] >= SCHEDSTAT_BASELINE_MIN_S:
+            fresh = {task: st[0] for task, st in rows}
+            if baseline is not None and len(fresh) < len(tasks):
+                # Deadline hit: listed tasks not read this time keep their old value.
+                for task in tasks:
+                    if task not in fresh and task in baseline[1]:
+                        fresh[task] = baseline[1][task]
+            _SCHEDSTAT_PREV[mode] = (now, fresh)
+    prev = baseline[1] if baseline is not None else None
+
+    def recent(row):
+        task, st = row
+        before = prev.get(task) if prev is not None else None
+        if before is None or st[0] < before:
+            return st[0]
+        return st[0] - before
+
+    scored = [(recent(row), row[1][1], row) for row in rows]
+    top = heapq.nlargest(k, scored, key=lambda it: (it[0], it[1]))
+    return [(task, st, delta) for delta, _wait, (task, st) in top], len(rows), prev is not None
+
+
+def collect_scheduler_pelt(top_n=14, per_thread=False):
+    """Return real EEVDF/PELT telemetry for the busiest ``top_n`` tasks.
+
+    Candidates are prefiltered on schedstat runtime deltas
+    (``PREFILTER_FACTOR * top_n`` of them) and only those get their
+    ``/proc/<pid>/sched`` parsed. ``per_thread`` ranks individual threads
+    (``/proc/<pid>/task/<tid>``) instead of whole processes.
+    """
+    mode = "thread" if per_thread else "process"
+    candidates, task_count, has_delta = _prefilter(_list_tasks(per_thread), top_n * PREFILTER_FACTOR, mode)
+
+    def read_one(candidate):
+        (pid, tid), st, delta = candidate
+        sd = _read_sched_file(pid, tid)
+        return (pid, tid, sd, st, delta) if sd else None
+
+    prelim = fan_out(read_one, candidates, min_shard=4, deadline_sec=REQUEST_SCAN_DEADLINE_SEC)
 
     # Rank by recent activity so the view surfaces the tasks actually using the
     # CPU: util_avg first, then load_avg, then raw context switches.
     prelim.sort(
         key=lambda it: (
-            _fnum(it[1], "se.avg.util_avg"),
-            _fnum(it[1], "se.avg.load_avg"),
-            _fnum(it[1], "nr_switches"),
+            _fnum(it[2], "se.avg.util_avg"),
+            _fnum(it[2], "se.avg.load_avg"),
+            _fnum(it[2], "nr_switches"),
         ),
         reverse=True,
     )
 
-    tasks = [_build_task(pid, sd) for pid, sd in prelim[:top_n]]
+    tasks = []
+    for pid, tid, sd, st, delta in prelim[:top_n]:
+        task = _build_task(pid, sd, tid, schedstat=st)
+        task["recent_on_cpu_ms"] = round(delta / 1e6, 1)
+        tasks.append(task)
 
     # Enrich with kernel-exact EEVDF fields from the sched_debug collector, when
     # available (eligibility E/N, kernel virtual deadline, and lag = V - vruntime).
     snap = _read_sched_debug_snapshot()
     snap_tasks = snap.get("tasks") or {} if snap.get("available") else {}
     for t in tasks:
-        row = snap_tasks.get(str(t["pid"])) or snap_tasks.get(t["pid"])
+        # sched_debug lists tasks by kernel task id (== pid for a process leader).
+        key = t["tid"] if t["tid"] is not None else t["pid"]
+        row = snap_tasks.get(str(key)) or snap_tasks.get(key)
         if isinstance(row, dict):
             t["eligible"] = bool(row.get("eligible"))
             t["vlag_ms"] = row.get("vlag_ms")
@@ -231,7 +324,7 @@ def collect_scheduler_pelt(top_n=14):
     }
 
     # EEVDF (6.6+) exposes se.slice; older kernels run CFS without it.
-    scheduler = "EEVDF" if any("se.slice" in sd for _, sd in prelim[:top_n]) else "CFS"
+    scheduler = "EEVDF" if any("se.slice" in it[2] for it in prelim[:top_n]) else "CFS"
 
     # Decay kernel y^0..y^(N-1): the weight each past 1ms period contributes to
     # the current average. ~96 periods spans ~3 half-lives.
@@ -243,7 +336,13 @@ def collect_scheduler_pelt(top_n=14):
         "scheduler": scheduler,
         "cpus": os.cpu_count() or 1,
         "loadavg": _loadavg(),
-        "task_count": len(prelim),
+        "task_count": task_count,
+        "mode": mode,
+        "prefilter": {
+            "ranking": "runtime_delta" if has_delta else "runtime_total",
+            "candidates": len(candidates),
+            "parsed": len(prelim),
+        },
         "pelt": {
             "y": round(DECAY_Y, 7),
             "half_life_ms": HALF_LIFE_PERIODS,
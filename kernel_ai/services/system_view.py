@@ -9,12 +9,16 @@ import re
 import shutil
 import stat as _stat
 import subprocess
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime
 
 import psutil
 
+from kernel_ai.collectors import fiemap as _fiemap
 from kernel_ai.collectors import proc_fs as _proc_fs
+from kernel_ai.collectors.fanout import REQUEST_SCAN_DEADLINE_SEC, fan_out
 from kernel_ai.logging_helpers import log_event
 
 logger = logging.getLogger(__name__)
@@ -308,12 +312,27 @@ def _mode_to_string(mode):
     return kind + perms
 
 
+_ANATOMY_PICK_TTL_S = 30.0
+_ANATOMY_PICK_CACHE = {"ts": 0.0, "path": None}
+
+
 def _pick_anatomy_file():
     """Choose the largest readable regular file from a few app dirs.
 
     A larger file is more likely to span multiple extents, which makes the
-    on-disk layout interesting to visualize.
+    on-disk layout interesting to visualize. The pick is reused for
+    ``_ANATOMY_PICK_TTL_S`` while the file still exists.
     """
+    now = time.time()
+    cached = _ANATOMY_PICK_CACHE["path"]
+    if cached and now - _ANATOMY_PICK_CACHE["ts"] < _ANATOMY_PICK_TTL_S and os.path.isfile(cached):
+        return cached
+    picked = _scan_anatomy_file()
+    _ANATOMY_PICK_CACHE.update(ts=now, path=picked)
+    return picked
+
+
+def _scan_anatomy_file():
     roots = [
         os.path.join(_ANATOMY_BASE, "static", "js"),
         os.path.join(_ANATOMY_BASE, "static"),
@@ -389,6 +408,44 @@ def _parse_filefrag(path):
     return fstype, extents
 
 
+_EXTENT_CACHE_MAX = 64
+_EXTENT_CACHE = OrderedDict()
+_EXTENT_CACHE_LOCK = threading.Lock()
+# Layouts that are not final yet: re-read them instead of caching.
+_UNSETTLED_EXTENT_FLAGS = ("delalloc", "unknown_loc")
+
+
+def _file_extents(path, st, block_size):
+    """Return ``(fstype, extents, source)`` for ``path``, cached per file version.
+
+    The in-process FIEMAP reader is tried first; ``filefrag -v`` is only
+    forked when the ioctl is unavailable. Complete layouts are kept in a small
+    LRU keyed by ``(dev, inode, mtime_ns, size)``, so a rewritten file is
+    re-read; empty results and extents still awaiting allocation are not cached.
+    """
+    key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+    with _EXTENT_CACHE_LOCK:
+        cached = _EXTENT_CACHE.get(key)
+        if cached is not None:
+            _EXTENT_CACHE.move_to_end(key)
+            return cached
+    extents = _fiemap.read_extents(path, block_size)
+    if extents is not None:
+        result = (None, extents, "fiemap")
+    else:
+        fstype, extents = _parse_filefrag(path)
+        result = (fstype, extents, "filefrag" if extents else None)
+    settled = extents and not any(
+        flag in e["flags"].split(",") for e in extents for flag in _UNSETTLED_EXTENT_FLAGS
+    )
+    if settled:
+        with _EXTENT_CACHE_LOCK:
+            _EXTENT_CACHE[key] = result
+            while len(_EXTENT_CACHE) > _EXTENT_CACHE_MAX:
+                _EXTENT_CACHE.popitem(last=False)
+    return result
+
+
 def get_ext4_file_anatomy(path=None):
     """Resolve one real file to its inode metadata and on-disk extent layout."""
     target = _sanitize_walk_path(path) or _pick_anatomy_file()
@@ -407,7 +464,7 @@ def get_ext4_file_anatomy(path=None):
         block_size = 4096
         dev_total_blocks = 0
 
-    fstype, extents = _parse_filefrag(target)
+    fstype, extents, extent_source = _file_extents(target, st, block_size)
     if not fstype:
         # Fall back to the mount fstype.
         best_mp = ""
@@ -453,6 +510,7 @@ def get_ext4_file_anatomy(path=None):
         "fragmented": fragmented,
         "device_total_blocks": dev_total_blocks,
         "device_span": span,
+        "extent_source": extent_source,
         "filefrag_available": bool(_find_filefrag()),
     }
 
@@ -905,34 +963,40 @@ def get_isolation_context():
     cgroup_aggregates = {}
     total_scanned = 0
 
-    for proc in psutil.process_iter(["pid", "name", "memory_info"]):
+    def probe(proc):
+        # Runs on the /proc scan pool: read only, aggregate below in pid order.
         try:
             pid = proc.info["pid"]
-            total_scanned += 1
-
-            cgroup_path = _parse_cgroup_path(pid)
-            agg = cgroup_aggregates.setdefault(cgroup_path, {"path": cgroup_path, "process_count": 0, "memory_mb_sum": 0.0, "sample_processes": []})
-            agg["process_count"] += 1
-
-            mem_info = proc.info.get("memory_info")
-            if mem_info:
-                agg["memory_mb_sum"] += mem_info.rss / (1024 * 1024)
-
-            if len(agg["sample_processes"]) < 4:
-                process_name = proc.info.get("name") or "unknown"
-                agg["sample_processes"].append(process_name)
-
-            proc_name = proc.info.get("name") or "unknown"
-            for ns_name in namespace_keys:
-                inode = read_namespace_inode(pid, ns_name)
-                if inode:
-                    ns_map = namespace_counts[ns_name]
-                    ns_map[inode] = ns_map.get(inode, 0) + 1
-                    samples = namespace_samples[ns_name].setdefault(inode, [])
-                    if len(samples) < 5 and proc_name not in samples:
-                        samples.append(proc_name)
+            return (
+                proc.info.get("name") or "unknown",
+                proc.info.get("memory_info"),
+                _parse_cgroup_path(pid),
+                [(ns_name, read_namespace_inode(pid, ns_name)) for ns_name in namespace_keys],
+            )
         except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError):
-            continue
+            return None
+
+    for proc_name, mem_info, cgroup_path, ns_inodes in fan_out(
+        probe, psutil.process_iter(["pid", "name", "memory_info"]), deadline_sec=REQUEST_SCAN_DEADLINE_SEC
+    ):
+        total_scanned += 1
+
+        agg = cgroup_aggregates.setdefault(cgroup_path, {"path": cgroup_path, "process_count": 0, "memory_mb_sum": 0.0, "sample_processes": []})
+        agg["process_count"] += 1
+
+        if mem_info:
+            agg["memory_mb_sum"] += mem_info.rss / (1024 * 1024)
+
+        if len(agg["sample_processes"]) < 4:
+            agg["sample_processes"].append(proc_name)
+
+        for ns_name, inode in ns_inodes:
+            if inode:
+                ns_map = namespace_counts[ns_name]
+                ns_map[inode] = ns_map.get(inode, 0) + 1
+                samples = namespace_samples[ns_name].setdefault(inode, [])
+                if len(samples) < 5 and proc_name not in samples:
+                    samples.append(proc_name)
 
     namespaces = []
     for ns_name in namespace_keys:
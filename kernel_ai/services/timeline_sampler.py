@@ -0,0 +1,298 @@
+"""Background per-process event sampler backing ``/api/proc-timeline``.
+
+A daemon thread samples a small *watched* set of pids every
+``KERNEL_AI_TIMELINE_SAMPLE_MS`` (default 100 ms) and appends real,
+timestamped deltas to a fixed-size ring per pid:
+
+* ``syscall``        — the syscall number in ``/proc/<pid>/syscall`` changed
+* ``context switch`` — voluntary / nonvoluntary switches since the last sample
+* ``i/o``            — ``read_bytes`` / ``write_bytes`` grew (``/proc/<pid>/io``)
+* ``state``          — the scheduler state letter changed (R/S/D/...)
+* ``exit``           — the process went away (a reused pid starts a new ring)
+
+The watched set is the pids the UI asked about recently plus the top CPU
+consumers, which are refreshed from ``/proc/<pid>/stat`` every couple of
+seconds. Requests only read the rings. The thread starts on the first request
+and stops by itself once no request has arrived for ``idle_stop_sec``, so an
+idle dashboard costs nothing.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from kernel_ai.collectors.fanout import fan_out
+from kernel_ai.services.kernel_maps import SYSCALL_NAMES
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_PERIOD_SEC = max(10, int(os.environ.get("KERNEL_AI_TIMELINE_SAMPLE_MS", "100") or 100)) / 1000.0
+# Longest ``window_s`` the timeline endpoints serve; rings are sized to hold it.
+MAX_WINDOW_SEC = 120
+# Upper bound of events one sample can add: syscall, context switch, read, write, state.
+_MAX_EVENTS_PER_SAMPLE = 5
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _read_text(path):
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    except (OSError, PermissionError):
+        return ""
+
+
+def _read_stat(pid):
+    """``(comm, state, starttime, cpu_ticks, rss_pages)`` from ``/proc/<pid>/stat``."""
+    raw = _read_text(f"/proc/{pid}/stat")
+    head, sep, tail = raw.rpartition(")")
+    if not sep:
+        return None
+    fields = tail.split()
+    try:
+        return (
+            head.partition("(")[2],
+            fields[0],
+            fields[19],
+            int(fields[11]) + int(fields[12]),
+            int(fields[21]),
+        )
+    except (IndexError, ValueError):
+        return None
+
+
+def _probe(pid):
+    """One sample of the counters the timeline diffs; None if the process is gone."""
+    stat = _read_stat(pid)
+    if stat is None:
+        return None
+    vol = nonvol = None
+    for line in _read_text(f"/proc/{pid}/status").splitlines():
+        if line.startswith("voluntary_ctxt_switches:"):
+            vol = int(line.split(":", 1)[1].strip() or 0)
+        elif line.startswith("nonvoluntary_ctxt_switches:"):
+            nonvol = int(line.split(":", 1)[1].strip() or 0)
+    io = {}
+    for line in _read_text(f"/proc/{pid}/io").splitlines():
+        key, _, value = line.partition(":")
+        if key in ("read_bytes", "write_bytes") and value.strip().isdigit():
+            io[key] = int(value)
+    syscall = None
+    parts = _read_text(f"/proc/{pid}/syscall").split()
+    if parts and parts[0].lstrip("-").isdigit():
+        syscall = int(parts[0])
+    return {
+        "pid": pid,
+        "comm": stat[0],
+        "state": stat[1],
+        "starttime": stat[2],
+        "vol": vol,
+        "nonvol": nonvol,
+        "read_bytes": io.get("read_bytes"),
+        "write_bytes": io.get("write_bytes"),
+        "syscall": syscall,
+    }
+
+
+def _diff(prev, cur, ts):
+    """Events between two probes of the same process."""
+    events = []
+    if cur["syscall"] is not None and cur["syscall"] >= 0 and cur["syscall"] != prev["syscall"]:
+        nr = cur["syscall"]
+        events.append({"ts": ts, "type": "syscall", "name": SYSCALL_NAMES.get(nr, f"syscall_{nr}"), "nr": nr})
+    if cur["vol"] is not None and prev["vol"] is not None:
+        dv = max(0, cur["vol"] - prev["vol"])
+        dn = max(0, (cur["nonvol"] or 0) - (prev["nonvol"] or 0))
+        if dv or dn:
+            events.append({"ts": ts, "type": "context switch", "name": "context_switches",
+                           "count": dv + dn, "voluntary": dv, "nonvoluntary": dn})
+    for key in ("read_bytes", "write_bytes"):
+        if cur[key] is not None and prev[key] is not None and cur[key] > prev[key]:
+            events.append({"ts": ts, "type": "i/o", "name": key, "bytes": cur[key] - prev[key]})
+    if cur["state"] != prev["state"]:
+        events.append({"ts": ts, "type": "state", "name": "state_change", "from": prev["state"], "to": cur["state"]})
+    return events
+
+
+class _PidRing:
+    __slots__ = ("comm", "starttime", "events", "prev", "last_watched")
+
+    def __init__(self, probe, ring_size, now):
+        self.comm = probe["comm"]
+        self.starttime = probe["starttime"]
+        self.events = deque(maxlen=ring_size)
+        self.prev = probe
+        self.last_watched = now
+
+
+class TimelineSampler:
+    """Per-pid event rings filled by a self-stopping background thread."""
+
+    def __init__(self, *, period_sec=SAMPLE_PERIOD_SEC, ring_size=None, top_n=8, top_refresh_sec=2.0,
+                 watch_ttl_sec=120.0, idle_stop_sec=60.0, clock=time.time):
+        self.period_sec = period_sec
+        if ring_size is None:
+            # Enough for MAX_WINDOW_SEC of a pid that changes everything every sample.
+            ring_size = -(-MAX_WINDOW_SEC // period_sec) * _MAX_EVENTS_PER_SAMPLE
+        self.ring_size = int(ring_size)
+        self.top_n = top_n
+        self.top_refresh_sec = top_refresh_sec
+        self.watch_ttl_sec = watch_ttl_sec
+        self.idle_stop_sec = idle_stop_sec
+        self.clock = clock
+        self.lock = threading.Lock()
+        self._rings = {}
+        self._selected = {}
+        self._top = []
+        self._cpu_prev = {}
+        self._cpu_prev_ts = None
+        self._last_request = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------ requests
+
+    def watch(self, pid=None):
+        """Mark ``pid`` as selected in the UI (and keep the thread alive)."""
+        now = self.clock()
+        with self.lock:
+            self._last_request = now
+            if pid:
+                self._selected[int(pid)] = now
+        self.ensure_running()
+
+    def events(self, pid, since):
+        """Events of ``pid`` at or after ``since``; None if the pid was never sampled."""
+        with self.lock:
+            ring = self._rings.get(int(pid))
+            if ring is None:
+                return None
+            return [dict(ev) for ev in ring.events if ev["ts"] >= since]
+
+    def top(self):
+        """Top CPU consumers from the last refresh (``pid``, ``name``, ``cpu_percent``, ``memory_mb``)."""
+        with self.lock:
+            return [dict(row) for row in self._top]
+
+    def comm(self, pid):
+        with self.lock:
+            ring = self._rings.get(int(pid))
+            return ring.comm if ring is not None else None
+
+    # ------------------------------------------------------------ thread
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def ensure_running(self):
+        with self.lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="proc-timeline-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def _run(self):
+        next_top = 0.0
+        while True:
+            now = self.clock()
+            with self.lock:
+                # Decided under the lock: a watch() racing this exit either
+                # refreshes _last_request first or finds no thread and starts one.
+                if now - self._last_request > self.idle_stop_sec:
+                    self._thread = None
+                    logger.debug("timeline sampler idle, stopping")
+                    break
+            try:
+                if now >= next_top:
+                    self.refresh_top(now)
+                    next_top = now + self.top_refresh_sec
+                self.sample_once(now)
+            except Exception:  # noqa: BLE001 - keep sampling; one bad tick must not kill the thread
+                logger.exception("timeline sampler tick failed")
+            if self._stop.wait(max(0.0, self.period_sec - (self.clock() - now))):
+                break
+
+    # ------------------------------------------------------------ sampling
+
+    def refresh_top(self, now=None):
+        """Re-rank all processes by CPU share since the previous refresh."""
+        now = self.clock() if now is None else now
+        try:
+            pids = [int(d) for d in os.listdir("/proc") if d.isdigit()]
+        except OSError:
+            return
+        rows = fan_out(lambda pid: (pid, _read_stat(pid)), pids)
+        elapsed = (now - self._cpu_prev_ts) if self._cpu_prev_ts is not None else None
+        cpu_now = {}
+        ranked = []
+        for pid, stat in rows:
+            if stat is None or pid <= 1:
+                continue
+            comm, _state, starttime, ticks, rss_pages = stat
+            cpu_now[pid] = (starttime, ticks)
+            before = self._cpu_prev.get(pid)
+            if elapsed and before is not None and before[0] == starttime:
+                cpu = max(0, ticks - before[1]) / _CLK_TCK / elapsed * 100.0
+            else:
+                cpu = 0.0
+            ranked.append({"pid": pid, "name": comm, "cpu_percent": round(cpu, 2),
+                           "memory_mb": round(rss_pages * _PAGE_SIZE / (1024 * 1024), 1)})
+        ranked.sort(key=lambda r: (r["cpu_percent"], r["memory_mb"]), reverse=True)
+        with self.lock:
+            self._cpu_prev = cpu_now
+            self._cpu_prev_ts = now
+            self._top = ranked[: self.top_n]
+
+    def _watched(self, now):
+        with self.lock:
+            for pid in [p for p, ts in self._selected.items() if now - ts > self.watch_ttl_sec]:
+                del self._selected[pid]
+            return sorted(set(self._selected) | {row["pid"] for row in self._top})
+
+    def sample_once(self, now=None):
+        """Probe every watched pid once and append the deltas to its ring."""
+        now = self.clock() if now is None else now
+        watched = self._watched(now)
+        probes = {p["pid"]: p for p in fan_out(_probe, watched, min_shard=4)}
+        with self.lock:
+            for pid in watched:
+                cur = probes.get(pid)
+                ring = self._rings.get(pid)
+                if ring is not None and ring.prev is not None and (cur is None or cur["starttime"] != ring.starttime):
+                    ring.events.append({"ts": now, "type": "exit", "name": "exit"})
+                    ring.prev = None
+                if cur is None:
+                    continue
+                if ring is None or cur["starttime"] != ring.starttime:
+                    # A reused pid is a new process: its first sample is the
+                    # baseline of a fresh ring, so the previous owner's events
+                    # (ending in its exit) never show up in its timeline.
+                    self._rings[pid] = _PidRing(cur, self.ring_size, now)
+                    continue
+                if ring.prev is not None:
+                    ring.events.extend(_diff(ring.prev, cur, now))
+                ring.prev = cur
+                ring.comm = cur["comm"]
+                ring.last_watched = now
+            for pid in [p for p, r in self._rings.items() if now - r.last_watched > self.watch_ttl_sec]:
+                del self._rings[pid]
+
+
+_SAMPLER = TimelineSampler()
+
+
+def get_timeline_sampler():
+    """Process-wide sampler shared by request threads."""
+    return _SAMPLER
@@ -54,6 +54,7 @@ SECURITY_PREV = {
     "timestamp": None,
     "events": 0,
 }
+LIST_HISTORIES = {}
 FRONTEND_LOG_WRITE_LOCK = Lock()
 FRONTEND_LOG_FILE = os.getenv("FRONTEND_LOG_FILE", "/opt/ring0/kernel-ai/logs/frontend-events.jsonl")
 
@@ -69,6 +70,7 @@ class RuntimeState:
     entropy_prev: dict
     exec_context_prev: dict
     security_prev: dict
+    list_histories: dict
     frontend_log_write_lock: Lock
     frontend_log_file: str
 
@@ -85,6 +87,7 @@ def create_state_container(frontend_log_file: str | None = None) -> RuntimeState
         entropy_prev=deepcopy(ENTROPY_PREV),
         exec_context_prev=deepcopy(EXEC_CONTEXT_PREV),
         security_prev=deepcopy(SECURITY_PREV),
+        list_histories={},
         frontend_log_write_lock=Lock(),
         frontend_log_file=frontend_log_file or FRONTEND_LOG_FILE,
     )
@@ -100,6 +103,7 @@ _LEGACY_STATE = RuntimeState(
     entropy_prev=ENTROPY_PREV,
     exec_context_prev=EXEC_CONTEXT_PREV,
     security_prev=SECURITY_PREV,
+    list_histories=LIST_HISTORIES,
     frontend_log_write_lock=FRONTEND_LOG_WRITE_LOCK,
     frontend_log_file=FRONTEND_LOG_FILE,
 )
@@ -524,6 +524,17 @@ function updateMobileHud() {
         .catch(() => {});
 }
 
+// One /api/process/batch round-trip instead of separate threads/cpu/fds requests.
+function fetchProcessDetails(pid) {
+    return fetch(`/api/process/batch?pids=${pid}&include=threads,cpu,fds`)
+        .then(r => r.json())
+        .then(d => {
+            const row = (d && d.processes && d.processes[String(pid)]) || {};
+            return [row.threads || null, row.cpu || null, row.fds || null];
+        })
+        .catch(() => [null, null, null]);
+}
+
 function formatProcessValue(value, fallback = 'n/a') {
     return value === null || value === undefined || value === '' ? fallback : value;
 }
@@ -1609,11 +1620,7 @@ function pinProcessDossier(processData, anchor) {
         window.nginxFilesManager.highlightProcessFiles(processData.pid);
     }
 
-    Promise.all([
-        fetch(`/api/process/${processData.pid}/threads`).then(r => r.json()).catch(() => null),
-        fetch(`/api/process/${processData.pid}/cpu`).then(r => r.json()).catch(() => null),
-        fetch(`/api/process/${processData.pid}/fds`).then(r => r.json()).catch(() => null)
-    ]).then(([threadsData, cpuData, fdsData]) => {
+    fetchProcessDetails(processData.pid).then(([threadsData, cpuData, fdsData]) => {
         if (!pinnedProcessDossier || pinnedProcessDossier.process?.pid !== processData.pid) return;
         pinnedProcessDossier.details = { threadsData, cpuData, fdsData };
         renderProcessDossier();
@@ -2679,11 +2686,7 @@ function drawProcessKernelMap2(centerX, centerY) {
                             .style("opacity", 1);
                         
                         // Fetch detailed information
-                        Promise.all([
-                            fetch(`/api/process/${processData.pid}/threads`).then(r => r.json()).catch(() => null),
-                            fetch(`/api/process/${processData.pid}/cpu`).then(r => r.json()).catch(() => null),
-                            fetch(`/api/process/${processData.pid}/fds`).then(r => r.json()).catch(() => null)
-                        ]).then(([threadsData, cpuData, fdsData]) => {
+                        fetchProcessDetails(processData.pid).then(([threadsData, cpuData, fdsData]) => {
                             let detailsHtml = `
                                 <strong>Process:</strong> ${processData.name}<br>
                                 <strong>PID:</strong> ${processData.pid}<br>
@@ -0,0 +1,39 @@
+"""Tests for ``kernel_ai.collectors.fanout``."""
+
+import threading
+import time
+
+from kernel_ai.collectors import fanout
+
+
+def test_fan_out_preserves_input_order_and_drops_none():
+    threads = set()
+
+    def fn(i):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.001 * (i % 3))
+        return None if i % 5 == 0 else i * 2
+
+    out = fanout.fan_out(fn, range(200), workers=4, min_shard=10)
+    assert out == [i * 2 for i in range(200) if i % 5]
+    if fanout.PROC_SCAN_WORKERS > 1:
+        assert any(name.startswith("proc-scan") for name in threads)
+
+
+def test_fan_out_deadline_returns_partial_results():
+    out = fanout.fan_out(lambda i: time.sleep(0.01) or i, range(100), workers=2, deadline_sec=0.05, min_shard=10)
+    assert 0 < len(out) < 100
+    assert out == sorted(out)
+
+
+def test_fan_out_nested_call_runs_inline():
+    def outer(i):
+        return sum(fanout.fan_out(lambda j: j, range(i), min_shard=1))
+
+    assert fanout.fan_out(outer, range(40), min_shard=1) == [i * (i - 1) // 2 for i in range(40)]
+
+
+def test_fan_out_single_worker_is_serial(monkeypatch):
+    monkeypatch.setattr(fanout, "PROC_SCAN_WORKERS", 1)
+    names = fanout.fan_out(lambda _i: threading.current_thread().name, range(50))
+    assert set(names) == {threading.current_thread().name}
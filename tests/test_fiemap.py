@@ -0,0 +1,44 @@
+"""Tests for ``kernel_ai.collectors.fiemap``."""
+
+from kernel_ai.collectors import fiemap
+
+
+def test_read_extents_walks_batches_and_names_flags(tmp_path, monkeypatch):
+    target = tmp_path / "f"
+    target.write_bytes(b"x" * 3 * 4096)
+    # Three 4 KiB extents, served one per ioctl call.
+    table = [(0, 40960, 4096, 0), (4096, 81920, 4096, 0x800), (8192, 122880, 4096, fiemap.FIEMAP_EXTENT_LAST)]
+    starts = []
+
+    class _Fcntl:
+        @staticmethod
+        def ioctl(_fd, request, buf, _mutate):
+            assert request == fiemap.FS_IOC_FIEMAP
+            start, _length, flags = fiemap._HEADER.unpack_from(buf, 0)[:3]
+            assert flags == 0  # never force writeback of the file being inspected
+            starts.append(start)
+            rows = [row for row in table if row[0] >= start][:1]
+            fiemap._HEADER.pack_into(buf, 0, start, 0, 0, len(rows), fiemap.EXTENTS_PER_CALL, 0)
+            for i, row in enumerate(rows):
+                fiemap._EXTENT.pack_into(buf, fiemap._HEADER.size + i * fiemap._EXTENT.size, *row)
+
+    monkeypatch.setattr(fiemap, "fcntl", _Fcntl)
+    extents = fiemap.read_extents(str(target), 4096)
+
+    assert starts == [0, 4096, 8192]
+    assert [(e["logical"], e["physical"], e["length"]) for e in extents] == [(0, 10, 1), (1, 20, 1), (2, 30, 1)]
+    assert [e["flags"] for e in extents] == ["", "unwritten", "last,eof"]
+
+
+def test_read_extents_reports_unsupported(tmp_path, monkeypatch):
+    target = tmp_path / "f"
+    target.write_bytes(b"x")
+
+    class _Fcntl:
+        @staticmethod
+        def ioctl(*_args):
+            raise OSError(25, "Inappropriate ioctl for device")
+
+    monkeypatch.setattr(fiemap, "fcntl", _Fcntl)
+    assert fiemap.read_extents(str(target)) is None
+    assert fiemap.read_extents(str(tmp_path / "missing")) is None
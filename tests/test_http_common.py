@@ -0,0 +1,60 @@
+"""Tests for ``kernel_ai.http.common``."""
+
+import json
+
+from flask import Flask
+
+from kernel_ai.http import common
+
+
+def _client(producer, **kwargs):
+    app = Flask(__name__)
+    app.add_url_rule("/x", "x", lambda: common.api_json(producer, **kwargs))
+    return app.test_client()
+
+
+def test_api_json_streams_generator_values(monkeypatch):
+    monkeypatch.setattr(common, "STREAM_CHUNK_BYTES", 64)
+
+    def rows():
+        for i in range(500):
+            yield {"pid": i, "name": f"p{i}"}
+
+    resp = _client(lambda: {"processes": rows(), "total": 500}).get("/x")
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == "application/json"
+    payload = json.loads(resp.get_data(as_text=True))
+    assert payload["total"] == 500
+    assert [row["pid"] for row in payload["processes"]] == list(range(500))
+
+
+def test_api_json_streams_top_level_generator():
+    resp = _client(lambda: (i * i for i in range(4))).get("/x")
+    assert json.loads(resp.get_data(as_text=True)) == [0, 1, 4, 9]
+
+    resp = _client(lambda: {"items": (i for i in [])}).get("/x")
+    assert json.loads(resp.get_data(as_text=True)) == {"items": []}
+
+
+def test_api_json_error_before_first_item_is_regular_error():
+    def rows():
+        raise LookupError("gone")
+        yield  # pragma: no cover
+
+    resp = _client(lambda: {"processes": rows()}, exception_statuses=[(LookupError, 404)]).get("/x")
+    assert resp.status_code == 404
+    assert resp.get_json()["code"] == "not_found"
+
+
+def test_api_json_error_mid_stream_keeps_json_valid(monkeypatch):
+    monkeypatch.setattr(common, "capture_exception", lambda *a, **k: None)
+
+    def rows():
+        yield {"pid": 1}
+        raise RuntimeError("boom")
+
+    resp = _client(lambda: {"processes": rows(), "after": 1}).get("/x")
+    payload = json.loads(resp.get_data(as_text=True))
+    assert payload["processes"] == [{"pid": 1}]
+    assert payload["stream_error"]["error"] == "boom"
@@ -0,0 +1,47 @@
+"""Tests for ``kernel_ai.http.delta``."""
+
+import json
+
+from kernel_ai.http import delta
+from kernel_ai.webapp import create_app
+
+
+def test_list_history_returns_changes_since_cursor():
+    history = delta.ListHistory(key=lambda row: row["pid"], max_versions=2)
+    first = history.diff([{"pid": 1, "cpu": 0.0}, {"pid": 2, "cpu": 1.0}], None, "processes")
+    assert first["full"] is True
+    assert [row["pid"] for row in first["processes"]] == [1, 2]
+
+    second = history.diff([{"pid": 2, "cpu": 3.0}, {"pid": 3, "cpu": 0.0}], first["cursor"], "processes")
+    assert second["full"] is False
+    assert second["added"] == [{"pid": 3, "cpu": 0.0}]
+    assert second["changed"] == [{"pid": 2, "cpu": 3.0}]
+    assert second["removed"] == [1]
+
+    # Identical snapshot keeps the version; an evicted cursor falls back to full.
+    same = history.diff([{"pid": 2, "cpu": 3.0}, {"pid": 3, "cpu": 0.0}], second["cursor"], "processes")
+    assert same["cursor"] == second["cursor"]
+    assert (same["added"], same["changed"], same["removed"]) == ([], [], [])
+    history.diff([{"pid": 4}], None, "processes")
+    assert history.diff([{"pid": 4}], first["cursor"], "processes")["full"] is True
+    assert history.diff([], "bogus", "processes")["full"] is True
+
+
+def test_processes_endpoint_serves_deltas(monkeypatch):
+    from kernel_ai.services import processes as svc
+
+    rows = [{"pid": 1, "name": "init"}, {"pid": 7, "name": "sh"}]
+    monkeypatch.setattr(svc, "query_processes_basic", lambda **_q: ((lambda: len(rows)), (row for row in list(rows))))
+    client = create_app().test_client()
+
+    full = client.get("/api/processes?since=").get_json()
+    assert full["full"] is True and len(full["processes"]) == 2
+
+    rows[1] = {"pid": 7, "name": "bash"}
+    step = client.get(f"/api/processes?since={full['cursor']}").get_json()
+    assert step["changed"] == [{"pid": 7, "name": "bash"}]
+    assert step["added"] == [] and step["removed"] == []
+    assert step["total"] == 2
+
+    plain = json.loads(client.get("/api/processes").get_data(as_text=True))
+    assert "cursor" not in plain and len(plain["processes"]) == 2
@@ -0,0 +1,90 @@
+"""Tests for ``kernel_ai.services.ipc_index``."""
+
+import os
+import shutil
+
+from kernel_ai.services import ipc_index as svc
+
+
+def _fake_proc(root, pid, comm, start, fds, maps="", statm="100 10 5 1 0 20 0", ns=None):
+    d = root / str(pid)
+    (d / "fd").mkdir(parents=True)
+    (d / "ns").mkdir()
+    (d / "stat").write_text(f"{pid} ({comm}) S 1 " + " ".join(["0"] * 16) + f" {start} 0 0\n")
+    (d / "statm").write_text(statm + "\n")
+    (d / "maps").write_text(maps)
+    for fd, target in fds.items():
+        os.symlink(target, d / "fd" / str(fd))
+    for name, inode in (ns or {"net": 4026531840}).items():
+        os.symlink(f"{name}:[{inode}]", d / "ns" / name)
+    return d
+
+
+def test_index_tracks_shared_inodes(tmp_path):
+    shm = "7f00-7f10 rw-s 00000000 00:05 42 /dev/shm/ring\n"
+    _fake_proc(tmp_path, 10, "server", 500, {3: "socket:[111]", 4: "pipe:[222]"}, maps=shm)
+    _fake_proc(tmp_path, 11, "client", 600, {3: "socket:[111]", 5: "pipe:[222]", 6: "/etc/hosts"}, maps=shm)
+
+    index = svc.IpcOwnershipIndex(proc_root=str(tmp_path)).refresh(now=0.0)
+
+    assert index.names() == {10: "server", 11: "client"}
+    assert index.sockets[111] == {10, 11}
+    assert index.pipes[222] == {10, 11}
+    assert index.shm["00:05:42:/dev/shm/ring"] == {10, 11}
+    assert index.namespaces["net:4026531840"] == {10, 11}
+
+
+def test_index_skips_unchanged_pids_and_drops_exited(tmp_path, monkeypatch):
+    _fake_proc(tmp_path, 10, "server", 500, {3: "socket:[111]"})
+    _fake_proc(tmp_path, 11, "client", 600, {3: "socket:[111]"})
+    index = svc.IpcOwnershipIndex(proc_root=str(tmp_path), rescan_sec=300.0).refresh(now=0.0)
+    assert index.stats["fd_scans"] == 2
+
+    reads = []
+    real_readlink = svc.os.readlink
+    monkeypatch.setattr(svc.os, "readlink", lambda p: reads.append(p) or real_readlink(p))
+    index.refresh(now=1.0)
+    assert reads == []
+    assert index.stats["skipped"] == 2
+
+    # A pid reused by a new process (different starttime) is re-read from scratch.
+    os.unlink(tmp_path / "11" / "fd" / "3")
+    (tmp_path / "11" / "stat").write_text("11 (other) S 1 " + " ".join(["0"] * 16) + " 900 0 0\n")
+    index.refresh(now=2.0)
+    assert index.names()[11] == "other"
+    assert index.sockets[111] == {10}
+
+    for name in ("fd", "ns"):
+        for entry in os.listdir(tmp_path / "10" / name):
+            os.unlink(tmp_path / "10" / name / entry)
+    index.refresh(now=3.0)
+    assert 111 not in index.sockets
+
+
+def test_index_rereads_maps_when_size_changes(tmp_path):
+    d = _fake_proc(tmp_path, 10, "server", 500, {})
+    index = svc.IpcOwnershipIndex(proc_root=str(tmp_path), rescan_sec=300.0).refresh(now=0.0)
+    assert index.shm == {}
+
+    (d / "maps").write_text("7f00-7f10 rw-s 00000000 00:05 42 /dev/shm/ring\n")
+    index.refresh(now=1.0)
+    assert index.shm == {}  # statm unchanged: mapping change not noticed yet
+
+    (d / "statm").write_text("104 10 5 1 0 20 0\n")
+    index.refresh(now=2.0)
+    assert index.shm == {"00:05:42:/dev/shm/ring": {10}}
+
+
+def test_index_keeps_pids_the_deadline_skipped(tmp_path):
+    _fake_proc(tmp_path, 10, "server", 500, {3: "socket:[111]"})
+    _fake_proc(tmp_path, 11, "client", 600, {3: "socket:[111]"})
+    index = svc.IpcOwnershipIndex(proc_root=str(tmp_path)).refresh(now=0.0)
+
+    index.deadline_sec = 0.0  # nothing gets probed
+    index.refresh(now=1.0)
+    assert index.sockets[111] == {10, 11}
+
+    shutil.rmtree(tmp_path / "11")
+    index.refresh(now=2.0)
+    assert index.names() == {10: "server"}
+    assert index.sockets[111] == {10}
@@ -0,0 +1,31 @@
+"""Tests for ``kernel_ai.ml.bench``."""
+
+from kernel_ai.ml import bench
+
+
+def test_quick_profile_emits_json_results():
+    report = bench.run_suite("quick", only={"baseline", "stide", "store"})
+    results = report["results"]
+    assert "baseline.update_and_score[20]" in results
+    assert "stide.score_window" in results
+    assert "store.ngram_upsert" in results
+    assert all(r["us_per_op"] >= 0 for r in results.values())
+    assert report["meta"]["store"] == "sqlite"
+
+
+def test_compare_flags_slower_benchmarks():
+    old = {"results": {"a": {"us_per_op": 10.0}, "b": {"us_per_op": 10.0}}}
+    new = {"results": {"a": {"us_per_op": 11.0}, "b": {"us_per_op": 20.0}}}
+    regressions = bench.compare(new, old, tolerance=0.2)
+    assert [r["name"] for r in regressions] == ["b"]
+
+
+def test_bench_store_refuses_sqlite_dsn(tmp_path):
+    dsn = "sqlite:///" + str(tmp_path / "ml.db")
+    try:
+        bench.bench_store(dsn, 10, repeat=1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a real store DSN must not be benchmarked in place")
+    assert not (tmp_path / "ml.db").exists()
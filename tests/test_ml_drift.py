@@ -0,0 +1,52 @@
+"""Tests for ``kernel_ai.ml.drift``."""
+
+from kernel_ai.ml import drift
+from kernel_ai.ml.config import MLConfig
+
+
+def _meta():
+    return {
+        "contamination": 0.02,
+        "feature_stats": {"load1": {"mean": 1.0, "std": 0.1}, "proc_count": {"mean": 100.0, "std": 5.0}},
+    }
+
+
+def test_tracker_matches_full_recompute():
+    cfg = MLConfig()
+    tracker = drift.DriftTracker(window_sec=600.0, bucket_sec=60.0, feature_names=["load1", "proc_count"])
+    recent = []
+    for i in range(40):
+        row = {"load1": 1.0 + (i % 5) * 0.5, "proc_count": 100.0 + i}
+        recent.append(row)
+        tracker.update(row, flagged=(i % 10 == 0), now=1000.0 + i * 2)
+    live = tracker.evaluate(_meta(), cfg, now=1080.0)
+    agg, per_feature = drift._feature_drift(recent, _meta()["feature_stats"])
+    assert live["n_recent"] == 40
+    assert live["flag_rate"] == round(4 / 40, 4)
+    assert live["feature_drift"] == round(agg, 4)
+    assert live["detail"]["top_features"] == dict(sorted(per_feature.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def test_tracker_expires_old_buckets_and_resets_flags():
+    tracker = drift.DriftTracker(window_sec=120.0, bucket_sec=60.0, feature_names=["load1"])
+    tracker.update({"load1": 1.0}, flagged=True, now=0.0)
+    tracker.update({"load1": 3.0}, flagged=False, now=130.0)
+    assert tracker.n == 2
+    tracker.update({"load1": 3.0}, flagged=None, now=200.0)
+    assert tracker.n == 2  # the bucket starting at 0 has aged out
+    assert tracker.means() == {"load1": 3.0}
+    tracker.reset_flags()
+    assert tracker.evaluate(_meta(), MLConfig(), now=200.0)["flag_rate"] == 0.0
+
+
+def test_tracker_state_roundtrip():
+    a = drift.DriftTracker(window_sec=600.0, bucket_sec=60.0, feature_names=["load1"])
+    for i in range(5):
+        a.update({"load1": float(i)}, flagged=i == 0, now=100.0 + i * 30)
+    b = drift.DriftTracker(window_sec=600.0, bucket_sec=60.0, feature_names=["load1"])
+    b.load_state(a.export_state(), now=250.0)
+    assert b.n == a.n
+    assert b.means() == a.means()
+    c = drift.DriftTracker(window_sec=600.0, bucket_sec=60.0, feature_names=["other"])
+    c.load_state(a.export_state(), now=250.0)
+    assert c.n == 0  # incompatible layout is ignored
@@ -0,0 +1,47 @@
+"""Tests for ``kernel_ai.ml.features``."""
+
+from kernel_ai.ml import features as feat
+
+
+def _fake_reads(monkeypatch, sampler, values):
+    it = iter(values)
+    monkeypatch.setattr(sampler, "_read", lambda: next(it))
+
+
+def _counters(ctxt: float, running: float) -> dict:
+    return {
+        "ctxt": ctxt, "cpu_busy": 0.0, "cpu_total": 0.0, "procs_running": running,
+        "procs_blocked": 0.0, "pgfault": 0.0, "pgmajfault": 0.0, "tcp_retrans": 0.0,
+        "tcp_outseg": 0.0,
+    }
+
+
+def test_burst_sampler_keeps_short_spikes(monkeypatch):
+    sampler = feat.BurstSampler(period_sec=0.1)
+    # 0.1s steps: a single 100ms fork burst (+5000 switches, 40 runnable).
+    _fake_reads(monkeypatch, sampler, [
+        _counters(0, 1), _counters(10, 1), _counters(5010, 40), _counters(5020, 1), _counters(5030, 1),
+    ])
+    for i in range(5):
+        sampler.sample_once(now=i * 0.1)
+    out = sampler.drain()
+    assert round(out["ctxt_per_sec_max"]) == 50_000
+    assert out["procs_running_max"] == 40
+    assert round(out["procs_running_mean"], 2) == 10.75
+    assert sampler.drain() == {}  # drained
+    sampler.close()
+
+
+def test_burst_specs_and_vector_merge():
+    for name, aggs in feat.BURST_FEATURES.items():
+        for agg in aggs:
+            assert f"{name}_{agg}" in feat.BURST_FEATURE_SPECS
+            assert f"{name}_{agg}" not in feat.FEATURE_SPECS
+    assert set(feat.active_feature_specs(False)) == set(feat.FEATURE_SPECS)
+    assert set(feat.BURST_FEATURE_SPECS) <= set(feat.active_feature_specs(True))
+    ext = feat.FeatureExtractor()
+    raw = ext.read_raw()
+    assert raw["burst"] == {}
+    ext.compute(raw)
+    raw2 = dict(raw, ts=raw["ts"] + 1.0, burst={"ctxt_per_sec_max": 7.0})
+    assert ext.compute(raw2)["ctxt_per_sec_max"] == 7.0
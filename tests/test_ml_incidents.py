@@ -0,0 +1,80 @@
+"""Tests for ``kernel_ai.ml.incidents``."""
+
+from kernel_ai.ml import store
+from kernel_ai.ml.incidents import IncidentAggregator
+
+
+class _Store:
+    def __init__(self):
+        self.rows: dict[int, dict] = {}
+        self.writes = 0
+
+    def save_incidents(self, incidents):
+        ids = []
+        for inc in incidents:
+            row_id = inc["id"] if inc["id"] is not None else len(self.rows) + 1
+            self.rows[row_id] = dict(inc, id=row_id)
+            ids.append(row_id)
+        self.writes += len(incidents)
+        return ids
+
+
+def _anomaly(feature: str, score: float, severity: str = "medium") -> dict:
+    return {"source": "stage1_baseline", "feature": feature, "type": f"baseline_spike:{feature}",
+            "severity": severity, "score": score}
+
+
+def test_storm_becomes_one_row_per_feature():
+    agg = IncidentAggregator(gap_sec=5.0, flush_sec=10.0)
+    st = _Store()
+    for t in range(60):
+        score = 20.0 if t == 30 else 5.0
+        agg.add([_anomaly("load1", score, "high" if t == 30 else "medium"), _anomaly("ctxt_per_sec", 5.0)],
+                now=float(t))
+        agg.flush(st, now=float(t))
+    agg.expire(float("inf"))
+    agg.flush(st, now=100.0, force=True)
+
+    assert len(st.rows) == 2
+    load = next(r for r in st.rows.values() if r["feature"] == "load1")
+    assert load["count"] == 60
+    assert (load["first_ts"], load["last_ts"]) == (0.0, 59.0)
+    assert load["score"] == 20.0 and load["severity"] == "high"
+    # 2 inserts + one update per feature per flush window + final close, plus
+    # one update per tick once load1 turned high (t=30..59).
+    assert st.writes <= 2 + 2 * 6 + 2 + 30
+    assert len(agg) == 0
+
+
+def test_high_severity_incident_row_tracks_every_occurrence():
+    agg = IncidentAggregator(gap_sec=5.0, flush_sec=10.0)
+    st = _Store()
+    for t in range(4):
+        agg.add([_anomaly("load1", 9.0, "high"), _anomaly("ctxt_per_sec", 5.0)], now=float(t))
+        agg.flush(st, now=float(t))
+    rows = {r["feature"]: r for r in st.rows.values()}
+    # The poison guard reads ts of the open row: it must not lag flush_sec.
+    assert rows["load1"]["last_ts"] == 3.0
+    assert rows["ctxt_per_sec"]["last_ts"] == 0.0
+
+
+def test_gap_opens_a_new_incident():
+    agg = IncidentAggregator(gap_sec=5.0, flush_sec=10.0)
+    st = _Store()
+    agg.add([_anomaly("load1", 5.0)], now=0.0)
+    agg.flush(st, now=0.0)
+    agg.add([_anomaly("load1", 6.0)], now=20.0)
+    agg.flush(st, now=20.0)
+    assert len(st.rows) == 2
+
+
+def test_sqlite_store_updates_incident_in_place(tmp_path):
+    dsn = f"sqlite:///{tmp_path / 'ml.db'}"
+    st = store.open_store(dsn)
+    inc = dict(_anomaly("load1", 5.0), id=None, first_ts=1000.0, last_ts=1000.0, count=1)
+    (row_id,) = st.save_incidents([inc])
+    st.save_incidents([dict(inc, id=row_id, last_ts=1010.0, count=6, score=9.0)])
+    st.commit()
+    rows = st.conn.execute("SELECT id, count, score, first_ts, ts FROM ml_anomalies").fetchall()
+    st.close()
+    assert rows == [(row_id, 6, 9.0, 1000.0, 1010.0)]
@@ -0,0 +1,44 @@
+"""Tests for ``kernel_ai.ml.metrics``."""
+
+import dataclasses
+from collections import Counter
+from types import SimpleNamespace
+
+from kernel_ai.ml import metrics as ml_metrics
+from kernel_ai.ml.config import MLConfig
+from kernel_ai.ml.sequence import NgramTracker
+
+
+def _worker(**kw):
+    base = dict(
+        stage_timings={"features": 0.002, "isoforest": 0.0007},
+        emitted=Counter({"stage1_baseline": 3}),
+        seq_tracker=NgramTracker(n=2),
+        incidents=None,
+        proc_detector=None,
+        model_loaded_at={"isoforest": 1700000000.0},
+    )
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+def test_worker_metrics_textfile(tmp_path):
+    path = tmp_path / "kernel_ai_ml.prom"
+    m = ml_metrics.WorkerMetrics(textfile=str(path))
+    w = _worker()
+    m.observe_tick(w, 0.01)
+    w.emitted["stage1_baseline"] += 2
+    m.observe_tick(w, 0.02)
+    m.observe_housekeeping(w)
+
+    text = path.read_text()
+    assert "kernel_ai_ml_ticks_total 2.0" in text
+    assert 'kernel_ai_ml_anomalies_total{source="stage1_baseline"} 5.0' in text
+    assert 'kernel_ai_ml_stage_seconds_count{stage="features"} 2.0' in text
+    assert 'kernel_ai_ml_state_entries{component="ngram_pending"} 0.0' in text
+    assert 'kernel_ai_ml_model_loaded_timestamp{model="isoforest"} 1.7e+09' in text
+
+
+def test_metrics_off_by_default():
+    cfg = dataclasses.replace(MLConfig(), metrics_port=0, metrics_textfile="")
+    assert ml_metrics.create_worker_metrics(cfg) is None
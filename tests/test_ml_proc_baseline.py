@@ -0,0 +1,89 @@
+"""Tests for ``kernel_ai.ml.proc_baseline``."""
+
+from kernel_ai.ml.proc_baseline import CommBaselines, LineageWhitelist, ProcBaselineDetector
+from kernel_ai.ml.proc_features import ProcSample
+
+
+def _sample(pid: int, comm: str, *, fds: int = 8, parent: str = "bash", age: float = 600.0) -> ProcSample:
+    s = ProcSample(
+        pid=pid, ppid=1, comm=comm, parent_comm=parent, ruid=1000, euid=1000,
+        age_sec=age, num_threads=1, fd_count=fds, vm_rss_mb=3.0,
+    )
+    s.features = s.score_vector()
+    return s
+
+
+def test_lineage_eviction_keeps_established_pairs_whitelisted():
+    wl = LineageWhitelist(min_count=3, max_entries=10)
+    for _ in range(3):
+        wl.observe("systemd", "sshd")
+    wl.drain_pending()
+    for i in range(30):
+        wl.observe("runc", f"job-{i}")
+        wl.drain_pending()
+    assert len(wl) <= 10
+    # Evicted or not, an established pair never looks novel again...
+    assert not wl.is_below_threshold("systemd", "sshd")
+    assert wl.observe("systemd", "sshd") >= 3
+    # ...and an evicted rare pair only ever under-counts.
+    assert wl.is_below_threshold("runc", "job-0")
+
+
+def test_lineage_established_hashes_stay_bounded_under_churn():
+    wl = LineageWhitelist(min_count=2, max_entries=10)
+    for i in range(500):
+        wl.observe("runc", f"job-{i}")
+        wl.observe("runc", f"job-{i}")
+        wl.drain_pending()
+    assert len(wl) <= 10
+    assert len(wl._established) <= 10
+    # The most recently demoted pairs are still whitelisted.
+    assert not wl.is_below_threshold("runc", "job-480")
+
+
+def test_lineage_eviction_never_drops_pending_counts():
+    wl = LineageWhitelist(min_count=3, max_entries=5)
+    for i in range(20):
+        wl.observe("cron", f"task-{i}")
+    drained = wl.drain_pending()
+    assert len(drained) == 20
+    assert sum(n for _, _, n in drained) == 20
+
+
+def test_lineage_restore_pending_caps_backlog(caplog):
+    wl = LineageWhitelist(min_count=3, max_entries=5, max_pending=2)
+    wl.restore_pending([("cron", "a", 4), ("cron", "b", 1)])
+    wl.restore_pending([("cron", "c", 2)])
+    assert sorted(wl.drain_pending()) == [("cron", "a", 4), ("cron", "c", 2)]
+    assert "dropped 1 lowest-count" in caplog.text
+
+
+def test_comm_baselines_recycle_least_recently_seen_rows():
+    cb = CommBaselines(alpha=0.2, warmup_samples=0, max_comms=2, ttl_sec=10.0)
+    vec = {"fd_count": 4.0, "num_threads": 1.0, "vm_rss_mb": 2.0}
+    cb.update_and_score("a", vec, now=0.0)
+    cb.update_and_score("b", vec, now=1.0)
+    cb.update_and_score("a", vec, now=2.0)
+    cb.update_and_score("c", vec, now=3.0)  # evicts "b"
+    assert len(cb) == 2
+    assert len(cb._count) == 2  # row storage reused, not grown
+    assert cb.evict_stale(now=12.5) == 1  # "a" last seen at 2.0
+    assert len(cb) == 1
+
+
+def test_detector_scores_spikes_and_bounds_state():
+    det = ProcBaselineDetector(
+        alpha=0.2, warmup_samples=5, z_warn=4.0, z_crit=7.0,
+        cooldown_sec=5.0, max_seen_pids=50,
+    )
+    for t in range(20):
+        det.score([_sample(100, "nginx", fds=8)], now=float(t))
+    out = det.score([_sample(100, "nginx", fds=200)], now=20.0)
+    assert any(a["type"] == "proc_anomaly:fd_count" for a in out)
+
+    for i in range(200):
+        det.score([_sample(1000 + i, f"ci-{i}", age=30.0)], now=100.0 + i * 10)
+    usage = det.memory_usage()
+    assert usage["seen_pids"] <= 50
+    assert usage["cooldowns"] <= 1  # expired cooldowns are dropped
+    assert usage["bytes"] > 0
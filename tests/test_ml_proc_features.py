@@ -0,0 +1,86 @@
+"""Tests for ``kernel_ai.ml.proc_features``."""
+
+from kernel_ai.ml import proc_features as pf
+
+
+def _fake_proc(monkeypatch, procs: dict[int, tuple]):
+    """procs: pid -> (comm, ppid, starttime, num_threads, ruid, euid)."""
+    calls = {"uids": [], "fds": []}
+
+    monkeypatch.setattr(pf.os, "listdir", lambda _path: [str(p) for p in procs])
+
+    def fake_stat(pid):
+        if pid not in procs:
+            return None
+        comm, ppid, start, threads, _r, _e = procs[pid]
+        return comm, "S", ppid, 0, threads, start
+
+    def fake_uids(pid):
+        calls["uids"].append(pid)
+        return procs[pid][4], procs[pid][5]
+
+    def fake_fds(pid):
+        calls["fds"].append(pid)
+        return 4
+
+    monkeypatch.setattr(pf, "_parse_stat", fake_stat)
+    monkeypatch.setattr(pf, "_read_uids", fake_uids)
+    monkeypatch.setattr(pf, "_owner_uid", lambda pid: procs[pid][5])
+    monkeypatch.setattr(pf, "_count_fds", fake_fds)
+    monkeypatch.setattr(pf, "_read_statm_rss_mb", lambda _pid, _page: 1.5)
+    monkeypatch.setattr(pf, "_read_comm", lambda _pid: "?")
+    return calls
+
+
+def test_collect_caches_static_fields_per_starttime(monkeypatch):
+    procs = {pid: (f"p{pid}", 1, 100, 1, 1000, 1000) for pid in range(1, 41)}
+    calls = _fake_proc(monkeypatch, procs)
+    ext = pf.ProcFeatureExtractor(max_pids=8)
+
+    first = ext.collect()
+    assert len(first) == 8
+    assert set(calls["uids"]) == set(range(1, 41))
+    assert first[0].parent_comm == "p1"
+    assert first[0].vm_rss_mb == 1.5
+
+    calls["uids"].clear()
+    calls["fds"].clear()
+    ext.collect()
+    # Only the shortlist (2 x max_pids) gets its fds and uids re-read.
+    assert len(calls["fds"]) == 16
+    assert sorted(calls["uids"]) == sorted(calls["fds"])
+
+    # pid reuse (new starttime) and exec (new comm) both refresh the uids.
+    procs[5] = ("p5", 1, 999, 1, 1000, 1000)
+    procs[6] = ("sudo", 1, 100, 1, 1000, 0)
+    calls["uids"].clear()
+    out = ext.collect()
+    assert {5, 6} <= set(calls["uids"])
+    assert out[0].pid == 6 and out[0].euid == 0
+
+
+def test_collect_sees_in_place_escalation_and_reparenting(monkeypatch):
+    procs = {pid: (f"p{pid}", 1, 100, 1, 1000, 1000) for pid in range(1, 41)}
+    _fake_proc(monkeypatch, procs)
+    ext = pf.ProcFeatureExtractor(max_pids=8)
+    ext.collect()
+
+    # commit_creds in a cached, non-shortlisted pid: same comm and starttime.
+    procs[33] = ("p33", 1, 100, 1, 1000, 0)
+    out = ext.collect()
+    assert out[0].pid == 33 and out[0].euid == 0
+
+    # Parent exits, the child is reparented to pid 2.
+    procs[33] = ("p33", 2, 100, 1, 1000, 0)
+    out = ext.collect()
+    assert out[0].pid == 33 and out[0].parent_comm == "p2"
+
+
+def test_collect_evicts_exited_pids(monkeypatch):
+    procs = {pid: (f"p{pid}", 1, 100, 1, 0, 0) for pid in range(1, 5)}
+    _fake_proc(monkeypatch, procs)
+    ext = pf.ProcFeatureExtractor(max_pids=8)
+    ext.collect()
+    del procs[3]
+    ext.collect()
+    assert 3 not in ext._comm_cache and 3 not in ext._static
@@ -0,0 +1,64 @@
+"""Tests for ``kernel_ai.ml.pulse`` and the ``/api/ml-pulse`` endpoint."""
+
+import dataclasses
+
+from kernel_ai.ml import config as ml_config
+from kernel_ai.ml import pulse as ml_pulse
+from kernel_ai.webapp import create_app
+
+
+def test_writer_reader_roundtrip(tmp_path):
+    path = str(tmp_path / "pulse")
+    writer = ml_pulse.PulseWriter(path, capacity=4096)
+    assert ml_pulse.read_pulse(path) is None  # nothing published yet
+    writer.publish({"tick": 1, "z": {"load1": 4.2}}, ts=1000.0)
+    writer.publish({"tick": 2, "z": {"load1": 1.0}}, ts=1002.0)
+    got = ml_pulse.read_pulse(path)
+    assert got == {"seq": 2, "ts": 1002.0, "payload": {"tick": 2, "z": {"load1": 1.0}}}
+    assert not writer.publish({"blob": "x" * 5000}, ts=1003.0)
+    assert ml_pulse.read_pulse(path)["seq"] == 2
+    writer.close()
+
+
+def test_reader_retries_while_write_in_progress(tmp_path):
+    path = str(tmp_path / "pulse")
+    writer = ml_pulse.PulseWriter(path, capacity=1024)
+    writer.publish({"tick": 1}, ts=1.0)
+    # Simulate a writer paused mid-update: odd sequence number.
+    ml_pulse._SEQ.pack_into(writer._mm, ml_pulse._SEQ_OFFSET, 3)
+    assert ml_pulse.read_pulse(path, retries=3) is None
+    writer.close()
+
+
+def test_reader_remaps_recreated_file_without_closing_old_mapping(tmp_path):
+    path = str(tmp_path / "pulse")
+    writer = ml_pulse.PulseWriter(path, capacity=1024)
+    writer.publish({"tick": 1}, ts=1.0)
+    assert ml_pulse.read_pulse(path)["payload"] == {"tick": 1}
+    old = ml_pulse._mapping(path)
+
+    # Worker restart: a new file (new inode) replaces the old one.
+    writer.close()
+    (tmp_path / "pulse").unlink()
+    writer = ml_pulse.PulseWriter(path, capacity=1024)
+    writer.publish({"tick": 9}, ts=2.0)
+    assert ml_pulse.read_pulse(path)["payload"] == {"tick": 9}
+    # A request still holding the previous mapping can finish its copy.
+    assert old[:len(ml_pulse.MAGIC)] == ml_pulse.MAGIC
+    writer.close()
+
+
+def test_ml_pulse_endpoint(tmp_path, monkeypatch):
+    path = str(tmp_path / "pulse")
+    base = ml_config.MLConfig()
+    monkeypatch.setattr(ml_config, "MLConfig", lambda: dataclasses.replace(base, pulse_path=path))
+    client = create_app().test_client()
+    assert client.get("/api/ml-pulse").get_json()["available"] is False
+
+    writer = ml_pulse.PulseWriter(path)
+    writer.publish({"tick": 7, "features": {"load1": 0.5}}, ts=1.0)
+    payload = client.get("/api/ml-pulse").get_json()
+    writer.close()
+    assert payload["available"] is True
+    assert payload["pulse"]["tick"] == 7
+    assert payload["seq"] == 1
@@ -0,0 +1,70 @@
+"""Tests for ``kernel_ai.ml.replay``."""
+
+import dataclasses
+import gzip
+import json
+
+from kernel_ai.ml import replay
+from kernel_ai.ml.config import MLConfig
+
+
+def _cfg(**kw) -> MLConfig:
+    base = dict(enable_stage2=False, enable_stage7=False, enable_stage8=False, warmup_samples=5)
+    base.update(kw)
+    return dataclasses.replace(MLConfig(), **base)
+
+
+def _raw(ts: float, ctxt: float) -> dict:
+    counters = {k: 0.0 for k in (
+        "pgfault", "pgmajfault", "pgscan_direct", "swap_io", "tcp_retrans", "tcp_inseg",
+        "tcp_outseg", "net_softirq", "block_softirq", "hardirq", "cpu_busy", "cpu_total",
+    )}
+    counters["ctxt"] = ctxt
+    gauges = {k: 1.0 for k in (
+        "proc_count", "procs_running", "procs_blocked", "run_queue", "load1",
+        "psi_mem_some10", "psi_mem_full10",
+    )}
+    return {"ts": ts, "counters": counters, "gauges": gauges}
+
+
+def _write(path, ticks: list[dict], **header) -> None:
+    head = {"version": replay.FORMAT_VERSION, "interval_sec": 1.0, "seq_subsamples": 2, "stage5": True}
+    head.update(header)
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        fh.write(json.dumps(head) + "\n")
+        for t in ticks:
+            fh.write(json.dumps(t) + "\n")
+
+
+def test_replay_reports_throughput_stages_and_anomalies(tmp_path):
+    ticks = []
+    ctxt = 0.0
+    for i in range(40):
+        ctxt += 50_000.0 if i == 39 else 100.0 + (i % 3) * 20.0
+        ticks.append({
+            "raw": _raw(1000.0 + i, ctxt),
+            "syscalls": [{"1": "read", "2": "write"}, {"1": "write", "2": "read"}],
+            "procs": [{
+                "pid": 7, "ppid": 1, "comm": "nginx", "parent_comm": "systemd", "ruid": 0,
+                "euid": 0, "age_sec": 900.0, "num_threads": 1, "fd_count": 8, "vm_rss_mb": 3.0,
+                "features": {"fd_count": 8.0, "num_threads": 1.0, "vm_rss_mb": 3.0},
+            }],
+        })
+    path = tmp_path / "rec.jsonl.gz"
+    _write(path, ticks)
+
+    report = replay.run_replay(str(path), _cfg())
+    assert report["ticks"] == 40
+    assert report["ticks_per_sec"] > 0
+    assert {"features", "baseline", "drift", "sequence", "process", "store"} <= set(report["stages"])
+    assert report["anomalies"].get("stage1_baseline", 0) >= 1
+
+
+def test_record_roundtrip(tmp_path):
+    path = tmp_path / "live.jsonl.gz"
+    n = replay.record(str(path), _cfg(enable_stage4=False, enable_stage5=False), ticks=2, interval_sec=0.0)
+    assert n == 2
+    header, ticks = replay.read_ticks(str(path))
+    assert header["stage5"] is False and header["seq_subsamples"] == 0
+    rows = list(ticks)
+    assert len(rows) == 2 and "ctxt" in rows[0]["raw"]["counters"]
@@ -0,0 +1,120 @@
+"""Tests for ``kernel_ai.ml.sequence``."""
+
+import errno
+import os
+from pathlib import Path
+
+from kernel_ai.ml import sequence as seq
+
+
+def _write_proc(root: Path, pid: int, *, state: str = "S", ticks: int = 0, syscall: str = "0 0x0") -> None:
+    d = root / str(pid)
+    d.mkdir(exist_ok=True)
+    # pid (comm) state ppid pgrp session tty tpgid flags minflt cminflt majflt cmajflt utime stime
+    (d / "stat").write_text(f"{pid} (p{pid}) {state} 1 1 1 0 0 0 0 0 0 0 {ticks} 0 0 0\n")
+    (d / "syscall").write_text(syscall + "\n")
+
+
+def test_sampler_prefers_active_pids(tmp_path, monkeypatch):
+    monkeypatch.setattr(seq, "_PROC", str(tmp_path))
+    for pid in range(1, 11):
+        _write_proc(tmp_path, pid)
+    sampler = seq.SyscallSampler(max_pids=4, hot_fraction=0.5)
+    sampler.refresh()
+
+    # pid 9 burns CPU, pid 10 is runnable: both must enter the working set.
+    _write_proc(tmp_path, 9, ticks=50)
+    _write_proc(tmp_path, 10, state="R")
+    sampler.refresh()
+    assert {9, 10} <= set(sampler._fds)
+    assert sampler.stats["hot"] == 2
+    assert len(sampler._fds) == 4
+    sampler.close()
+
+
+def test_sampler_rotates_through_idle_pids(tmp_path, monkeypatch):
+    monkeypatch.setattr(seq, "_PROC", str(tmp_path))
+    for pid in range(1, 7):
+        _write_proc(tmp_path, pid)
+    sampler = seq.SyscallSampler(max_pids=2, hot_fraction=0.0)
+    seen = set()
+    for _ in range(3):
+        sampler.refresh()
+        seen |= set(sampler._fds)
+    assert seen == {1, 2, 3, 4, 5, 6}
+    sampler.close()
+
+
+def test_sampler_reads_names_and_drops_unreadable(tmp_path, monkeypatch):
+    monkeypatch.setattr(seq, "_PROC", str(tmp_path))
+    _write_proc(tmp_path, 1, syscall="0 0x3 0x0")
+    _write_proc(tmp_path, 2, syscall="running")
+    _write_proc(tmp_path, 3, syscall="1 0x1")
+    sampler = seq.SyscallSampler(max_pids=8)
+    out = sampler.sample()
+    assert out[1] == seq.SYSCALL_NAMES.get(0, "sys_0")
+    assert 2 not in out
+
+    fd3 = sampler._fds[3]
+    real_pread = os.pread
+
+    def fake_pread(fd, n, off):
+        if fd == fd3:
+            raise OSError(errno.EACCES, "denied")
+        return real_pread(fd, n, off)
+
+    monkeypatch.setattr(seq.os, "pread", fake_pread)
+    out = sampler.sample()
+    assert 3 not in out and 3 not in sampler._fds
+    assert sampler.stats["eacces"] == 1
+    sampler.refresh()
+    assert 3 not in sampler._fds  # remembered as denied until it exits
+    sampler.close()
+
+
+def test_tracker_restore_pending_merges_failed_flush():
+    tracker = seq.NgramTracker(n=2)
+    tracker.update({1: "read"})
+    tracker.update({1: "write"})
+    failed = tracker.drain_pending()
+    tracker.update({1: "read"})
+    tracker.restore_pending(failed)
+    assert tracker.drain_pending() == {"read|write": 1, "write|read": 1}
+
+
+def test_tracker_restore_pending_drops_rarest_past_cap(caplog):
+    tracker = seq.NgramTracker(n=2, max_pending=2)
+    tracker.restore_pending({"a|b": 5, "b|c": 1, "c|d": 3})
+    assert tracker.drain_pending() == {"a|b": 5, "c|d": 3}
+    assert "dropped 1 rarest" in caplog.text
+
+
+def test_packed_profile_matches_set_model(tmp_path):
+    vocab = {"read|write|close", "openat|read|close", "futex|futex|futex"}
+    path = str(tmp_path / "stide.stide")
+    assert seq.PackedStideModel.write(path, 3, vocab, {"vocab_kept": 3}) == 3
+    packed = seq.load_stide(path)
+    assert isinstance(packed, seq.PackedStideModel)
+    assert packed.n == 3 and packed.meta == {"vocab_kept": 3} and len(packed) == 3
+
+    legacy = seq.StideModel(n=3, ngrams=vocab)
+    window = ["read|write|close", "execve|dup2|connect", "futex|futex|futex", "execve|dup2|connect"]
+    assert packed.score_window(window) == legacy.score_window(window) == (0.5, 2)
+    assert packed.top_unseen(window) == legacy.top_unseen(window)
+
+
+def test_load_stide_reads_legacy_joblib(tmp_path):
+    path = str(tmp_path / "stide.joblib")
+    seq.StideModel(n=2, ngrams={"read|write"}).save(path)
+    model = seq.load_stide(path)
+    assert isinstance(model, seq.StideModel) and "read|write" in model.ngrams
+
+
+def test_resolve_stide_path_falls_back_to_legacy_default(tmp_path):
+    packed = str(tmp_path / "stide_latest.stide")
+    assert seq.resolve_stide_path(packed) == packed  # nothing on disk: keep configured path
+    legacy = tmp_path / seq.LEGACY_STIDE_FILENAME
+    seq.StideModel(n=2, ngrams={"read|write"}).save(str(legacy))
+    assert seq.resolve_stide_path(packed) == str(legacy)
+    Path(packed).write_bytes(b"x")
+    assert seq.resolve_stide_path(packed) == packed
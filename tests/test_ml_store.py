@@ -0,0 +1,77 @@
+"""Tests for ``kernel_ai.ml.store`` (fake connection, no Postgres needed)."""
+
+from contextlib import contextmanager
+
+from kernel_ai.ml import store
+
+
+class _FakeCopy:
+    def __init__(self, log):
+        self.log = log
+
+    def write_row(self, row):
+        self.log.append(("row", tuple(row)))
+
+
+class _FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def execute(self, sql, *_args):
+        self.log.append(("sql", " ".join(sql.split())))
+
+    @contextmanager
+    def copy(self, sql):
+        self.log.append(("copy", sql))
+        yield _FakeCopy(self.log)
+
+
+class _FakeConn:
+    def __init__(self):
+        self.log = []
+
+    @contextmanager
+    def transaction(self):
+        self.log.append(("begin",))
+        yield
+        self.log.append(("commit",))
+
+    def cursor(self):
+        return _FakeCursor(self.log)
+
+
+def _store() -> store.PostgresStore:
+    st = store.PostgresStore.__new__(store.PostgresStore)
+    st.dsn = "postgresql://fake"
+    st.conn = _FakeConn()
+    return st
+
+
+def test_upsert_ngram_counts_copies_then_merges_once():
+    st = _store()
+    st.upsert_ngram_counts(3, {"read|read|write": 4, "futex|futex|futex": 9})
+    kinds = [entry[0] for entry in st.conn.log]
+    assert kinds == ["begin", "sql", "copy", "row", "row", "sql", "sql", "commit"]
+    assert ("row", ("read|read|write", 3, 4)) in st.conn.log
+    merges = [e[1] for e in st.conn.log if e[0] == "sql" and e[1].startswith("INSERT")]
+    assert len(merges) == 1 and "ON CONFLICT (ngram)" in merges[0]
+
+
+def test_upsert_lineage_counts_uses_staging_table():
+    st = _store()
+    st.upsert_lineage_counts([("bash", "nc", 1)])
+    assert ("copy", "COPY ml_proc_lineage_stage (parent_comm, child_comm, count) FROM STDIN") in st.conn.log
+    assert ("row", ("bash", "nc", 1)) in st.conn.log
+
+
+def test_upsert_skips_empty_batches():
+    st = _store()
+    st.upsert_ngram_counts(3, {})
+    st.upsert_lineage_counts([])
+    assert st.conn.log == []
@@ -0,0 +1,123 @@
+"""Tests for ``kernel_ai.ml.store_sqlite`` and DSN-scheme dispatch in ``kernel_ai.ml.store``."""
+
+from kernel_ai.ml import store, store_sqlite
+
+
+def _dsn(tmp_path) -> str:
+    return f"sqlite:///{tmp_path / 'ml' / 'kernel_ai.db'}"
+
+
+def _anomaly(severity: str = "high") -> dict:
+    return {
+        "source": "stage1_baseline",
+        "feature": "load1",
+        "type": "baseline_spike:load1",
+        "severity": severity,
+        "score": 9.0,
+        "meta": {"stage": 1, "attack": {"mitre": "T1496"}},
+    }
+
+
+def test_open_store_selects_backend_by_scheme(tmp_path):
+    st = store.open_store(_dsn(tmp_path))
+    try:
+        assert isinstance(st, store_sqlite.SqliteStore)
+    finally:
+        st.close()
+
+
+def test_sqlite_store_roundtrip_through_module_readers(tmp_path):
+    dsn = _dsn(tmp_path)
+    st = store.open_store(dsn)
+    st.insert_feature_snapshot({"load1": 0.5})
+    st.insert_anomalies([_anomaly()])
+    st.upsert_ngram_counts(3, {"read|read|write": 2})
+    st.upsert_ngram_counts(3, {"read|read|write": 3})
+    st.upsert_lineage_counts([("bash", "nc", 1), ("bash", "nc", 2)])
+    st.save_baseline([{"name": "load1", "mean": 0.4, "var": 0.01, "count": 50}])
+    st.save_drift_state({"features": ["load1"], "buckets": []})
+    st.insert_drift({"flag_rate": 0.1, "n_recent": 30, "drifted": True, "detail": {}})
+    st.close()
+
+    st = store.open_store(dsn)
+    try:
+        assert st.load_baseline()[0]["count"] == 50
+        assert st.load_lineage_counts() == [("bash", "nc", 3)]
+        assert st.load_drift_state() == {"features": ["load1"], "buckets": []}
+    finally:
+        st.close()
+
+    assert store.fetch_ngram_counts(dsn, n=3) == {"read|read|write": 5}
+    assert store.fetch_recent_feature_dicts(dsn, minutes=5) == [{"load1": 0.5}]
+    anomalies = store.fetch_recent_anomalies(dsn, since_seconds=60)
+    assert anomalies[0]["attack"] == {"mitre": "T1496"}
+    assert anomalies[0]["ts"].endswith("+00:00")
+    status = store.fetch_drift_status(dsn)
+    assert status["latest"]["drifted"] is True
+    assert store.fetch_drift_state(dsn, max_age_sec=60) is not None
+    # Poison guard: the snapshot sits next to a high-severity anomaly.
+    assert store.fetch_training_snapshots(dsn, exclude_anomalous=True) == []
+    assert len(store.fetch_training_snapshots(dsn, exclude_anomalous=False)) == 1
+
+
+def test_sqlite_poison_guard_covers_coalesced_incident_span(tmp_path):
+    dsn = _dsn(tmp_path)
+    st = store.open_store(dsn)
+    # One row for a 600 s high-severity storm ending at t=10000.
+    st.save_incidents([dict(_anomaly(), id=None, first_ts=9400.0, last_ts=10000.0, count=300)])
+    for ts, tag in ((9000.0, "before"), (9350.0, "lead-in"), (9700.0, "mid-storm"), (10500.0, "after")):
+        st.conn.execute("INSERT INTO ml_feature_snapshots (ts, features) VALUES (?, ?)", (ts, f'{{"{tag}": 1}}'))
+    st.close()
+
+    clean = store.fetch_training_snapshots(dsn, guard_sec=120)
+    assert sorted(next(iter(row)) for row in clean) == ["after", "before"]
+
+
+def test_sqlite_store_batches_commits(tmp_path):
+    dsn = _dsn(tmp_path)
+    st = store_sqlite.SqliteStore(dsn, batch_sec=3600.0)
+    try:
+        st.insert_feature_snapshot({"load1": 1.0})
+        # Not yet committed: concurrent readers see the previous state.
+        assert store.fetch_recent_feature_dicts(dsn) == []
+        st.commit()
+        assert store.fetch_recent_feature_dicts(dsn) == [{"load1": 1.0}]
+    finally:
+        st.close()
+
+
+def test_sqlite_readers_degrade_gracefully(tmp_path):
+    dsn = _dsn(tmp_path)
+    assert store.fetch_recent_anomalies(dsn) == []
+    assert store.fetch_drift_status(dsn)["available"] is False
+
+
+def test_sqlite_prune_expires_drift_history(tmp_path):
+    dsn = _dsn(tmp_path)
+    st = store_sqlite.SqliteStore(dsn)
+    try:
+        st.insert_drift({"flag_rate": 0.1, "n_recent": 30, "drifted": False, "detail": {}})
+        st.conn.execute("UPDATE ml_drift SET ts = ts - 7200")
+        st.insert_drift({"flag_rate": 0.2, "n_recent": 30, "drifted": True, "detail": {}})
+        st.prune(48, 168, drift_hours=1)
+        assert st.conn.execute("SELECT COUNT(*) FROM ml_drift").fetchone()[0] == 1
+    finally:
+        st.close()
+
+
+def test_sqlite_close_releases_lock_when_commit_fails(tmp_path):
+    dsn = _dsn(tmp_path)
+    st = store_sqlite.SqliteStore(dsn, batch_sec=3600.0)
+    st.insert_feature_snapshot({"load1": 1.0})
+
+    def _fail():
+        raise RuntimeError("disk I/O error")
+
+    st.commit = _fail
+    st.close()
+    other = store_sqlite.SqliteStore(dsn, batch_sec=0.0)
+    try:
+        other.insert_feature_snapshot({"load1": 2.0})
+        assert store.fetch_recent_feature_dicts(dsn) == [{"load1": 2.0}]
+    finally:
+        other.close()
@@ -0,0 +1,49 @@
+"""Tests for the Stage 2 hyperparameter sweep in ``kernel_ai.ml.train``."""
+
+import dataclasses
+import random
+
+from kernel_ai.ml import train as train_mod
+from kernel_ai.ml.config import MLConfig
+from kernel_ai.ml.model import IsolationForestModel
+
+
+def _matrix(n: int = 300) -> list[list[float]]:
+    rng = random.Random(7)
+    return [[rng.gauss(10.0, 1.0) for _ in train_mod.FEATURE_ORDER] for _ in range(n)]
+
+
+def test_sweep_scores_every_grid_point_and_picks_an_eligible_best():
+    cfg = dataclasses.replace(
+        MLConfig(),
+        if_sweep_contamination=("0.01", "0.05"),
+        if_sweep_trees=("20", "40"),
+        if_sweep_max_samples=("auto",),
+        if_sweep_workers=2,
+    )
+    result = train_mod.sweep(cfg, _matrix())
+    assert len(result["candidates"]) == 4
+    best = result["best"]
+    assert best is not None
+    assert cfg.retrain_min_flag_rate <= best["train_flag_rate"] <= cfg.retrain_max_flag_rate
+    # Synthetic attacks sit many stds away from the clean data.
+    assert best["attack_recall"] > 0.5
+
+
+def test_sweep_rejects_candidates_outside_guardrails():
+    cfg = dataclasses.replace(
+        MLConfig(),
+        if_sweep_contamination=("0.45",),
+        if_sweep_trees=("10",),
+        if_sweep_max_samples=("auto",),
+        if_sweep_workers=1,
+        retrain_max_flag_rate=0.30,
+    )
+    assert train_mod.sweep(cfg, _matrix(100))["best"] is None
+
+
+def test_parallel_fit_scores_single_threaded():
+    model = IsolationForestModel(feature_names=train_mod.FEATURE_ORDER)
+    model.fit(_matrix(100), n_estimators=10, n_jobs=2, max_samples=64)
+    assert model.model.n_jobs == 1
+    assert model.meta["max_samples"] == 64
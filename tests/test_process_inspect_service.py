@@ -1,5 +1,7 @@
 """Tests for ``kernel_ai.services.process_inspect``."""
 
+import contextlib
+
 from kernel_ai.services import process_inspect as svc
 
 
@@ -62,3 +64,56 @@ def test_get_process_fds_info_descriptors(monkeypatch):
     descriptors = out["descriptors"]
     assert [item["fd"] for item in descriptors] == [0, 1, 2, 7, 19]
     assert [item["type"] for item in descriptors] == ["stdin", "stdout", "stderr", "socket", "pipe"]
+
+
+def test_get_process_batch_info_shares_reads_and_caches(monkeypatch):
+    class _BatchProc:
+        def __init__(self, pid):
+            self.pid = pid
+
+        def oneshot(self):
+            return contextlib.nullcontext()
+
+        def create_time(self):
+            return starts.get(self.pid, 1.0)
+
+        def cpu_percent(self, interval=None):
+            return 12.5
+
+    created = []
+    fingerprints = []
+    starts = {}
+    monkeypatch.setattr(svc, "_BATCH_CACHE", {})
+    monkeypatch.setattr(svc.time, "sleep", lambda _s: None)
+    monkeypatch.setattr(svc.psutil, "Process", lambda pid: created.append(pid) or _BatchProc(pid))
+    monkeypatch.setattr(svc, "get_process_namespace_fingerprint", lambda pid: fingerprints.append(pid) or {"pid": pid})
+    monkeypatch.setattr(svc, "get_process_threads_info", lambda pid, proc=None: {"pid": pid, "thread_count": 1})
+    monkeypatch.setattr(svc, "get_process_cpu_info", lambda pid, proc=None, interval=0.1: {"pid": pid, "interval": interval})
+    monkeypatch.setattr(
+        svc,
+        "get_process_fds_info",
+        lambda pid, proc=None, namespace_fingerprint=None: {"pid": pid, "namespace_fingerprint": namespace_fingerprint},
+    )
+
+    out = svc.get_process_batch_info([10, 11, 10])
+    assert list(out["processes"]) == ["10", "11"]
+    row = out["processes"]["10"]
+    assert row["cpu"]["interval"] is None
+    assert row["fds"]["namespace_fingerprint"] is row["namespaces"]
+    assert sorted(created) == [10, 11] and sorted(fingerprints) == [10, 11]
+
+    again = svc.get_process_batch_info([10], include=["cpu", "threads"])
+    assert again["cache_hits"] == 2
+    assert len(fingerprints) == 2
+
+    # Same pid, different process: nothing may come from the cache.
+    starts[10] = 2.0
+    reused = svc.get_process_batch_info([10], include=["threads"])
+    assert reused["cache_hits"] == 0
+
+    try:
+        svc.get_process_batch_info([10], include=["maps"])
+    except ValueError as exc:
+        assert "maps" in str(exc)
+    else:
+        raise AssertionError("expected ValueError")
@@ -1,6 +1,18 @@
 """Tests for ``kernel_ai.services.process_timeline``."""
 
+import pytest
+
 from kernel_ai.services import process_timeline as svc
+from kernel_ai.services import timeline_sampler as sampler_svc
+
+
+@pytest.fixture(autouse=True)
+def _cold_sampler(monkeypatch):
+    """A fresh, never-started sampler per test (no background thread)."""
+    sampler = sampler_svc.TimelineSampler()
+    monkeypatch.setattr(sampler, "ensure_running", lambda: None)
+    monkeypatch.setattr(sampler_svc, "get_timeline_sampler", lambda: sampler)
+    return sampler
 
 
 class _FakeProc:
@@ -75,3 +87,104 @@ def test_get_proc_timeline_branches_data_basic(monkeypatch):
     assert len(out["branches"]) == 2
     assert out["branches"][0]["event_count"] >= 1
     assert out["meta"]["window_s"] == 120
+
+
+def _probe(pid, **over):
+    row = {"pid": pid, "comm": f"p{pid}", "state": "S", "starttime": "100", "vol": 10, "nonvol": 1,
+           "read_bytes": 0, "write_bytes": 0, "syscall": 7}
+    row.update(over)
+    return row
+
+
+def test_sampler_records_real_deltas(monkeypatch, _cold_sampler):
+    probes = {123: _probe(123)}
+    monkeypatch.setattr(sampler_svc, "_probe", lambda pid: probes.get(pid))
+    _cold_sampler.watch(123)
+
+    _cold_sampler.sample_once(now=1000.0)  # baseline
+    probes[123] = _probe(123, state="R", vol=13, nonvol=2, read_bytes=4096, syscall=0)
+    _cold_sampler.sample_once(now=1000.1)
+    del probes[123]
+    _cold_sampler.sample_once(now=1000.2)
+
+    events = _cold_sampler.events(123, since=0.0)
+    assert [(e["ts"], e["type"]) for e in events] == [
+        (1000.1, "syscall"),
+        (1000.1, "context switch"),
+        (1000.1, "i/o"),
+        (1000.1, "state"),
+        (1000.2, "exit"),
+    ]
+    assert events[0]["name"] == "read"
+    assert events[1]["count"] == 4 and events[1]["voluntary"] == 3
+    assert events[2]["bytes"] == 4096
+    assert (events[3]["from"], events[3]["to"]) == ("S", "R")
+
+
+def test_sampler_starts_fresh_ring_on_pid_reuse(monkeypatch, _cold_sampler):
+    probes = {123: _probe(123)}
+    monkeypatch.setattr(sampler_svc, "_probe", lambda pid: probes.get(pid))
+    _cold_sampler.watch(123)
+
+    _cold_sampler.sample_once(now=1000.0)
+    probes[123] = _probe(123, state="R")
+    _cold_sampler.sample_once(now=1000.1)
+    probes[123] = _probe(123, comm="other", starttime="900", state="D")
+    _cold_sampler.sample_once(now=1000.2)
+    assert _cold_sampler.events(123, since=0.0) == []
+    assert _cold_sampler.comm(123) == "other"
+
+    probes[123] = _probe(123, comm="other", starttime="900", state="S")
+    _cold_sampler.sample_once(now=1000.3)
+    assert [(e["ts"], e["type"]) for e in _cold_sampler.events(123, since=0.0)] == [(1000.3, "state")]
+
+
+def test_get_proc_timeline_data_uses_sampler_ring(monkeypatch, _cold_sampler):
+    now = svc.time.time()
+    probes = {123: _probe(123)}
+    monkeypatch.setattr(sampler_svc, "_probe", lambda pid: probes.get(pid))
+    monkeypatch.setattr(svc.psutil, "Process", lambda _pid: _FakeProc())
+    _cold_sampler.watch(123)
+    _cold_sampler.sample_once(now=now - 2.0)
+    probes[123] = _probe(123, write_bytes=512)
+    _cold_sampler.sample_once(now=now - 1.0)
+
+    out = svc.get_proc_timeline_data(123, window_s=5)
+    assert out["timeline_source"] == "sampler"
+    assert [(e["type"], e["name"]) for e in out["timeline"]] == [("i/o", "write_bytes")]
+    assert 3.5 < out["timeline"][0]["relative_s"] <= 4.5
+
+
+def test_get_proc_timeline_branches_from_sampler_top(monkeypatch, _cold_sampler):
+    now = svc.time.time()
+    probes = {101: _probe(101), 202: _probe(202)}
+    monkeypatch.setattr(sampler_svc, "_probe", lambda pid: probes.get(pid))
+    monkeypatch.setattr(svc.psutil, "process_iter", lambda _fields: pytest.fail("request must not scan"))
+    _cold_sampler._top = [
+        {"pid": 101, "name": "nginx", "cpu_percent": 12.0, "memory_mb": 120.0},
+        {"pid": 202, "name": "python3", "cpu_percent": 8.0, "memory_mb": 220.0},
+    ]
+    _cold_sampler.sample_once(now=now - 1.0)
+    probes[101] = _probe(101, vol=20)
+    probes[202] = _probe(202, syscall=1)
+    _cold_sampler.sample_once(now=now - 0.5)
+
+    out = svc.get_proc_timeline_branches_data(limit=2, events=4, window_s=30)
+    assert out["meta"]["timeline_source"] == "sampler"
+    assert [b["pid"] for b in out["branches"]] == [101, 202]
+    assert out["branches"][1]["timeline"][0]["name"] == "write"
+
+
+def test_sampler_ring_holds_the_longest_window():
+    sampler = sampler_svc.TimelineSampler(period_sec=0.1)
+    assert sampler.ring_size >= sampler_svc.MAX_WINDOW_SEC / 0.1 * 5
+
+
+def test_sampler_idle_exit_releases_thread_under_lock():
+    clock = [1000.0]
+    sampler = sampler_svc.TimelineSampler(idle_stop_sec=60.0, clock=lambda: clock[0])
+    sampler._thread = sampler_svc.threading.current_thread()  # stands in for the sampler thread
+    sampler._last_request = 0.0
+    sampler._run()
+    # The exiting thread is forgotten, so the next watch() starts a new one.
+    assert sampler._thread is None and not sampler.running
@@ -0,0 +1,100 @@
+"""Tests for ``kernel_ai.services.process_tree``."""
+
+import os
+
+from kernel_ai.services import process_tree as svc
+
+
+def _write_stat(root, pid, comm, ppid, ticks=0, threads=1, start=100, rss_pages=256):
+    d = root / str(pid)
+    (d / "fd").mkdir(parents=True, exist_ok=True)
+    fields = ["S", str(ppid)] + ["0"] * 9 + [str(ticks), "0"] + ["0"] * 4 + [str(threads), "0", str(start), "0", str(rss_pages)]
+    (d / "stat").write_text(f"{pid} ({comm}) " + " ".join(fields) + "\n")
+
+
+def _consistent(index):
+    for node in index.nodes.values():
+        expected = list(node.own)
+        for child_pid in node.children:
+            for i, v in enumerate(index.nodes[child_pid].agg):
+                expected[i] += v
+        assert [round(v, 6) for v in node.agg] == [round(v, 6) for v in expected], node.pid
+
+
+def test_tree_aggregates_follow_births_deaths_and_reparents(tmp_path):
+    _write_stat(tmp_path, 1, "systemd", 0)
+    _write_stat(tmp_path, 40, "nginx", 1)
+    _write_stat(tmp_path, 41, "nginx", 40, threads=4)
+    _write_stat(tmp_path, 42, "nginx", 40, threads=2)
+    index = svc.ProcessTreeIndex(proc_root=str(tmp_path)).refresh(now=0.0)
+
+    assert index.nodes[40].children == {41, 42}
+    assert index.nodes[40].agg[svc.SORT_KEYS["threads"]] == 7
+    assert index.nodes[1].agg[svc.SORT_KEYS["processes"]] == 4
+    _consistent(index)
+
+    # CPU comes from tick deltas; only the busy worker's chain changes.
+    _write_stat(tmp_path, 41, "nginx", 40, ticks=int(svc._CLK_TCK), threads=4)
+    index.refresh(now=2.0)
+    assert round(index.nodes[41].own[0], 1) == 50.0
+    assert round(index.nodes[1].agg[0], 1) == 50.0
+    assert index.stats["updates"] == 1
+    _consistent(index)
+
+    # Master exits: workers are reparented to init by the kernel.
+    os.rmdir(tmp_path / "40" / "fd")
+    os.unlink(tmp_path / "40" / "stat")
+    os.rmdir(tmp_path / "40")
+    _write_stat(tmp_path, 41, "nginx", 1, ticks=int(svc._CLK_TCK), threads=4)
+    _write_stat(tmp_path, 42, "nginx", 1, threads=2)
+    _write_stat(tmp_path, 50, "cron", 1)
+    index.refresh(now=3.0)
+    assert 40 not in index.nodes
+    assert index.nodes[1].children == {41, 42, 50}
+    assert index.nodes[1].agg[svc.SORT_KEYS["processes"]] == 4
+    _consistent(index)
+
+
+def test_tree_keeps_nodes_the_deadline_skipped(tmp_path):
+    _write_stat(tmp_path, 1, "systemd", 0)
+    _write_stat(tmp_path, 40, "nginx", 1)
+    index = svc.ProcessTreeIndex(proc_root=str(tmp_path)).refresh(now=0.0)
+
+    index.deadline_sec = 0.0  # nothing gets probed
+    index.refresh(now=2.0)
+    assert set(index.nodes) == {1, 40}
+    assert index.stats["deaths"] == 0
+
+    # Probed again later: CPU spans the time since the node's own last sample.
+    index.deadline_sec = None
+    _write_stat(tmp_path, 40, "nginx", 1, ticks=int(svc._CLK_TCK))
+    index.refresh(now=4.0)
+    assert round(index.nodes[40].own[0], 1) == 25.0
+    _consistent(index)
+
+
+def test_get_process_tree_data_collapses_light_children(tmp_path, monkeypatch):
+    _write_stat(tmp_path, 1, "systemd", 0)
+    _write_stat(tmp_path, 10, "postgres", 1, rss_pages=100)
+    for pid in range(11, 15):
+        _write_stat(tmp_path, pid, "postgres", 10, rss_pages=1000 * (pid - 10))
+    _write_stat(tmp_path, 20, "sshd", 1, rss_pages=50)
+    monkeypatch.setattr(svc, "_TREE_INDEX", svc.ProcessTreeIndex(proc_root=str(tmp_path)))
+
+    out = svc.get_process_tree_data(limit=1, max_children=2, sort="rss")
+    assert [tree["pid"] for tree in out["trees"]] == [10]
+    tree = out["trees"][0]
+    assert [child["pid"] for child in tree["children"]] == [14, 13]
+    assert tree["collapsed"]["subtrees"] == 2
+    assert tree["subtree"]["processes"] == 5
+
+    out = svc.get_process_tree_data(pid=12, depth=0)
+    assert out["ancestors"] == [{"pid": 1, "name": "systemd"}, {"pid": 10, "name": "postgres"}]
+
+    for bad in ({"pid": 999}, {"sort": "name"}):
+        try:
+            svc.get_process_tree_data(**bad)
+        except (ProcessLookupError, ValueError):
+            pass
+        else:
+            raise AssertionError(bad)
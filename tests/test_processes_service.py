@@ -1,5 +1,7 @@
 """Tests for ``kernel_ai.services.processes``."""
 
+import contextlib
+
 from kernel_ai.services import processes as svc
 
 
@@ -16,10 +18,37 @@ def test_get_proc_matrix_data_sorts_by_cpu(monkeypatch):
         ]
 
     monkeypatch.setattr(svc.psutil, "process_iter", fake_iter)
-    monkeypatch.setattr(svc.os.path, "exists", lambda _p: False)
+    monkeypatch.setattr(svc, "_tcp_socket_counts", lambda pids: {20: 3})
 
     out = svc.get_proc_matrix_data()
     assert [row["pid"] for row in out[:2]] == [20, 10]
+    assert [row["net"] for row in out[:2]] == [3, 0]
+
+
+def test_tcp_socket_counts_reads_each_netns_once(monkeypatch):
+    class _Index:
+        lock = contextlib.nullcontext()
+        sockets = {}
+        namespaces = {"net:1": {10, 11}, "net:2": {30}, "net:3": {40}}
+
+        def refresh(self):
+            return self
+
+        def sockets_of(self, pid):
+            return {10: frozenset({100, 101, 900}), 11: frozenset({102}), 30: frozenset({300})}.get(pid, frozenset())
+
+    tables = {
+        "/proc/10/net/tcp": {100, 102},
+        "/proc/10/net/tcp6": {101},
+        "/proc/30/net/tcp": {300},
+        "/proc/30/net/tcp6": set(),
+    }
+    reads = []
+    monkeypatch.setattr(svc._ipc_index_service, "get_ipc_index", lambda: _Index())
+    monkeypatch.setattr(svc, "_read_tcp_inodes", lambda path: reads.append(path) or tables.get(path))
+
+    assert svc._tcp_socket_counts([10, 11, 30]) == {10: 2, 11: 1, 30: 1}
+    assert sorted(reads) == sorted(tables)
 
 
 def test_get_proc_graph_data_uses_matrix(monkeypatch):
@@ -33,3 +62,87 @@ def test_get_proc_graph_data_uses_matrix(monkeypatch):
     assert "nodes" in out and "edges" in out
     assert out["nodes"][0]["id"] == "kernel"
     assert len(out["edges"]) == 2
+
+
+class _Mem:
+    def __init__(self, rss):
+        self.rss = rss
+
+
+class _DetailedProc(_FakeProc):
+    def __init__(self, info, cmdline):
+        super().__init__(info)
+        self.cmdline_calls = 0
+        self._cmdline = cmdline
+
+    def cmdline(self):
+        self.cmdline_calls += 1
+        return self._cmdline
+
+
+def _fake_table(monkeypatch, procs):
+    requested = []
+
+    def fake_iter(fields):
+        requested.append(list(fields))
+        return list(procs)
+
+    monkeypatch.setattr(svc.psutil, "process_iter", fake_iter)
+    return requested
+
+
+def test_query_processes_basic_filters_sorts_and_pages(monkeypatch):
+    requested = _fake_table(monkeypatch, [
+        _FakeProc({"pid": 1, "name": "systemd", "status": "S", "memory_info": _Mem(8 << 20), "username": "root"}),
+        _FakeProc({"pid": 20, "name": "nginx", "status": "S", "memory_info": _Mem(64 << 20), "username": "www"}),
+        _FakeProc({"pid": 21, "name": "nginx", "status": "S", "memory_info": _Mem(32 << 20), "username": "www"}),
+        _FakeProc({"pid": 30, "name": "NGINX-exporter", "status": "R", "memory_info": _Mem(16 << 20), "username": "mon"}),
+    ])
+
+    total, rows = svc.query_processes_basic(sort="rss", limit=2, q="nginx")
+    assert total() == 3
+    assert [row["pid"] for row in rows] == [20, 21]
+
+    total, rows = svc.query_processes_basic(sort="rss", offset=1, limit=5, user="www")
+    assert total() == 2
+    assert [row["pid"] for row in rows] == [21]
+    assert "username" in requested[-1] and "num_fds" not in requested[-1]
+
+    total, rows = svc.query_processes_basic(q="30")
+    assert [row["pid"] for row in rows] == [30]
+    assert total() == 1
+
+    # Unsorted pages stream: rows are produced lazily, total counts as it goes.
+    total, rows = svc.query_processes_basic(offset=1, limit=2)
+    assert total() == 0
+    assert [row["pid"] for row in rows] == [20, 21]
+    assert total() == 4
+
+
+def test_query_processes_detailed_reads_cmdline_only_for_page(monkeypatch):
+    procs = [
+        _DetailedProc({"pid": pid, "name": "worker", "status": "S", "memory_info": _Mem(1 << 20),
+                       "cpu_percent": cpu, "num_threads": 1, "num_fds": pid}, ["nginx:", "worker", "process"])
+        for pid, cpu in ((5, 1.0), (6, 9.0), (7, 4.0))
+    ]
+    requested = _fake_table(monkeypatch, procs)
+
+    total, rows = svc.query_processes_detailed(sort="cpu", limit=1)
+    rows = list(rows)
+    assert total() == 3
+    assert [row["pid"] for row in rows] == [6]
+    assert rows[0]["name"] == "nginx: worker" and rows[0]["num_fds"] == 6
+    assert [p.cmdline_calls for p in procs] == [0, 1, 0]
+
+    svc.query_processes_detailed(sort="fds", limit=1)
+    assert "num_fds" in requested[-1]
+
+
+def test_query_processes_rejects_unknown_sort(monkeypatch):
+    _fake_table(monkeypatch, [])
+    try:
+        svc.query_processes_basic(sort="name")
+    except ValueError as exc:
+        assert "sort must be one of" in str(exc)
+    else:
+        raise AssertionError("expected ValueError")
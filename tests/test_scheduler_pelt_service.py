@@ -0,0 +1,95 @@
+"""Tests for ``kernel_ai.services.scheduler_pelt``."""
+
+from kernel_ai.services import scheduler_pelt as svc
+
+
+def _fake_host(monkeypatch, runtimes):
+    sched_reads = []
+
+    def fake_sched(pid, tid=None):
+        sched_reads.append((pid, tid))
+        return {"se.avg.util_avg": str(runtimes[(pid, tid)] % 1000), "se.slice": "3000000"}
+
+    monkeypatch.setattr(svc, "_SCHEDSTAT_PREV", {})
+    monkeypatch.setattr(svc, "_list_tasks", lambda per_thread: list(runtimes))
+    monkeypatch.setattr(svc, "_try_schedstat", lambda pid, tid=None: (runtimes[(pid, tid)], 0, 1))
+    monkeypatch.setattr(svc, "_read_sched_file", fake_sched)
+    monkeypatch.setattr(svc, "_read_state", lambda pid, tid=None: "R")
+    monkeypatch.setattr(svc, "_read_comm", lambda pid, tid=None: f"p{pid}")
+    monkeypatch.setattr(svc, "_read_sched_debug_snapshot", lambda: {"available": False})
+    return sched_reads
+
+
+def test_prefilter_parses_sched_only_for_top_candidates(monkeypatch):
+    runtimes = {(pid, None): pid * 1000 for pid in range(1, 201)}
+    sched_reads = _fake_host(monkeypatch, runtimes)
+
+    out = svc.collect_scheduler_pelt(top_n=5)
+
+    assert out["task_count"] == 200
+    assert out["prefilter"]["ranking"] == "runtime_total"
+    assert sorted(sched_reads) == [(pid, None) for pid in range(186, 201)]
+    assert len(out["tasks"]) == 5
+    assert out["scheduler"] == "EEVDF"
+
+
+def test_prefilter_ranks_on_runtime_delta(monkeypatch):
+    runtimes = {(pid, None): 10_000_000 - pid * 1000 for pid in range(1, 51)}
+    sched_reads = _fake_host(monkeypatch, runtimes)
+    svc.collect_scheduler_pelt(top_n=2)
+
+    # pid 50 has the least total runtime but is the only one busy now.
+    runtimes[(50, None)] += 5_000_000
+    sched_reads.clear()
+    out = svc.collect_scheduler_pelt(top_n=2)
+
+    assert out["prefilter"]["ranking"] == "runtime_delta"
+    assert (50, None) in sched_reads
+    assert any(t["pid"] == 50 and t["recent_on_cpu_ms"] == 5.0 for t in out["tasks"])
+
+
+def test_prefilter_keeps_baseline_within_min_interval(monkeypatch):
+    runtimes = {(pid, None): 1_000_000 for pid in range(1, 11)}
+    _fake_host(monkeypatch, runtimes)
+    clock = [100.0]
+    monkeypatch.setattr(svc.time, "monotonic", lambda: clock[0])
+    svc.collect_scheduler_pelt(top_n=2)
+
+    # A second client polling right away must not reset the window.
+    runtimes[(7, None)] += 3_000_000
+    clock[0] += 0.2
+    svc.collect_scheduler_pelt(top_n=2)
+    clock[0] += 0.2
+    out = svc.collect_scheduler_pelt(top_n=2)
+    assert any(t["pid"] == 7 and t["recent_on_cpu_ms"] == 3.0 for t in out["tasks"])
+
+    clock[0] += svc.SCHEDSTAT_BASELINE_MIN_S
+    svc.collect_scheduler_pelt(top_n=2)
+    out = svc.collect_scheduler_pelt(top_n=2)
+    assert all(t["recent_on_cpu_ms"] == 0.0 for t in out["tasks"])
+
+
+def test_prefilter_keeps_baseline_of_tasks_skipped_by_deadline(monkeypatch):
+    runtimes = {(pid, None): 1_000_000 for pid in range(1, 4)}
+    _fake_host(monkeypatch, runtimes)
+    clock = [100.0]
+    monkeypatch.setattr(svc.time, "monotonic", lambda: clock[0])
+    svc.collect_scheduler_pelt(top_n=3)
+
+    # Deadline hit: pid 3 is listed but not read this time.
+    real_fan_out = svc.fan_out
+    monkeypatch.setattr(svc, "fan_out", lambda fn, items, **kw: [r for r in real_fan_out(fn, items, **kw)
+                                                                   if not (r and r[0] == (3, None))])
+    clock[0] += 2.0
+    svc.collect_scheduler_pelt(top_n=3)
+    assert svc._SCHEDSTAT_PREV["process"][1][(3, None)] == 1_000_000
+
+
+def test_per_thread_mode_reports_tids(monkeypatch):
+    runtimes = {(10, 10): 100, (10, 11): 900, (20, 20): 500}
+    _fake_host(monkeypatch, runtimes)
+
+    out = svc.collect_scheduler_pelt(top_n=3, per_thread=True)
+
+    assert out["mode"] == "thread"
+    assert [(t["pid"], t["tid"]) for t in out["tasks"]] == [(10, 11), (20, 20), (10, 10)]
@@ -19,3 +19,54 @@ def test_get_isolation_context_handles_empty_process_list(monkeypatch):
 def test_read_namespace_inode_parses_inode(monkeypatch):
     monkeypatch.setattr(svc.os, "readlink", lambda _path: "net:[4026531993]")
     assert svc.read_namespace_inode(123, "net") == "4026531993"
+
+
+def test_file_extents_prefers_fiemap_and_caches_per_file_version(tmp_path, monkeypatch):
+    target = tmp_path / "blob.bin"
+    target.write_bytes(b"x" * 8192)
+    calls = []
+    monkeypatch.setattr(svc, "_EXTENT_CACHE", svc.OrderedDict())
+    monkeypatch.setattr(
+        svc._fiemap,
+        "read_extents",
+        lambda path, bs: calls.append(path) or [{"logical": 0, "physical": 9, "length": 2, "flags": "last,eof"}],
+    )
+    monkeypatch.setattr(svc, "_parse_filefrag", lambda _path: (_ for _ in ()).throw(AssertionError("forked")))
+
+    st = svc.os.stat(target)
+    assert svc._file_extents(str(target), st, 4096)[2] == "fiemap"
+    assert svc._file_extents(str(target), st, 4096)[1][0]["physical"] == 9
+    assert len(calls) == 1
+
+    target.write_bytes(b"y" * 12288)
+    svc._file_extents(str(target), svc.os.stat(target), 4096)
+    assert len(calls) == 2
+
+
+def test_file_extents_falls_back_to_filefrag(tmp_path, monkeypatch):
+    target = tmp_path / "blob.bin"
+    target.write_bytes(b"x")
+    monkeypatch.setattr(svc, "_EXTENT_CACHE", svc.OrderedDict())
+    monkeypatch.setattr(svc._fiemap, "read_extents", lambda path, bs: None)
+    monkeypatch.setattr(svc, "_parse_filefrag", lambda _path: ("ext4", [{"logical": 0, "physical": 1, "length": 1, "flags": ""}]))
+
+    fstype, extents, source = svc._file_extents(str(target), svc.os.stat(target), 4096)
+    assert (fstype, source, len(extents)) == ("ext4", "filefrag", 1)
+
+
+def test_file_extents_does_not_cache_unsettled_or_empty_layouts(tmp_path, monkeypatch):
+    target = tmp_path / "blob.bin"
+    target.write_bytes(b"x")
+    layouts = [
+        [],
+        [{"logical": 0, "physical": 0, "length": 1, "flags": "unknown_loc,delalloc,last,eof"}],
+        [{"logical": 0, "physical": 7, "length": 1, "flags": "last,eof"}],
+    ]
+    monkeypatch.setattr(svc, "_EXTENT_CACHE", svc.OrderedDict())
+    monkeypatch.setattr(svc._fiemap, "read_extents", lambda path, bs: layouts.pop(0))
+
+    st = svc.os.stat(target)
+    assert svc._file_extents(str(target), st, 4096)[1] == []
+    assert svc._file_extents(str(target), st, 4096)[1][0]["physical"] == 0
+    assert svc._file_extents(str(target), st, 4096)[1][0]["physical"] == 7
+    assert svc._file_extents(str(target), st, 4096)[1][0]["physical"] == 7  # cached now